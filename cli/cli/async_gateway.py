@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import typing as t
+from concurrent import futures
+from dataclasses import dataclass, field
+
+import requests
+
+from cli.gateway import DEFAULT_PARALLELISM, MAX_PARALLELISM, GatewayManager
+from cli.model import Consumer, JwtCredential, Route
+
+K = t.TypeVar("K")
+T = t.TypeVar("T")
+
+
+@dataclass
+class BatchResult(t.Generic[K, T]):
+    """Outcome of a batch of operations, keyed like the operations."""
+
+    results: dict[K, T] = field(default_factory=dict)
+    errors: dict[K, Exception] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+async def run_batch(operations: dict[K, t.Awaitable[T]]) -> BatchResult[K, T]:
+    """Run operations concurrently, collecting the error of each one."""
+    keys = list(operations)
+    outcomes = await asyncio.gather(*operations.values(), return_exceptions=True)
+
+    batch: BatchResult[K, T] = BatchResult()
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, Exception):
+            batch.errors[key] = outcome
+        elif isinstance(outcome, BaseException):
+            # Do not swallow cancellations and interrupts
+            raise outcome
+        else:
+            batch.results[key] = outcome
+
+    return batch
+
+
+class AsyncGatewayManager:
+    """Asyncio twin of the GatewayManager.
+
+    Admin API calls run on a dedicated thread pool, using the pooled session
+    of a GatewayManager, so they share its retry policy. At most
+    ``concurrency`` calls are in flight at any time.
+    """
+
+    def __init__(
+        self,
+        manager: t.Optional[GatewayManager] = None,
+        concurrency: int = DEFAULT_PARALLELISM,
+    ):
+        if not 1 <= concurrency <= MAX_PARALLELISM:
+            raise ValueError(f"Concurrency must be between 1 and {MAX_PARALLELISM}")
+
+        self.manager = manager or GatewayManager()
+        self._executor = futures.ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self) -> "AsyncGatewayManager":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the threads used to make calls."""
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func: t.Callable[..., T], *args, **kwargs) -> T:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(func, *args, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+
+    async def add_route(self, route: Route) -> requests.Response:
+        """Add a route to Kong."""
+        return await self._run(self.manager.add_route, route)
+
+    async def update_route(self, route: Route, current: Route) -> requests.Response:
+        """Update a route in Kong, given its current state."""
+        return await self._run(self.manager.update_route, route, current)
+
+    async def delete_route(self, route: Route) -> requests.Response:
+        """Delete a route from Kong."""
+        return await self._run(self.manager.delete_route, route)
+
+    async def get_routes(
+        self, tags: t.Optional[list[str]] = None, managed_only: bool = True
+    ) -> list[Route]:
+        """Get all routes from Kong."""
+        return await self._run(
+            self.manager.get_routes, tags=tags, managed_only=managed_only
+        )
+
+    async def get_consumers(
+        self, tags: t.Optional[list[str]] = None, managed_only: bool = True
+    ) -> list[Consumer]:
+        """Get all consumers from Kong."""
+        return await self._run(
+            self.manager.get_consumers, tags=tags, managed_only=managed_only
+        )
+
+    async def add_consumer(
+        self, consumer_name: str, tags: t.Optional[list[str]] = None
+    ) -> None:
+        """Add a consumer to Kong given its name."""
+        return await self._run(self.manager.add_consumer, consumer_name, tags=tags)
+
+    async def delete_consumer(self, consumer_name: str) -> None:
+        """Delete a consumer from Kong given its name."""
+        return await self._run(self.manager.delete_consumer, consumer_name)
+
+    async def add_jwt_cred(self, consumer_name: str) -> JwtCredential:
+        """Add a JWT credential to a consumer given its name."""
+        return await self._run(self.manager.add_jwt_cred, consumer_name)
+
+    async def get_jwt_creds(self, consumer_name: str) -> list[JwtCredential]:
+        """Get all JWT credentials for a consumer given its name."""
+        return await self._run(self.manager.get_jwt_creds, consumer_name)
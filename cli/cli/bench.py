@@ -0,0 +1,226 @@
+import itertools
+import math
+import threading
+import time
+import typing as t
+from concurrent import futures
+from dataclasses import asdict, dataclass, field
+from urllib.parse import urlsplit
+
+import requests
+
+from cli import conf
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p999": 0.999}
+
+DEFAULT_BENCH_REQUESTS = 1000
+DEFAULT_BENCH_CONCURRENCY = 16
+# Requests sent before measuring, shared by the workers so that their connections
+# are open and caches warm
+DEFAULT_BENCH_WARMUP = 50
+DEFAULT_BENCH_TIMEOUT_SECONDS = 10
+
+# Time spent in Kong itself, without the upstream, reported on each response
+KONG_PROXY_LATENCY_HEADER = "X-Kong-Proxy-Latency"
+
+
+def percentile(values: t.Sequence[float], q: float) -> t.Optional[float]:
+    """Get a percentile of some values with the nearest-rank method."""
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def get_percentiles(values: t.Sequence[float]) -> dict[str, t.Optional[float]]:
+    """Get the reported percentiles of some latencies, rounded to the microsecond."""
+    percentiles = {name: percentile(values, q) for name, q in PERCENTILES.items()}
+    return {name: None if v is None else round(v, 3) for name, v in percentiles.items()}
+
+
+@dataclass
+class LoadResult:
+    """Outcome of the requests sent to a URL by a load run."""
+
+    url: str
+    elapsed_s: float = 0
+    latencies_ms: list[float] = field(default_factory=list)
+    kong_latencies_ms: list[float] = field(default_factory=list)
+    status_codes: dict[str, int] = field(default_factory=dict)
+    # Requests without a response, by exception
+    failures: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def n_requests(self) -> int:
+        return sum(self.status_codes.values()) + sum(self.failures.values())
+
+    @property
+    def n_errors(self) -> int:
+        errors = sum(n for code, n in self.status_codes.items() if int(code) >= 400)
+        return errors + sum(self.failures.values())
+
+    @property
+    def throughput(self) -> float:
+        """Requests per second, including errors."""
+        return self.n_requests / self.elapsed_s if self.elapsed_s else 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.n_errors / self.n_requests if self.n_requests else 0
+
+    def summary(self) -> dict:
+        """Summarize the result, without the latency of each request."""
+        summary = {
+            "url": self.url,
+            "requests": self.n_requests,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "throughput": round(self.throughput, 1),
+            "errors": self.n_errors,
+            "error_rate": round(self.error_rate, 4),
+            "status_codes": self.status_codes,
+            "failures": self.failures,
+            "latency_ms": get_percentiles(self.latencies_ms),
+        }
+        if self.kong_latencies_ms:
+            summary["kong_latency_ms"] = get_percentiles(self.kong_latencies_ms)
+
+        return summary
+
+
+@dataclass(frozen=True)
+class LoadSettings:
+    """How requests are sent by a load run.
+
+    Without a rate, each of the concurrent workers sends its next request as soon
+    as it gets a response. With a rate, requests are sent on a fixed schedule,
+    and their latency includes the time they waited for a free worker.
+    """
+
+    n_requests: int = DEFAULT_BENCH_REQUESTS
+    concurrency: int = DEFAULT_BENCH_CONCURRENCY
+    rate: t.Optional[float] = None
+    warmup: int = DEFAULT_BENCH_WARMUP
+    method: str = "GET"
+    timeout: float = DEFAULT_BENCH_TIMEOUT_SECONDS
+
+
+def run_load(url: str, settings: LoadSettings = LoadSettings()) -> LoadResult:
+    """Send requests to a URL, and measure their latency."""
+    result = LoadResult(url=url)
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(start: float, measured: bool) -> None:
+        # Each worker keeps its connection alive, as the clients of a gateway do
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+
+        try:
+            resp = local.session.request(settings.method, url, timeout=settings.timeout)
+        except requests.RequestException as error:
+            if measured:
+                with lock:
+                    name = type(error).__name__
+                    result.failures[name] = result.failures.get(name, 0) + 1
+            return
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        if not measured:
+            return
+
+        code = str(resp.status_code)
+        with lock:
+            result.latencies_ms.append(latency_ms)
+            result.status_codes[code] = result.status_codes.get(code, 0) + 1
+            if KONG_PROXY_LATENCY_HEADER in resp.headers:
+                result.kong_latencies_ms.append(
+                    float(resp.headers[KONG_PROXY_LATENCY_HEADER])
+                )
+
+    # Each worker sends its share of the warm-up, so that all of its measured
+    # requests reuse an open connection, and all workers start measuring together
+    warmup_per_worker = math.ceil(settings.warmup / settings.concurrency)
+    counter = itertools.count()
+    run_start = 0.0
+
+    def start() -> None:
+        nonlocal run_start
+        run_start = time.perf_counter()
+
+    barrier = threading.Barrier(settings.concurrency, action=start)
+
+    def work() -> None:
+        try:
+            for _ in range(warmup_per_worker):
+                send(time.perf_counter(), measured=False)
+        except BaseException:
+            # The other workers do not wait for a worker that failed to warm up
+            barrier.abort()
+            raise
+        barrier.wait()
+
+        while (i := next(counter)) < settings.n_requests:
+            if settings.rate:
+                scheduled = run_start + i / settings.rate
+                time.sleep(max(0.0, scheduled - time.perf_counter()))
+                send(scheduled, measured=True)
+            else:
+                send(time.perf_counter(), measured=True)
+
+    with futures.ThreadPoolExecutor(max_workers=settings.concurrency) as executor:
+        for worker in [executor.submit(work) for _ in range(settings.concurrency)]:
+            worker.result()
+
+    result.elapsed_s = time.perf_counter() - run_start
+    return result
+
+
+def get_direct_url(target: str, path: str, local: bool) -> str:
+    """Get the URL of a route target, reached without the gateway.
+
+    Targets of the docker-compose stack are only resolved in its network, and are
+    reached with the port they are published on instead.
+    """
+    url = target.rstrip("/") + path
+    host = urlsplit(url).hostname
+    if local and host in conf.LOCAL_UPSTREAM_PORTS:
+        split = urlsplit(url)
+        port = conf.LOCAL_UPSTREAM_PORTS[host]
+        url = split._replace(scheme="http", netloc=f"localhost:{port}").geturl()
+
+    return url
+
+
+def get_latency_delta(
+    gateway: LoadResult, direct: LoadResult
+) -> dict[str, t.Optional[float]]:
+    """Get the latency the gateway adds to the direct requests, per percentile."""
+    gateway_percentiles = get_percentiles(gateway.latencies_ms)
+    direct_percentiles = get_percentiles(direct.latencies_ms)
+
+    delta: dict[str, t.Optional[float]] = {}
+    for name in PERCENTILES:
+        gateway_ms, direct_ms = gateway_percentiles[name], direct_percentiles[name]
+        delta[name] = (
+            round(gateway_ms - direct_ms, 3)
+            if gateway_ms is not None and direct_ms is not None
+            else None
+        )
+
+    return delta
+
+
+def bench_report(
+    settings: LoadSettings,
+    gateway: LoadResult,
+    direct: t.Optional[LoadResult] = None,
+) -> dict:
+    """Get the report of a benchmark, which is stored as JSON."""
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "settings": asdict(settings),
+        "gateway": gateway.summary(),
+        "direct": direct.summary() if direct else None,
+        "delta_ms": get_latency_delta(gateway, direct) if direct else None,
+    }
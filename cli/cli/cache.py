@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import typing as t
+
+from loguru import logger
+
+from cli import conf
+
+CACHE_DIR = os.path.join(conf.CONFIG_DIR, "gateway-cache")
+
+# How long cached collections are used without being revalidated
+DEFAULT_CACHE_TTL_SECONDS = 60
+
+
+class AdminStateCache:
+    """On-disk cache of the admin API collections of a gateway.
+
+    Entries are keyed by the path of the collection, e.g. ``/routes``. They
+    expire after a TTL, unless the gateway reports the same configuration hash
+    as when they were stored, which Kong only does in DB-less mode.
+    """
+
+    def __init__(self, admin_url: str, ttl: float = DEFAULT_CACHE_TTL_SECONDS):
+        self.admin_url = admin_url
+        self.ttl = ttl
+
+        url_hash = hashlib.sha256(admin_url.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(CACHE_DIR, f"{url_hash}.json")
+
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {"admin_url": self.admin_url, "marker": None, "entries": {}}
+
+        with open(self.path, mode="rt", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _save(self, state: dict) -> None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+
+        # Entries can contain credentials, keep them private to the user
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, mode="wt", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(tmp_path, self.path)
+
+    def get(
+        self, key: str, probe: t.Callable[[], t.Optional[str]]
+    ) -> t.Optional[list[dict]]:
+        """Get a collection, if it is still valid.
+
+        The probe returns the current configuration hash of the gateway, it is
+        only called for expired entries stored along with a hash.
+        """
+        with self._lock:
+            state = self._load()
+            entry = state["entries"].get(key)
+            if not entry:
+                return None
+
+            if time.time() - entry["fetched_at"] < self.ttl:
+                return entry["data"]
+
+            marker = state.get("marker")
+            if not marker or probe() != marker:
+                logger.debug(f"Cache entry {key} expired")
+                return None
+
+            # The gateway configuration has not changed since
+            entry["fetched_at"] = time.time()
+            self._save(state)
+            return entry["data"]
+
+    def set(self, key: str, data: list[dict], marker: t.Optional[str]) -> None:
+        """Store a collection, with the configuration hash it was read with."""
+        with self._lock:
+            state = self._load()
+            if state.get("marker") != marker:
+                # Entries read from another configuration are stale
+                state["entries"] = {}
+            state["marker"] = marker
+            state["entries"][key] = {"fetched_at": time.time(), "data": data}
+            self._save(state)
+
+    def invalidate(self, path: str) -> None:
+        """Invalidate the collections affected by a write to a path."""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+
+            # Writes to a nested entity affect the whole top level collection,
+            # e.g. /consumers/foo/jwt invalidates /consumers and /consumers/foo/jwt
+            segments = path.strip("/").split("/")
+            prefixes = {f"/{segments[0]}"}
+            if "plugins" in segments:
+                prefixes.add("/plugins")
+
+            state = self._load()
+            state["entries"] = {
+                key: entry
+                for key, entry in state["entries"].items()
+                if not any(
+                    key == prefix or key.startswith((prefix + "/", prefix + "?"))
+                    for prefix in prefixes
+                )
+            }
+            self._save(state)
+
+    def clear(self) -> None:
+        """Remove all the cached collections."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
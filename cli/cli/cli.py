@@ -3,6 +3,7 @@ import sys
 import click
 from loguru import logger
 
+from cli.commands.bench import bench as bench_commands
 from cli.commands.consumer import consumer as consumer_commands
 from cli.commands.dev import dev as dev_commands
 from cli.commands.domain import domain as domain_commands
@@ -51,6 +52,7 @@ def cli(debug: bool, log_level: str) -> None:
         logger.add(sys.stderr, level="DEBUG", backtrace=True, diagnose=True)
 
 
+cli.add_command(bench_commands)
 cli.add_command(consumer_commands)
 cli.add_command(dev_commands)
 cli.add_command(domain_commands)
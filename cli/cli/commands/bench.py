@@ -0,0 +1,152 @@
+import json
+import typing as t
+
+import click
+from rich.table import Table
+
+from cli import bench as bench_load
+from cli import conf
+from cli.console import console
+from cli.gateway import GatewayManager
+
+
+@click.group()
+def bench():
+    """Measure the latency and throughput of the gateway\n
+    https://serverless-gateway.readthedocs.io/en/latest/development.html"""
+
+
+def print_report(report: dict) -> None:
+    """Print the results of a benchmark as a table."""
+    runs = {"Gateway": report["gateway"]}
+    if report["direct"]:
+        runs["Direct"] = report["direct"]
+
+    table = Table("", *runs)
+    table.add_row("URL", *[r["url"] for r in runs.values()])
+    table.add_row("Requests", *[str(r["requests"]) for r in runs.values()])
+    table.add_row("Throughput", *[f"{r['throughput']} req/s" for r in runs.values()])
+    table.add_row(
+        "Errors",
+        *[f"{r['errors']} ({r['error_rate']:.2%})" for r in runs.values()],
+    )
+    for name in bench_load.PERCENTILES:
+        table.add_row(name, *[format_ms(r["latency_ms"][name]) for r in runs.values()])
+
+    if report["delta_ms"]:
+        table.add_section()
+        for name, delta_ms in report["delta_ms"].items():
+            table.add_row(f"Gateway delta {name}", format_ms(delta_ms))
+
+    kong_latency = report["gateway"].get("kong_latency_ms")
+    if kong_latency:
+        table.add_section()
+        for name, latency_ms in kong_latency.items():
+            table.add_row(f"Kong latency {name}", format_ms(latency_ms))
+
+    console.print(table)
+
+
+def format_ms(value: t.Optional[float]) -> str:
+    return f"{value:.1f}ms" if value is not None else "-"
+
+
+@bench.command()
+@click.argument("relative_url")
+@click.option(
+    "--path",
+    default="",
+    help="Path appended to the route, e.g. /hello.",
+)
+@click.option(
+    "--requests",
+    "-n",
+    "n_requests",
+    type=click.IntRange(min=1),
+    default=bench_load.DEFAULT_BENCH_REQUESTS,
+    show_default=True,
+    help="Requests measured.",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=click.IntRange(min=1),
+    default=bench_load.DEFAULT_BENCH_CONCURRENCY,
+    show_default=True,
+    help="Requests sent at once.",
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Requests per second, sent on a fixed schedule. Unlimited by default.",
+)
+@click.option(
+    "--warmup",
+    type=click.IntRange(min=0),
+    default=bench_load.DEFAULT_BENCH_WARMUP,
+    show_default=True,
+    help="Requests sent before measuring, shared by the concurrent workers.",
+)
+@click.option(
+    "--method",
+    type=click.Choice(["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"]),
+    default="GET",
+    show_default=True,
+)
+@click.option(
+    "--direct",
+    is_flag=True,
+    default=False,
+    help="Also send the requests to the target of the route, to measure the"
+    " latency added by the gateway.",
+)
+@click.option(
+    "--direct-url",
+    help="URL of the target of the route, instead of the one from the admin API.",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    default=False,
+    help="Print the results as JSON, to store them.",
+)
+def route(
+    relative_url: str,
+    path: str,
+    direct: bool,
+    direct_url: t.Optional[str],
+    as_json: bool,
+    **settings: t.Any,
+):
+    """Send requests to a route through the gateway
+
+    The requests are sent to the URL of the gateway in the config file, which is
+    the docker-compose gateway after scwgw dev config."""
+    config = conf.InfraConfiguration.load()
+    load_settings = bench_load.LoadSettings(**settings)
+
+    if direct and not direct_url:
+        routes = GatewayManager(config=config).get_routes(managed_only=False)
+        target = next(
+            (r.target for r in routes if r.relative_url == relative_url), None
+        )
+        if not target:
+            raise click.UsageError(f"No route {relative_url}, see --direct-url")
+        direct_url = bench_load.get_direct_url(target, path, config.is_local)
+
+    with console.status("Sending requests through the gateway"):
+        gateway = bench_load.run_load(
+            config.gw_url + relative_url + path, load_settings
+        )
+
+    direct_result = None
+    if direct_url:
+        with console.status("Sending requests to the target"):
+            direct_result = bench_load.run_load(direct_url, load_settings)
+
+    report = bench_load.bench_report(load_settings, gateway, direct_result)
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+    else:
+        print_report(report)
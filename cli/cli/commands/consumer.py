@@ -1,6 +1,12 @@
+import asyncio
+
 import click
 
-from cli.gateway import GatewayManager
+from cli.async_gateway import AsyncGatewayManager, run_batch
+from cli.commands import options
+from cli.commands.human.errors import display_exception
+from cli.console import console
+from cli.gateway import DEFAULT_PARALLELISM, MAX_PARALLELISM, GatewayManager
 
 
 @click.group()
@@ -11,18 +17,43 @@ def consumer():
 
 
 @consumer.command()
-def ls():
+@options.tag_option
+@options.all_option
+@options.refresh_option
+def ls(tags: tuple[str, ...], list_all: bool, refresh: bool):
     """Print the consumers configured on the gateway"""
-    manager = GatewayManager()
-    manager.print_consumers()
+    manager = GatewayManager(use_cache=True)
+    if refresh:
+        manager.cache.clear()
+    manager.print_consumers(tags=list(tags), managed_only=not list_all)
 
 
 @consumer.command()
-@click.argument("name")
-def add(name):
-    """Add a consumer to the gateway"""
-    manager = GatewayManager()
-    manager.add_consumer(name)
+@click.argument("names", nargs=-1, required=True)
+@click.option(
+    "--parallelism",
+    type=click.IntRange(1, MAX_PARALLELISM),
+    default=DEFAULT_PARALLELISM,
+    show_default=True,
+    help="Maximum number of concurrent admin API calls.",
+)
+@options.tag_option
+def add(names: tuple[str, ...], parallelism: int, tags: tuple[str, ...]):
+    """Add one or more consumers to the gateway"""
+
+    async def add_consumers():
+        async with AsyncGatewayManager(concurrency=parallelism) as manager:
+            return await run_batch(
+                {n: manager.add_consumer(n, tags=list(tags)) for n in names}
+            )
+
+    batch = asyncio.run(add_consumers())
+    for name, err in batch.errors.items():
+        console.print(f"Could not add consumer {name}")
+        display_exception(err)
+
+    if not batch.ok:
+        raise click.Abort()
 
 
 @consumer.command()
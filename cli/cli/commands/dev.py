@@ -1,10 +1,16 @@
 import typing as t
 
 import click
+from rich.table import Table
 
-from cli import client
+from cli import client, conf, declarative
 from cli.commands import options
+from cli.console import console
+from cli.gateway import DEFAULT_PARALLELISM, MAX_PARALLELISM, GatewayManager
 from cli.infra import InfraManager
+from cli.infra import container as cnt
+from cli.infra import statsd, tuning
+from cli.model import DEFAULT_STATSD_METRICS
 
 
 @click.group()
@@ -15,11 +21,18 @@ def dev():
 
 @dev.command()
 @options.profile_option
-def config(profile: t.Optional[str]):
+@click.option(
+    "--variant",
+    type=click.Choice(list(conf.LOCAL_VARIANT_PORTS)),
+    default="traditional",
+    show_default=True,
+    help="Docker-compose gateway variant to configure, see the development docs.",
+)
+def config(profile: t.Optional[str], variant: str):
     """Set up config file for local development"""
     scw_client = client.get_scaleway_client(profile_name=profile)
     manager = InfraManager(scw_client)
-    manager.set_up_config(True)
+    manager.set_up_config(True, local_variant=variant)
 
 
 @dev.command()
@@ -30,15 +43,110 @@ def config(profile: t.Optional[str]):
     help="Don't redeploy the container, just update.",
 )
 @options.profile_option
+@options.tuning_profile_option(default=None)
+@options.cache_warmup_option
+@options.dns_options
 def update_containers(
     no_redeploy: bool,
     profile: t.Optional[str],
+    tuning_profile: t.Optional[str],
+    cache_warmup_entities: t.Optional[list[str]],
+    dns_changes: dict[str, t.Any],
 ):
-    """Redeploy the Kong Admin API and Kong Gateway containers"""
+    """Redeploy the Kong Admin API and Kong Gateway containers
+
+    The settings the containers were deployed with are kept, unless new ones are
+    given."""
     scw_client = client.get_scaleway_client(profile_name=profile)
     manager = InfraManager(scw_client)
 
+    current = manager.get_kong_settings()
+    try:
+        settings = current.replace(
+            tuning_profile=tuning_profile,
+            cache_warmup_entities=cache_warmup_entities,
+            dns=current.dns.replace(**dns_changes),
+        )
+    except ValueError as error:
+        raise click.UsageError(str(error))
+
     if no_redeploy:
-        manager.update_container_without_deploy()
+        manager.update_container_without_deploy(settings)
     else:
-        manager.update_container()
+        manager.update_container(settings)
+
+
+@dev.command()
+@options.tuning_profile_option(default=tuning.DEFAULT_TUNING_PROFILE)
+@click.option(
+    "--cpu-limit",
+    type=click.IntRange(min=100),
+    default=cnt.CONTAINER_CPU_LIMIT,
+    show_default=True,
+    help="CPU limit of the gateway, in mVCPU.",
+)
+@click.option(
+    "--memory-limit",
+    type=click.IntRange(min=128),
+    default=cnt.CONTAINER_MEMORY_LIMIT,
+    show_default=True,
+    help="Memory limit of the gateway, in MB.",
+)
+def tuning_env(tuning_profile: str, cpu_limit: int, memory_limit: int):
+    """Print the docker-compose env file of a tuning profile"""
+    for line in tuning.render_env_file(tuning_profile, cpu_limit, memory_limit):
+        click.echo(line)
+
+
+@dev.command()
+@options.declarative_file_option(required=True)
+def push_config(declarative_file: declarative.DeclarativeFile):
+    """Push a declarative config to the admin API of a DB-less Kong node"""
+    config = declarative.render_config(
+        declarative_file.routes, declarative_file.consumers
+    )
+
+    manager = GatewayManager()
+    manager.push_declarative_config(config)
+
+
+@dev.command()
+@click.option(
+    "--statsd-metrics",
+    callback=options.split_statsd_metrics,
+    help="Comma-separated statsd metrics received by the agent, or all.",
+)
+def agent_config(statsd_metrics: t.Optional[tuple[str, ...]]):
+    """Print the Grafana agent config of the statsd metrics mode"""
+    click.echo(statsd.render_agent_file(statsd_metrics or DEFAULT_STATSD_METRICS))
+
+
+@dev.command()
+@click.option(
+    "--parallelism",
+    type=click.IntRange(1, MAX_PARALLELISM),
+    default=DEFAULT_PARALLELISM,
+    show_default=True,
+    help="Maximum number of concurrent admin API calls.",
+)
+@options.not_interactive_option
+def tag_entities(parallelism: int, yes: bool):
+    """Tag the Kong entities created before the CLI tagged them
+
+    Listing commands and route apply only see the entities tagged with scwgw.
+    All the untagged entities of the gateway are tagged, including the ones
+    created through the Kong Admin API."""
+    manager = GatewayManager()
+    unmanaged = manager.get_unmanaged_entities()
+
+    table = Table("Collection", "Untagged entities")
+    for collection, entities in unmanaged.items():
+        table.add_row(collection, str(len(entities)))
+    console.print(table)
+
+    n_entities = sum(len(entities) for entities in unmanaged.values())
+    if not n_entities:
+        return
+
+    if yes or click.confirm(f"Tag {n_entities} entities?"):
+        manager.tag_entities(unmanaged, parallelism=parallelism)
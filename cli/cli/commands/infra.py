@@ -2,14 +2,20 @@ import typing as t
 
 import click
 import scaleway.rdb.v1 as rdb
+import yaml
 from rich.progress import Progress, SpinnerColumn, TimeElapsedColumn
 
-from cli import client, conf
+from cli import client, conf, declarative
 from cli.commands import options
 from cli.commands.human import progress
 from cli.console import console
 from cli.gateway import GatewayManager
 from cli.infra import InfraManager
+from cli.infra import container as cnt
+from cli.infra import dns as dns_infra
+from cli.infra import rdb as rdb_infra
+from cli.infra import tuning
+from cli.model import METRICS_MODE_STATSD, Route, StatsdSettings
 
 
 @click.group()
@@ -20,27 +26,147 @@ def infra():
 
 @infra.command()
 @options.profile_option
-def deploy(profile: t.Optional[str]):
+@click.option(
+    "--db-less",
+    is_flag=True,
+    default=False,
+    help="Run Kong without a database, configured from a declarative file.",
+)
+@options.declarative_file_option(required=False)
+@options.tuning_profile_option(default=tuning.DEFAULT_TUNING_PROFILE)
+@options.cache_warmup_option
+@click.option(
+    "--db-read-replica",
+    is_flag=True,
+    default=False,
+    help="Read the gateway configuration from a read replica of the database.",
+)
+@click.option(
+    "--db-node-type",
+    default=rdb_infra.DB_NODE_TYPE,
+    show_default=True,
+    help="Node type of the database, see scw rdb node-type list.",
+)
+@click.option(
+    "--db-ha",
+    is_flag=True,
+    default=False,
+    help="Run the database as a high availability cluster.",
+)
+@click.option(
+    "--db-volume-type",
+    type=click.Choice([v.value for v in rdb.VolumeType]),
+    default=rdb_infra.DB_VOLUME_TYPE,
+    show_default=True,
+    help="Volume type of the database.",
+)
+@click.option(
+    "--db-volume-size",
+    type=click.IntRange(min=1),
+    default=rdb_infra.DB_VOLUME_SIZE // 1000000000,
+    show_default=True,
+    help="Volume size of the database, in GB.",
+)
+@click.option(
+    "--private-network",
+    is_flag=True,
+    default=False,
+    help="Attach the database to a private network shared with the containers.",
+)
+@options.metrics_mode_option
+@options.statsd_options
+@options.scaling_options
+@options.dns_options
+def deploy(
+    profile: t.Optional[str],
+    db_less: bool,
+    declarative_file: t.Optional[declarative.DeclarativeFile],
+    tuning_profile: str,
+    cache_warmup_entities: t.Optional[list[str]],
+    db_read_replica: bool,
+    db_node_type: str,
+    db_ha: bool,
+    db_volume_type: str,
+    db_volume_size: int,
+    private_network: bool,
+    metrics_mode: str,
+    statsd_changes: dict[str, t.Any],
+    scaling_changes: dict[str, int],
+    dns_changes: dict[str, t.Any],
+):
     """Deploy all the gateway components"""
+    if db_less and not declarative_file:
+        raise click.UsageError("--db-less requires a declarative file, see --file")
+    if db_less and db_read_replica:
+        raise click.UsageError("--db-read-replica cannot be used with --db-less")
+    if db_less and private_network:
+        raise click.UsageError("--private-network cannot be used with --db-less")
+    if db_less and declarative_file:
+        options.check_grpc_routes(declarative_file.routes, is_local=False)
+    if statsd_changes and metrics_mode != METRICS_MODE_STATSD:
+        raise click.UsageError("--statsd-* options need --metrics-mode statsd")
+    try:
+        settings = cnt.KongSettings().replace(
+            tuning_profile=tuning_profile,
+            cache_warmup_entities=cache_warmup_entities,
+            scaling=cnt.ScalingPolicy().replace(**scaling_changes),
+            dns=dns_infra.DnsSettings().replace(**dns_changes),
+            metrics_mode=metrics_mode,
+            statsd=StatsdSettings().replace(**statsd_changes),
+        )
+    except ValueError as error:
+        raise click.UsageError(str(error))
 
     scw_client = client.get_scaleway_client(profile_name=profile)
     manager = InfraManager(scw_client)
 
     progress_columns = progress.get_ultraviolet_styled_progress_columns()
 
-    instance = manager.create_db()
-    # This avoids showing the progress bar if the instance is already running
-    if instance.status in rdb.INSTANCE_TRANSIENT_STATUSES:
-        with Progress(
-            SpinnerColumn(style=progress.ULTRAVIOLET_GREEN_STYLE),
-            *progress_columns,
-            TimeElapsedColumn(),
-            console=console,
-            transient=False,
-        ) as progres_bar:
-            manager.await_db(
-                on_tick=progress.database_deployment_progress_cb(progres_bar)
+    declarative_config = None
+    if db_less and declarative_file:
+        declarative_config = declarative.dump_config(
+            declarative.render_config(
+                declarative_file.routes,
+                declarative_file.consumers,
+                metrics_mode=metrics_mode,
+                statsd=settings.statsd,
             )
+        )
+    else:
+        instance = manager.create_db(
+            node_type=db_node_type,
+            is_ha_cluster=db_ha,
+            volume_type=db_volume_type,
+            volume_size=db_volume_size * 1000000000,
+        )
+        # This avoids showing the progress bar if the instance is already running
+        if instance.status in rdb.INSTANCE_TRANSIENT_STATUSES:
+            with Progress(
+                SpinnerColumn(style=progress.ULTRAVIOLET_GREEN_STYLE),
+                *progress_columns,
+                TimeElapsedColumn(),
+                console=console,
+                transient=False,
+            ) as progres_bar:
+                manager.await_db(
+                    on_tick=progress.database_deployment_progress_cb(progres_bar)
+                )
+
+        if private_network:
+            with console.status(
+                "Attaching Kong database to a private network",
+                spinner_style=progress.ULTRAVIOLET_GREEN_STYLE,
+            ):
+                manager.create_private_network()
+                manager.await_db(on_tick=lambda _: None)
+
+        if db_read_replica:
+            with console.status(
+                "Creating Kong database read replica",
+                spinner_style=progress.ULTRAVIOLET_GREEN_STYLE,
+            ):
+                manager.create_db_read_replica()
+                manager.await_db_read_replica()
 
     manager.ensure_cockpit_activated()
 
@@ -55,18 +181,45 @@ def deploy(profile: t.Optional[str]):
         "Deploying Kong containers",
         spinner_style=progress.ULTRAVIOLET_GREEN_STYLE,
     ):
-        manager.create_containers()
+        manager.create_containers(
+            declarative_config=declarative_config, settings=settings
+        )
         manager.await_containers()
 
     console.print("Setting up local configuration file")
     manager.set_up_config(False)
 
-    console.print("Enabling metrics")
-    gateway = GatewayManager()
-    gateway.setup_global_kong_statsd_plugin()
+    # In DB-less mode, metrics are enabled by the declarative config
+    if not db_less:
+        console.print("Enabling metrics")
+        gateway = GatewayManager()
+        gateway.setup_global_kong_metrics_plugin(metrics_mode, settings.statsd)
 
     console.print("Setting up Grafana")
-    manager.import_kong_dashboard()
+    manager.import_kong_dashboard(metrics_mode)
+
+    manager.print_summary()
+
+
+@infra.command()
+@options.profile_option
+@options.scaling_options
+def scale(profile: t.Optional[str], scaling_changes: dict[str, int]):
+    """Change the scaling policy of the gateway container
+
+    Scale changes are applied without redeploying the gateway."""
+    if not scaling_changes:
+        raise click.UsageError("Nothing to change, see --help")
+
+    scw_client = client.get_scaleway_client(profile_name=profile)
+    manager = InfraManager(scw_client)
+
+    with console.status(
+        "Updating gateway scaling policy",
+        spinner_style=progress.ULTRAVIOLET_GREEN_STYLE,
+    ):
+        manager.scale_container(**scaling_changes)
+        manager.await_containers()
 
     manager.print_summary()
 
@@ -83,15 +236,103 @@ def summary(profile: t.Optional[str] = None):
 
 @infra.command()
 @options.profile_option
-def check(profile: t.Optional[str] = None):
-    """Check the status of all gateway components"""
+@click.option(
+    "--db-latency",
+    is_flag=True,
+    default=False,
+    help="Measure the round trip to the public and private database endpoints.",
+)
+@click.option(
+    "--dns",
+    "check_dns",
+    is_flag=True,
+    default=False,
+    help="Measure the resolution of the hosts of the route targets.",
+)
+@options.declarative_file_option(required=False)
+def check(
+    profile: t.Optional[str] = None,
+    db_latency: bool = False,
+    check_dns: bool = False,
+    declarative_file: t.Optional[declarative.DeclarativeFile] = None,
+):
+    """Check the status of all gateway components
+
+    The routes of a DB-less gateway are read from its declarative file."""
     scw_client = client.get_scaleway_client(profile_name=profile)
     manager = InfraManager(scw_client)
 
+    # Read before the checks, as a DB-less gateway has no admin API to list them
+    routes: t.Optional[list[Route]] = None
+    if check_dns and manager.is_db_less():
+        if not declarative_file:
+            raise click.UsageError("The gateway is DB-less, see --file")
+        routes = declarative_file.routes
+
     manager.check_db()
     manager.check_namespace()
     manager.check_containers()
 
+    if db_latency:
+        manager.check_db_latency()
+
+    if check_dns:
+        if routes is None:
+            routes = GatewayManager().get_routes()
+        manager.check_dns(routes)
+
+
+@infra.command()
+@options.profile_option
+@options.declarative_file_option(required=False)
+@options.statsd_options
+@options.not_interactive_option
+def metrics(
+    profile: t.Optional[str],
+    declarative_file: t.Optional[declarative.DeclarativeFile],
+    yes: bool,
+    statsd_changes: dict[str, t.Any],
+):
+    """Change the statsd metrics sent by the gateway
+
+    The series they add to Cockpit are estimated from the current routes and
+    consumers before applying them. A DB-less gateway is configured again from
+    its declarative file."""
+    scw_client = client.get_scaleway_client(profile_name=profile)
+    manager = InfraManager(scw_client)
+
+    if manager.get_metrics_mode() != METRICS_MODE_STATSD:
+        raise click.UsageError("The gateway does not use the statsd metrics mode")
+    try:
+        statsd = manager.get_statsd_settings().replace(**statsd_changes)
+    except ValueError as error:
+        raise click.UsageError(str(error))
+
+    db_less = manager.is_db_less()
+    if db_less:
+        if not declarative_file:
+            raise click.UsageError("The gateway is DB-less, see --file")
+        n_routes = len(declarative_file.routes)
+        n_consumers = len(declarative_file.consumers or {})
+    else:
+        gateway = GatewayManager()
+        n_routes = len(gateway.get_routes(managed_only=False))
+        n_consumers = len(gateway.get_consumers(managed_only=False))
+
+    manager.print_statsd_series_estimate(statsd, n_routes, n_consumers)
+    if not yes and not click.confirm("Apply these statsd metrics?"):
+        return
+
+    if db_less and declarative_file:
+        config = declarative.render_config(
+            declarative_file.routes, declarative_file.consumers, statsd=statsd
+        )
+        manager.update_db_less_config(declarative.dump_config(config), statsd=statsd)
+    else:
+        # The agent mappings are only updated once the gateway is redeployed
+        gateway.setup_global_kong_metrics_plugin(METRICS_MODE_STATSD, statsd)
+        manager.update_container(manager.get_kong_settings().replace(statsd=statsd))
+
 
 @infra.command()
 @options.not_interactive_option
@@ -112,8 +353,14 @@ def delete(yes: bool, profile: t.Optional[str] = None):
     manager = InfraManager(scw_client)
 
     manager.delete_containers()
-    manager.delete_db()
-    manager.delete_namespace()
+    # The private network can only be deleted once nothing is attached to it
+    with console.status(
+        "Deleting Kong database and container namespace",
+        spinner_style=progress.ULTRAVIOLET_GREEN_STYLE,
+    ):
+        manager.delete_db()
+        manager.delete_namespace()
+    manager.delete_private_network()
 
 
 @infra.command()
@@ -175,3 +422,58 @@ def new_admin_token(profile: t.Optional[str]):
 
     # WARNING: must use raw print here to avoid line-breaks
     print(token)
+
+
+@infra.command()
+@options.declarative_file_option(required=True)
+@click.option(
+    "--output",
+    "-o",
+    type=click.File("wt"),
+    default="-",
+    help="File to write the Kong declarative config to.",
+)
+@options.metrics_mode_option
+@options.statsd_options
+def render_config(
+    declarative_file: declarative.DeclarativeFile,
+    output: t.TextIO,
+    metrics_mode: str,
+    statsd_changes: dict[str, t.Any],
+):
+    """Render the Kong declarative config used in DB-less mode"""
+    try:
+        statsd = StatsdSettings().replace(**statsd_changes)
+    except ValueError as error:
+        raise click.UsageError(str(error))
+
+    config = declarative.render_config(
+        declarative_file.routes,
+        declarative_file.consumers,
+        metrics_mode=metrics_mode,
+        statsd=statsd,
+    )
+
+    yaml.safe_dump(config, output, sort_keys=False)
+
+
+@infra.command()
+@options.declarative_file_option(required=True)
+@options.profile_option
+def push_config(
+    declarative_file: declarative.DeclarativeFile, profile: t.Optional[str]
+):
+    """Replace the configuration of a DB-less gateway"""
+    options.check_grpc_routes(declarative_file.routes, is_local=False)
+
+    scw_client = client.get_scaleway_client(profile_name=profile)
+    manager = InfraManager(scw_client)
+
+    # The metrics plugin matches the agent configuration of the container
+    config = declarative.render_config(
+        declarative_file.routes,
+        declarative_file.consumers,
+        metrics_mode=manager.get_metrics_mode(),
+        statsd=manager.get_statsd_settings(),
+    )
+    manager.update_db_less_config(declarative.dump_config(config))
@@ -1,5 +1,6 @@
 import click
 
+from cli.commands import options
 from cli.gateway import GatewayManager
 
 
@@ -21,7 +22,10 @@ def add(consumer):
 
 @jwt.command()
 @click.argument("consumer")
-def ls(consumer):
+@options.refresh_option
+def ls(consumer, refresh: bool):
     """Lists the JWT credentials for a consumer"""
-    manager = GatewayManager()
+    manager = GatewayManager(use_cache=True)
+    if refresh:
+        manager.cache.clear()
     manager.print_jwt_creds_for_consumer(consumer)
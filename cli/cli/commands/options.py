@@ -1,6 +1,53 @@
+import dataclasses
+import functools
+import typing as t
+
 import click
+import yaml
 from scaleway_core.profile.env import ENV_KEY_SCW_PROFILE
 
+from cli.declarative import DeclarativeFile
+from cli.infra.container import (
+    CACHE_WARMUP_ENTITIES,
+    CONTAINER_CPU_LIMIT,
+    CONTAINER_MAX_CONCURRENCY,
+    CONTAINER_MAX_SCALE,
+    CONTAINER_MEMORY_LIMIT,
+    CONTAINER_MIN_SCALE,
+    DEFAULT_CACHE_WARMUP_ENTITIES,
+    ScalingPolicy,
+)
+from cli.infra.dns import (
+    DEFAULT_DNS_NOT_FOUND_TTL,
+    DEFAULT_DNS_ORDER,
+    DEFAULT_DNS_STALE_TTL,
+    DNS_RECORD_TYPES,
+    DnsSettings,
+)
+from cli.infra.tuning import TUNING_PROFILES
+from cli.model import (
+    DEFAULT_METRICS_MODE,
+    DEFAULT_STATSD_CONSUMER_IDENTIFIER,
+    DEFAULT_STATSD_FLUSH_TIMEOUT,
+    DEFAULT_STATSD_QUEUE_SIZE,
+    DEFAULT_STATSD_UDP_PACKET_SIZE,
+    METRICS_MODES,
+    STATSD_CONSUMER_IDENTIFIERS,
+    STATSD_METRICS,
+    Route,
+    StatsdSettings,
+)
+
+
+def split_comma_separated(
+    _ctx: click.Context, _param: click.Parameter, value: t.Optional[str]
+) -> t.Optional[list[str]]:
+    """Click callback turning a comma-separated value into a list."""
+    if not value:
+        return None
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
 profile_option = click.option(
     "--profile",
     "-p",
@@ -9,6 +56,272 @@ Can also be set with the {ENV_KEY_SCW_PROFILE} environment variable.""",
     required=False,
 )
 
+tag_option = click.option(
+    "--tag",
+    "tags",
+    multiple=True,
+    help="Tag of the gateway entities, can be repeated.",
+)
+
+all_option = click.option(
+    "--all",
+    "list_all",
+    is_flag=True,
+    default=False,
+    help="Include entities not managed by this CLI.",
+)
+
+refresh_option = click.option(
+    "--refresh",
+    is_flag=True,
+    default=False,
+    help="Ignore the local cache of the gateway configuration.",
+)
+
 not_interactive_option = click.option(
     "--yes", "-y", is_flag=True, default=False, help="Skip interactive confirmation"
 )
+
+
+def load_declarative_file(
+    ctx: click.Context, param: click.Parameter, value: t.Optional[t.TextIO]
+) -> t.Optional[DeclarativeFile]:
+    if value is None:
+        return None
+
+    try:
+        return DeclarativeFile.load(value)
+    except (ValueError, yaml.YAMLError) as error:
+        raise click.BadParameter(str(error), ctx=ctx, param=param)
+
+
+def check_grpc_routes(routes: list[Route], is_local: bool) -> None:
+    """Reject gRPC routes unless the gateway is the local one.
+
+    gRPC needs HTTP/2, which Serverless Containers don't forward to a deployed
+    gateway: only the 9080 listener of the local gateway accepts it.
+    """
+    if is_local:
+        return
+
+    for route in routes:
+        if route.is_grpc:
+            raise click.UsageError(
+                f"Route {route.relative_url} uses gRPC, which is only supported "
+                "by the local gateway: deployed gateways only receive HTTP/1"
+            )
+
+
+def declarative_file_option(required: bool):
+    return click.option(
+        "--file",
+        "-f",
+        "declarative_file",
+        type=click.File("rt"),
+        required=required,
+        callback=load_declarative_file,
+        help="YAML file declaring the routes and consumers of the gateway.",
+    )
+
+
+def tuning_profile_option(default: t.Optional[str]):
+    return click.option(
+        "--tuning-profile",
+        type=click.Choice(list(TUNING_PROFILES)),
+        default=default,
+        show_default=default is not None,
+        help="Kong workers, caches and connections sized from the container limits."
+        + ("" if default else " Defaults to the current profile."),
+    )
+
+
+metrics_mode_option = click.option(
+    "--metrics-mode",
+    type=click.Choice(METRICS_MODES),
+    default=DEFAULT_METRICS_MODE,
+    show_default=True,
+    help="How Kong exports its metrics to the Grafana agent: pushed over UDP with "
+    "statsd, or scraped from the status API with prometheus.",
+)
+
+
+def split_cache_warmup_entities(
+    ctx: click.Context, param: click.Parameter, value: t.Optional[str]
+) -> t.Optional[list[str]]:
+    """Click callback parsing cache warm-up entities, where none disables it."""
+    if value == "none":
+        return []
+    entities = split_comma_separated(ctx, param, value)
+    for entity in entities or []:
+        if entity not in CACHE_WARMUP_ENTITIES:
+            raise click.BadParameter(
+                f"Unknown Kong entity {entity}, expected none or some of "
+                f"{','.join(CACHE_WARMUP_ENTITIES)}",
+                ctx=ctx,
+                param=param,
+            )
+    return entities
+
+
+cache_warmup_option = click.option(
+    "--cache-warmup-entities",
+    callback=split_cache_warmup_entities,
+    help="Comma-separated Kong entities loaded in memory when a gateway instance"
+    " starts, or none. Defaults to the current entities, or to"
+    f" {','.join(DEFAULT_CACHE_WARMUP_ENTITIES)}.",
+)
+
+
+def _option_group(
+    options: list[t.Callable], settings: type, prefix: str, dest: str
+) -> t.Callable[[t.Callable], t.Callable]:
+    """Add a group of options to a command, passed to it as a dict of changes.
+
+    The options are named after the fields of a settings dataclass, with a
+    prefix. Only the options that are set are passed, so that unset options keep
+    the current settings.
+    """
+    fields = [field.name for field in dataclasses.fields(settings)]
+
+    def decorator(func: t.Callable) -> t.Callable:
+        @functools.wraps(func)
+        def wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
+            changes = {field: kwargs.pop(prefix + field) for field in fields}
+            kwargs[dest] = {k: v for k, v in changes.items() if v is not None}
+            return func(*args, **kwargs)
+
+        for option in reversed(options):
+            wrapper = option(wrapper)
+        return wrapper
+
+    return decorator
+
+
+def scaling_options(func: t.Callable) -> t.Callable:
+    """Options of the scaling policy of the gateway container, as scaling_changes.
+
+    They are not set by default, so that unset options keep the current policy.
+    """
+    options = [
+        click.option(
+            "--min-scale",
+            type=click.IntRange(min=0),
+            help=f"Instances kept running. Deployed with {CONTAINER_MIN_SCALE}.",
+        ),
+        click.option(
+            "--max-scale",
+            type=click.IntRange(min=1),
+            help=f"Maximum number of instances. Deployed with {CONTAINER_MAX_SCALE}.",
+        ),
+        click.option(
+            "--max-concurrency",
+            type=click.IntRange(min=1),
+            help="Requests handled at once by an instance before scaling out."
+            f" Deployed with {CONTAINER_MAX_CONCURRENCY}.",
+        ),
+        click.option(
+            "--cpu-limit",
+            type=click.IntRange(min=1),
+            help=f"CPU of an instance in mVCPU. Deployed with {CONTAINER_CPU_LIMIT}.",
+        ),
+        click.option(
+            "--memory-limit",
+            type=click.IntRange(min=1),
+            help="Memory of an instance in MB."
+            f" Deployed with {CONTAINER_MEMORY_LIMIT}.",
+        ),
+    ]
+    return _option_group(options, ScalingPolicy, "", "scaling_changes")(func)
+
+
+def dns_options(func: t.Callable) -> t.Callable:
+    """Options of the DNS client of Kong, as dns_changes.
+
+    They are not set by default, so that unset options keep the current settings.
+    """
+    options = [
+        click.option(
+            "--dns-stale-ttl",
+            type=click.IntRange(min=0),
+            help="Seconds an expired record is used while it is refreshed."
+            f" Deployed with {DEFAULT_DNS_STALE_TTL}.",
+        ),
+        click.option(
+            "--dns-valid-ttl",
+            type=click.IntRange(min=1),
+            help="Seconds records are cached for, instead of their own TTL.",
+        ),
+        click.option(
+            "--dns-not-found-ttl",
+            type=click.IntRange(min=0),
+            help="Seconds a missing record is cached for."
+            f" Deployed with {DEFAULT_DNS_NOT_FOUND_TTL}.",
+        ),
+        click.option(
+            "--dns-order",
+            help="Comma-separated record types looked up in order, from"
+            f" {','.join(DNS_RECORD_TYPES)}. Deployed with {DEFAULT_DNS_ORDER}.",
+        ),
+        click.option(
+            "--dns-resolver",
+            help="Resolver used by Kong, as ip[:port], instead of the one of the"
+            " container.",
+        ),
+    ]
+    return _option_group(options, DnsSettings, "dns_", "dns_changes")(func)
+
+
+def split_statsd_metrics(
+    ctx: click.Context, param: click.Parameter, value: t.Optional[str]
+) -> t.Optional[tuple[str, ...]]:
+    """Click callback parsing statsd metrics, where all selects all of them."""
+    if value == "all":
+        return tuple(STATSD_METRICS)
+    metrics = split_comma_separated(ctx, param, value)
+    return tuple(metrics) if metrics is not None else None
+
+
+def statsd_options(func: t.Callable) -> t.Callable:
+    """Options of the statsd plugin of the statsd metrics mode, as statsd_changes.
+
+    They are not set by default, so that unset options keep the current settings.
+    """
+    options = [
+        click.option(
+            "--statsd-metrics",
+            callback=split_statsd_metrics,
+            help="Comma-separated metrics sent for each request, or all."
+            " Deployed without the per-consumer metrics.",
+        ),
+        click.option(
+            "--statsd-sample-rate",
+            type=click.FloatRange(min=0, max=1, min_open=True),
+            help="Share of the requests whose counters and gauges are sent."
+            " Deployed with 1.",
+        ),
+        click.option(
+            "--statsd-consumer-identifier",
+            type=click.Choice(STATSD_CONSUMER_IDENTIFIERS),
+            help="Consumer field used in the per-consumer metrics."
+            f" Deployed with {DEFAULT_STATSD_CONSUMER_IDENTIFIER}.",
+        ),
+        click.option(
+            "--statsd-udp-packet-size",
+            type=click.IntRange(min=0, max=65507),
+            help="Bytes of metrics combined in a UDP packet, 0 sends a packet per"
+            f" metric. Deployed with {DEFAULT_STATSD_UDP_PACKET_SIZE}.",
+        ),
+        click.option(
+            "--statsd-queue-size",
+            type=click.IntRange(min=1),
+            help="Requests whose metrics are sent in a batch."
+            f" Deployed with {DEFAULT_STATSD_QUEUE_SIZE}.",
+        ),
+        click.option(
+            "--statsd-flush-timeout",
+            type=click.IntRange(min=1),
+            help="Seconds after which an incomplete batch is sent."
+            f" Deployed with {DEFAULT_STATSD_FLUSH_TIMEOUT}.",
+        ),
+    ]
+    return _option_group(options, StatsdSettings, "statsd_", "statsd_changes")(func)
@@ -1,8 +1,29 @@
+import typing as t
+
 import click
 
+from cli.commands import options
 from cli.console import console
-from cli.gateway import GatewayManager
-from cli.model import Route
+from cli.declarative import DeclarativeFile
+from cli.gateway import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_PARALLELISM,
+    MAX_PAGE_SIZE,
+    MAX_PARALLELISM,
+    GatewayManager,
+)
+from cli.model import (
+    DEFAULT_TARGET_WEIGHT,
+    HASH_ON,
+    LB_ALGORITHMS,
+    ROUTE_PROTOCOLS,
+    TIMEOUT_PROFILES,
+    Route,
+    RoutePlan,
+    Upstream,
+    UpstreamTarget,
+    profile_timeouts,
+)
 
 
 @click.group()
@@ -12,10 +33,22 @@ def route():
 
 
 @route.command()
-def ls():
+@click.option(
+    "--page-size",
+    type=click.IntRange(1, MAX_PAGE_SIZE),
+    default=DEFAULT_PAGE_SIZE,
+    show_default=True,
+    help="Number of entities fetched per admin API request.",
+)
+@options.tag_option
+@options.all_option
+@options.refresh_option
+def ls(page_size: int, tags: tuple[str, ...], list_all: bool, refresh: bool):
     """Print the routes configured on the gateway"""
-    manager = GatewayManager()
-    manager.print_routes()
+    manager = GatewayManager(page_size=page_size, use_cache=True)
+    if refresh:
+        manager.cache.clear()
+    manager.print_routes(tags=list(tags), managed_only=not list_all)
 
     console.print("\nRelative URLs are accessible from your gateway base URL:")
     console.print(f"{manager.gateway_url}\n")
@@ -34,8 +67,177 @@ def ls():
     help="HTTP methods that the route should accept. Defaults to all if not specified.",
     multiple=True,
 )
-def add(relative_url: str, target: str, cors: bool, jwt: bool, http_methods: list[str]):
-    """Add a route to the gateway"""
+@options.tag_option
+@click.option(
+    "--cache-ttl",
+    type=click.IntRange(min=1),
+    help="Cache responses in the gateway for this number of seconds.",
+)
+@click.option(
+    "--cache-methods",
+    callback=options.split_comma_separated,
+    help="Comma-separated HTTP methods to cache.  [default: GET,HEAD]",
+)
+@click.option(
+    "--cache-content-types",
+    callback=options.split_comma_separated,
+    help="Comma-separated content types to cache."
+    "  [default: text/plain,application/json]",
+)
+@click.option(
+    "--target",
+    "extra_targets",
+    multiple=True,
+    help="Extra target to balance the traffic with, can be repeated.",
+)
+@click.option(
+    "--weight",
+    "weights",
+    type=click.IntRange(0, 65535),
+    multiple=True,
+    help="Weight of each target, in order, starting with TARGET.  [default: 100]",
+)
+@click.option(
+    "--lb-algorithm",
+    type=click.Choice(LB_ALGORITHMS),
+    default="round-robin",
+    show_default=True,
+    help="Load balancing algorithm used across targets.",
+)
+@click.option(
+    "--hash-on",
+    type=click.Choice(HASH_ON),
+    help="Value hashed by the consistent-hashing algorithm.",
+)
+@click.option("--hash-on-header", help="Header hashed with --hash-on header.")
+@click.option(
+    "--healthcheck-path",
+    help="Path actively probed on each target, unhealthy targets get no traffic.",
+)
+@click.option(
+    "--passive-healthchecks",
+    is_flag=True,
+    default=False,
+    help="Stop sending traffic to targets whose responses are failing.",
+)
+@click.option(
+    "--protocols",
+    callback=options.split_comma_separated,
+    help="Comma-separated protocols accepted by the route, among "
+    f"{','.join(ROUTE_PROTOCOLS)}. gRPC routes need a grpc or grpcs target."
+    "  [default: http,https]",
+)
+@click.option(
+    "--no-request-buffering",
+    is_flag=True,
+    default=False,
+    help="Stream request bodies to the target, e.g. for large uploads.",
+)
+@click.option(
+    "--no-response-buffering",
+    is_flag=True,
+    default=False,
+    help="Stream responses to the client, e.g. for server-sent events.",
+)
+@click.option(
+    "--timeout-profile",
+    type=click.Choice(list(TIMEOUT_PROFILES)),
+    help="Preset of timeouts and retries, overridden by the options setting them.",
+)
+@click.option(
+    "--connect-timeout",
+    type=click.IntRange(min=1),
+    help="Timeout to connect to the target, in milliseconds.  [default: 60000]",
+)
+@click.option(
+    "--read-timeout",
+    type=click.IntRange(min=1),
+    help="Timeout between two reads from the target, in milliseconds."
+    "  [default: 60000]",
+)
+@click.option(
+    "--write-timeout",
+    type=click.IntRange(min=1),
+    help="Timeout between two writes to the target, in milliseconds."
+    "  [default: 60000]",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(0, 32767),
+    help="Number of retries when the target can't be reached.  [default: 5]",
+)
+def add(
+    relative_url: str,
+    target: str,
+    cors: bool,
+    jwt: bool,
+    http_methods: list[str],
+    tags: tuple[str, ...],
+    cache_ttl: t.Optional[int],
+    cache_methods: t.Optional[list[str]],
+    cache_content_types: t.Optional[list[str]],
+    extra_targets: tuple[str, ...],
+    weights: tuple[int, ...],
+    lb_algorithm: str,
+    hash_on: t.Optional[str],
+    hash_on_header: t.Optional[str],
+    healthcheck_path: t.Optional[str],
+    passive_healthchecks: bool,
+    protocols: t.Optional[list[str]],
+    no_request_buffering: bool,
+    no_response_buffering: bool,
+    timeout_profile: t.Optional[str],
+    connect_timeout: t.Optional[int],
+    read_timeout: t.Optional[int],
+    write_timeout: t.Optional[int],
+    retries: t.Optional[int],
+):
+    """Add a route to the gateway
+
+    With several targets, traffic is balanced between them by a Kong upstream.
+    """
+    if (cache_methods or cache_content_types) and not cache_ttl:
+        raise click.UsageError("Caching options require --cache-ttl")
+
+    invalid_protocols = set(protocols or []) - set(ROUTE_PROTOCOLS)
+    if invalid_protocols:
+        raise click.UsageError(f"Invalid protocols {','.join(invalid_protocols)}")
+
+    targets = [target, *extra_targets]
+    if weights and len(weights) != len(targets):
+        raise click.UsageError(f"Expected {len(targets)} --weight, one per target")
+
+    upstream = None
+    load_balancing = (
+        hash_on or hash_on_header or healthcheck_path or passive_healthchecks
+    )
+    if extra_targets or weights or load_balancing or lb_algorithm != "round-robin":
+        try:
+            upstream = Upstream(
+                targets=[
+                    UpstreamTarget(url=url, weight=weight)
+                    for url, weight in zip(
+                        targets, weights or [DEFAULT_TARGET_WEIGHT] * len(targets)
+                    )
+                ],
+                algorithm=lb_algorithm,
+                hash_on=hash_on,
+                hash_on_header=hash_on_header,
+                healthcheck_path=healthcheck_path,
+                passive_healthchecks=passive_healthchecks,
+            )
+        except ValueError as err:
+            raise click.UsageError(str(err)) from err
+
+    timeouts = profile_timeouts(timeout_profile)
+    timeout_options = {
+        "connect_timeout": connect_timeout,
+        "read_timeout": read_timeout,
+        "write_timeout": write_timeout,
+        "retries": retries,
+    }
+    timeouts.update({k: v for k, v in timeout_options.items() if v is not None})
+
     manager = GatewayManager()
 
     route = Route(
@@ -44,16 +246,86 @@ def add(relative_url: str, target: str, cors: bool, jwt: bool, http_methods: lis
         cors=cors,
         jwt=jwt,
         http_methods=http_methods,
+        tags=list(tags),
+        cache_ttl=cache_ttl,
+        cache_methods=cache_methods,
+        cache_content_types=cache_content_types,
+        upstream=upstream,
+        protocols=protocols,
+        request_buffering=not no_request_buffering,
+        response_buffering=not no_response_buffering,
+        **timeouts,
     )
+    options.check_grpc_routes([route], manager.config.is_local)
     manager.add_route(route)
 
 
 @route.command()
-@click.argument("relative_url")
-@click.argument("target")
-def delete(relative_url, target):
-    """Delete a route from the gateway"""
+@click.argument("relative_url", required=False)
+@click.argument("target", required=False)
+@options.tag_option
+@options.not_interactive_option
+def delete(
+    relative_url: t.Optional[str],
+    target: t.Optional[str],
+    tags: tuple[str, ...],
+    yes: bool,
+):
+    """Delete a route from the gateway
+
+    With --tag, deletes all the routes with the given tags instead.
+    """
+    manager = GatewayManager()
+
+    if not tags:
+        if not relative_url or not target:
+            raise click.UsageError("Missing RELATIVE_URL and TARGET, or --tag")
+
+        # The route may be load balanced, which the targets given don't tell
+        route = Route(relative_url, target)
+        manager.delete_route(route)
+        manager.delete_upstream(route)
+        return
+
+    if relative_url:
+        raise click.UsageError("RELATIVE_URL and --tag can't be used together")
+
+    plan = RoutePlan(deletes=manager.get_routes(tags=list(tags)))
+    manager.print_route_plan(plan)
+    if plan.is_empty:
+        return
+
+    if yes or click.confirm(f"Delete {len(plan.deletes)} routes?"):
+        manager.apply_route_plan(plan)
+
+
+@route.command()
+@options.declarative_file_option(required=True)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Only print the changes that would be applied.",
+)
+@click.option(
+    "--parallelism",
+    type=click.IntRange(1, MAX_PARALLELISM),
+    default=DEFAULT_PARALLELISM,
+    show_default=True,
+    help="Maximum number of concurrent admin API calls.",
+)
+def apply(declarative_file: DeclarativeFile, dry_run: bool, parallelism: int):
+    """Make the gateway routes match a declarative file
+
+    Routes missing from the gateway are created, routes that differ are updated
+    and routes that are not in the file are deleted.
+    """
     manager = GatewayManager()
+    options.check_grpc_routes(declarative_file.routes, manager.config.is_local)
+    plan = manager.plan_routes(declarative_file.routes)
+    manager.print_route_plan(plan)
+
+    if dry_run or plan.is_empty:
+        return
 
-    route = Route(relative_url, target)
-    manager.delete_route(route)
+    manager.apply_route_plan(plan, parallelism=parallelism)
@@ -19,6 +19,19 @@ CONFIG_FILE = os.path.join(CONFIG_DIR, "gateway.yml")
 DB_DATABASE_NAME = "rdb"
 DB_DATABASE_NAME_LOCAL = "kong"
 
+# Ports of the admin API and proxy of each docker-compose gateway variant
+LOCAL_VARIANT_PORTS = {
+    "traditional": ("8001", "8080"),
+    "db-less": ("8002", "8081"),
+    "hybrid": ("8006", "8082"),
+    # Reads of the gateway go to a replica, the admin API uses the primary
+    "read-replica": ("8001", "8083"),
+}
+
+# Ports the docker-compose upstreams are published on, as their hosts are only
+# resolved in the docker-compose network
+LOCAL_UPSTREAM_PORTS = {"ping-checker": 8003, "func-a": 8004, "func-b": 8005}
+
 # Default time to wait for resources
 RESOURCE_AWAIT_TIMEOUT_MINUTES = 15
 RESOURCE_AWAIT_TIMEOUT_SECONDS = 60 * RESOURCE_AWAIT_TIMEOUT_MINUTES
@@ -47,29 +60,48 @@ class InfraConfiguration:
     db_host: str
     db_port: str
     db_name: str
+    db_less: bool = False
 
     @staticmethod
-    def from_local() -> "InfraConfiguration":
+    def from_local(variant: str = "traditional") -> "InfraConfiguration":
         """Get the configuration for the local docker-compose stack."""
+        admin_port, gw_port = LOCAL_VARIANT_PORTS[variant]
         return InfraConfiguration(
             protocol="http",
             gw_admin_host="localhost",
-            gw_admin_port="8001",
+            gw_admin_port=admin_port,
             gw_admin_token="",
             gw_host="localhost",
-            gw_port="8080",
+            gw_port=gw_port,
             db_host="localhost",
             db_port="5432",
             db_name=DB_DATABASE_NAME_LOCAL,
+            db_less=variant == "db-less",
         )
 
     @staticmethod
     def from_infra(manager: "InfraManager") -> "InfraConfiguration":
-        admin_host = manager.get_gateway_admin_endpoint()
         container_host = manager.get_gateway_endpoint()
 
+        if manager.is_db_less():
+            # There is neither an admin container nor a database in DB-less mode
+            return InfraConfiguration(
+                protocol="https",
+                gw_admin_host="",
+                gw_admin_port="",
+                gw_admin_token="",
+                gw_host=container_host,
+                gw_port="",
+                db_host="",
+                db_port="",
+                db_name="",
+                db_less=True,
+            )
+
+        admin_host = manager.get_gateway_admin_endpoint()
+
         instance = manager._get_database_instance_or_abort()
-        endpoint = instance.endpoints[0]
+        db_host, db_port = manager._get_database_endpoint_or_abort(instance)
 
         token = manager.create_admin_container_token()
 
@@ -80,8 +112,8 @@ class InfraConfiguration:
             gw_admin_token=token,
             gw_host=container_host,
             gw_port="",
-            db_host=str(endpoint.ip),
-            db_port=str(endpoint.port),
+            db_host=db_host,
+            db_port=str(db_port),
             db_name=DB_DATABASE_NAME,
         )
 
@@ -109,6 +141,11 @@ class InfraConfiguration:
 
         return "".join(gateway_url)
 
+    @property
+    def is_local(self) -> bool:
+        """Whether the gateway is the one of the docker-compose stack."""
+        return self.gw_host == "localhost"
+
     @property
     def gw_admin_url(self):
         admin_url = [
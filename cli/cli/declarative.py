@@ -0,0 +1,130 @@
+import json
+import typing as t
+from dataclasses import dataclass, field
+
+import yaml
+
+from cli.model import (
+    DEFAULT_METRICS_MODE,
+    Consumer,
+    JwtCredential,
+    Route,
+    RouteTable,
+    StatsdSettings,
+    metrics_plugin_json,
+)
+
+# Version of the Kong declarative configuration format
+DECLARATIVE_FORMAT_VERSION = "3.0"
+
+# Keys of the JWT credentials of a consumer in a declarative file
+JWT_CREDENTIAL_KEYS = ("algorithm", "key", "secret")
+
+
+@dataclass
+class DeclarativeFile:
+    """Routes and consumers described in a declarative YAML file."""
+
+    routes: list[Route] = field(default_factory=list)
+    # JWT credentials of each consumer
+    consumers: dict[str, list[JwtCredential]] = field(default_factory=dict)
+
+    @staticmethod
+    def load(stream: t.TextIO) -> "DeclarativeFile":
+        """Read a declarative file.
+
+        Raises a ValueError naming the invalid entry, if any.
+        """
+        data = yaml.safe_load(stream) or {}
+        if not isinstance(data, dict):
+            raise ValueError("Expected a mapping with routes and consumers")
+        for key in ("routes", "consumers"):
+            if not isinstance(data.get(key) or [], list):
+                raise ValueError(f"Expected a list of {key}")
+
+        routes = RouteTable()
+        for i, route_data in enumerate(data.get("routes") or []):
+            if not isinstance(route_data, dict):
+                raise ValueError(f"Invalid route {i}: expected a mapping")
+            try:
+                routes.add(Route.from_dict(route_data))
+            except ValueError as error:
+                name = route_data.get("relative_url") or "without relative_url"
+                raise ValueError(f"Invalid route {i} ({name}): {error}") from error
+
+        consumers: dict[str, list[JwtCredential]] = {}
+        for i, consumer_data in enumerate(data.get("consumers") or []):
+            if not isinstance(consumer_data, dict) or not consumer_data.get("username"):
+                raise ValueError(f"Invalid consumer {i}: expected a username")
+
+            username = consumer_data["username"]
+            if username in consumers:
+                raise ValueError(f"Invalid consumer {i}: duplicate {username}")
+
+            creds = consumer_data.get("jwt_credentials") or []
+            if not isinstance(creds, list) or not all(
+                isinstance(cred, dict) and all(cred.get(k) for k in JWT_CREDENTIAL_KEYS)
+                for cred in creds
+            ):
+                raise ValueError(
+                    f"Invalid consumer {i} ({username}): expected a list of "
+                    f"jwt_credentials with {', '.join(JWT_CREDENTIAL_KEYS)}"
+                )
+            consumers[username] = [JwtCredential.from_json(cred) for cred in creds]
+
+        return DeclarativeFile(routes=list(routes), consumers=consumers)
+
+
+def render_config(
+    routes: t.Iterable[Route],
+    consumers: t.Optional[dict[str, list[JwtCredential]]] = None,
+    forward_metrics: bool = True,
+    metrics_mode: str = DEFAULT_METRICS_MODE,
+    statsd: StatsdSettings = StatsdSettings(),
+) -> dict:
+    """Render the Kong declarative configuration used in DB-less mode."""
+    services = []
+    upstreams = []
+    for route in routes:
+        route_json = route.route_json()
+        # Routes are nested in their service
+        del route_json["service"]
+        route_json = {k: v for k, v in route_json.items() if v is not None}
+
+        route_json["plugins"] = []
+        if route.cors:
+            route_json["plugins"].append(route.cors_json())
+        if route.jwt:
+            route_json["plugins"].append(route.jwt_json())
+        if route.cache_ttl:
+            route_json["plugins"].append(route.proxy_cache_json())
+
+        service_json = route.service_json()
+        service_json["routes"] = [route_json]
+        services.append(service_json)
+
+        if route.upstream:
+            upstream_json = route.upstream_json()
+            upstream_json["targets"] = [t.json() for t in route.upstream.targets]
+            upstreams.append(upstream_json)
+
+    consumers_json = []
+    for username, creds in (consumers or {}).items():
+        consumer_json = Consumer(username=username).json()
+        consumer_json["jwt_secrets"] = [cred.json() for cred in creds]
+        consumers_json.append(consumer_json)
+
+    plugins = [metrics_plugin_json(metrics_mode, statsd)] if forward_metrics else []
+
+    return {
+        "_format_version": DECLARATIVE_FORMAT_VERSION,
+        "services": services,
+        "upstreams": upstreams,
+        "consumers": consumers_json,
+        "plugins": plugins,
+    }
+
+
+def dump_config(config: dict) -> str:
+    """Serialize a declarative configuration to pass it as an env var."""
+    return json.dumps(config, separators=(",", ":"))
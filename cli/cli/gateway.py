@@ -1,5 +1,6 @@
 import typing as t
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent import futures
 from dataclasses import dataclass
 
 import requests
@@ -10,11 +11,46 @@ from rich.table import Table
 from urllib3 import Retry
 
 from cli import conf
+from cli.cache import AdminStateCache
 from cli.console import console
-from cli.model import Consumer, JwtCredential, Route
+from cli.model import (
+    DEFAULT_CACHE_CONTENT_TYPES,
+    DEFAULT_CACHE_METHODS,
+    DEFAULT_ROUTE_PROTOCOLS,
+    DEFAULT_TIMEOUTS,
+    MANAGED_TAG,
+    METRICS_MODES,
+    Consumer,
+    JwtCredential,
+    Route,
+    RoutePlan,
+    RouteTable,
+    StatsdSettings,
+    Upstream,
+    kong_tags,
+    metrics_plugin_json,
+    user_tags,
+)
 
 MAX_RETRIES = 5
 
+# Number of admin API calls made concurrently when applying changes
+DEFAULT_PARALLELISM = 8
+MAX_PARALLELISM = 32
+
+# Kong paginates admin collections, 100 is its default and 1000 its maximum
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Collections listed with the managed tag, whose entities must all carry it
+MANAGED_COLLECTIONS = ("services", "routes", "plugins", "upstreams", "consumers")
+
+
+def _format_ms(milliseconds: int) -> str:
+    if milliseconds % 1000:
+        return f"{milliseconds}ms"
+    return f"{milliseconds // 1000}s"
+
 
 @dataclass
 class KongAPIException(Exception):
@@ -33,7 +69,15 @@ class GatewayManager:
     admin_url: str
     gateway_url: str
 
-    def __init__(self, config: t.Optional[conf.InfraConfiguration] = None):
+    def __init__(
+        self,
+        config: t.Optional[conf.InfraConfiguration] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        use_cache: bool = False,
+    ):
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}")
+
         # Local local config
         self.config = config or conf.InfraConfiguration.load()
         self.admin_url = self.config.gw_admin_url
@@ -43,8 +87,15 @@ class GatewayManager:
         self.services_url = self.admin_url + "/services"
         self.consumers_url = self.admin_url + "/consumers"
         self.plugins_url = self.admin_url + "/plugins"
+        self.upstreams_url = self.admin_url + "/upstreams"
 
         self.token = self.config.gw_admin_token
+        self.page_size = page_size
+
+        # Writes always invalidate the cache, reads only use it when enabled
+        self.use_cache = use_cache
+        self.cache = AdminStateCache(self.admin_url)
+        self._configuration_hash: t.Optional[str] = None
 
         self._session = self._get_session()
 
@@ -61,7 +112,10 @@ class GatewayManager:
             # 404: retry for Envoy service not found
             status_forcelist=[500, 404, 403],
         )
-        session.mount("https://", HTTPAdapter(max_retries=retries))
+        # Size the pool so that concurrent calls can all reuse a connection
+        session.mount(
+            "https://", HTTPAdapter(max_retries=retries, pool_maxsize=MAX_PARALLELISM)
+        )
 
         return session
 
@@ -75,134 +129,467 @@ class GatewayManager:
             return resp
         except requests.HTTPError as err:
             raise KongAPIException(err.response) from err
+        finally:
+            if method != "GET" and url.startswith(self.admin_url):
+                self.cache.invalidate(url.removeprefix(self.admin_url))
+
+    def iter_collection(
+        self,
+        url: str,
+        page_size: t.Optional[int] = None,
+        tags: t.Optional[list[str]] = None,
+    ) -> t.Iterator[dict]:
+        """Iterate over all the entities of an admin API collection.
+
+        Only entities with all the given tags are returned, filtered by Kong.
+        When the cache is enabled, collections are read from it if still valid,
+        and stored in it once fully read.
+        """
+        if not self.use_cache:
+            yield from self._iter_pages(url, page_size, tags)
+            return
+
+        key = url.removeprefix(self.admin_url)
+        if tags:
+            key += "?tags=" + ",".join(tags)
+
+        cached = self.cache.get(key, probe=self._get_configuration_hash)
+        if cached is not None:
+            logger.debug(f"Using cached {key}")
+            yield from cached
+            return
+
+        marker = self._get_configuration_hash()
+        data = list(self._iter_pages(url, page_size, tags))
+        self.cache.set(key, data, marker)
+        yield from data
+
+    def _get_configuration_hash(self) -> t.Optional[str]:
+        """Get the hash of the gateway configuration, only set in DB-less mode.
+
+        It is only requested once per manager, as it is used to revalidate the
+        cache of a whole command. With a database, Kong has no cheap marker of
+        changes, and cached collections are refetched once expired.
+        """
+        if not self.config.db_less:
+            return None
+
+        if self._configuration_hash is None:
+            resp = self._request(method="GET", url=self.admin_url + "/status")
+            self._configuration_hash = resp.json().get("configuration_hash", "")
+
+        return self._configuration_hash or None
+
+    def _iter_pages(
+        self,
+        url: str,
+        page_size: t.Optional[int] = None,
+        tags: t.Optional[list[str]] = None,
+    ) -> t.Iterator[dict]:
+        """Iterate over all the pages of an admin API collection.
+
+        Kong only returns one page per request, so this follows the
+        ``offset`` cursor until the last page has been read.
+        """
+        params: dict[str, t.Any] = {"size": page_size or self.page_size}
+        if tags:
+            # Comma-separated tags must all be set on the entity
+            params["tags"] = ",".join(tags)
+        while True:
+            resp = self._request(method="GET", url=url, params=params)
+            body = resp.json()
+            yield from body.get("data") or []
+
+            offset = body.get("offset")
+            if not offset:
+                return
+            params["offset"] = offset
 
     def add_route(self, route: Route) -> requests.Response:
         """Add a route to Kong."""
 
-        if not route.target.startswith("http"):
+        if route.is_grpc:
+            if not route.target.startswith("grpc"):
+                raise ValueError("gRPC route target must start with grpc or grpcs")
+            if route.http_methods:
+                raise ValueError("gRPC routes can't be restricted to HTTP methods")
+        elif not route.target.startswith("http"):
             raise ValueError("Route target must start with http or https")
 
         service_url = f"{self.services_url}/{route.name}"
         route_url = f"{self.routes_url}/{route.name}"
 
+        # The upstream must exist before the service pointing at it
+        if route.upstream:
+            self._put_upstream(route)
+
         resp = self._request(method="PUT", url=service_url, json=route.service_json())
         resp = self._request(method="PUT", url=route_url, json=route.route_json())
 
-        route_plugins_url = f"{route_url}/plugins"
-
         if route.cors:
-            try:
+            self._add_route_plugin(route, route.cors_json())
+        if route.jwt:
+            self._add_route_plugin(route, route.jwt_json())
+        if route.cache_ttl:
+            self._add_route_plugin(route, route.proxy_cache_json())
+
+        return resp
+
+    def _put_upstream(self, route: Route) -> None:
+        """Create or update the upstream of a route, along with its targets."""
+        upstream_url = f"{self.upstreams_url}/{route.upstream_name}"
+        targets_url = f"{upstream_url}/targets"
+
+        self._request(method="PUT", url=upstream_url, json=route.upstream_json())
+
+        existing = {t["target"]: t for t in self._iter_pages(targets_url)}
+        desired = {t.address: t for t in route.upstream.targets}  # type: ignore
+
+        for address, target_json in existing.items():
+            if address not in desired:
+                self._request(method="DELETE", url=f"{targets_url}/{target_json['id']}")
+
+        for address, target in desired.items():
+            target_json = target.json() | {"tags": kong_tags(route.tags)}
+            current = existing.get(address)
+            if not current:
+                self._request(method="POST", url=targets_url, json=target_json)
+            elif current.get("weight") != target.weight:
                 self._request(
-                    method="POST", url=route_plugins_url, json=route.cors_json()
+                    method="PATCH",
+                    url=f"{targets_url}/{current['id']}",
+                    json=target_json,
                 )
-            except KongAPIException as err:
-                # Ignore if the plugin already exists
-                if err.response.status_code != 409:
-                    raise
 
-        if route.jwt:
-            try:
+    def _add_route_plugin(self, route: Route, plugin_json: dict) -> None:
+        route_plugins_url = f"{self.routes_url}/{route.name}/plugins"
+        try:
+            self._request(method="POST", url=route_plugins_url, json=plugin_json)
+        except KongAPIException as err:
+            if err.response.status_code != 409:
+                raise
+
+            # The plugin already exists, make sure it is up to date
+            for plugin in self._iter_pages(route_plugins_url):
+                if plugin["name"] == plugin_json["name"]:
+                    self._request(
+                        method="PATCH",
+                        url=f"{route_plugins_url}/{plugin['id']}",
+                        json=plugin_json,
+                    )
+
+    def update_route(self, route: Route, current: Route) -> requests.Response:
+        """Update a route in Kong, given its current state."""
+        resp = self.add_route(route)
+
+        # Adding a route only installs plugins, remove the ones now disabled
+        if current.cors and not route.cors:
+            self._delete_route_plugin(route, "cors")
+        if current.jwt and not route.jwt:
+            self._delete_route_plugin(route, "jwt")
+        if current.cache_ttl and not route.cache_ttl:
+            self._delete_route_plugin(route, "proxy-cache")
+        if current.upstream and not route.upstream:
+            self.delete_upstream(route)
+
+        return resp
+
+    def _delete_route_plugin(self, route: Route, plugin_name: str) -> None:
+        route_plugins_url = f"{self.routes_url}/{route.name}/plugins"
+        for plugin in self._iter_pages(route_plugins_url):
+            if plugin["name"] == plugin_name:
                 self._request(
-                    method="POST", url=route_plugins_url, json=route.jwt_json()
+                    method="DELETE", url=f"{route_plugins_url}/{plugin['id']}"
                 )
-            except KongAPIException as err:
-                # Ignore if the plugin already exists
-                if err.response.status_code != 409:
-                    raise
 
-        return resp
+    def plan_routes(self, routes: t.Iterable[Route]) -> RoutePlan:
+        """Work out the changes needed for Kong to serve exactly these routes."""
+        desired = RouteTable(routes)
+        current = RouteTable(self.iter_routes())
+        return RoutePlan.diff(desired, current)
+
+    def apply_route_plan(
+        self, plan: RoutePlan, parallelism: int = DEFAULT_PARALLELISM
+    ) -> None:
+        """Apply the changes of a plan, making admin API calls concurrently."""
+        with futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+            tasks = [executor.submit(self.add_route, r) for r in plan.creates]
+            tasks += [
+                executor.submit(self.update_route, new, old)
+                for new, old in plan.updates
+            ]
+            tasks += [executor.submit(self.delete_route, r) for r in plan.deletes]
+
+        # Raise the first error, if any
+        for task in tasks:
+            task.result()
+
+    def print_route_plan(self, plan: RoutePlan) -> None:
+        """Print the changes of a plan."""
+        if plan.is_empty:
+            console.print("Routes are up to date, no changes to apply")
+            return
+
+        table = Table("Action", "Relative url", "Target")
+        for route in plan.creates:
+            table.add_row("[green]create", route.relative_url, route.target)
+        for route, current in plan.updates:
+            target = route.target
+            if route.target != current.target:
+                target = f"{current.target} -> {route.target}"
+            table.add_row("[yellow]update", route.relative_url, target)
+        for route in plan.deletes:
+            table.add_row("[red]delete", route.relative_url, route.target)
+
+        console.print(table)
 
     def delete_route(self, route: Route) -> requests.Response:
-        """Delete a route from Kong."""
+        """Delete a route from Kong, along with its upstream if it has one."""
         self._request(method="DELETE", url=f"{self.routes_url}/{route.name}")
         resp = self._request(method="DELETE", url=f"{self.services_url}/{route.name}")
+        if route.upstream:
+            self.delete_upstream(route)
         return resp
 
-    def print_routes(self) -> None:
+    def delete_upstream(self, route: Route) -> None:
+        """Delete the upstream of a route, Kong ignores it if there is none."""
+        self._request(
+            method="DELETE", url=f"{self.upstreams_url}/{route.upstream_name}"
+        )
+
+    def print_routes(
+        self, tags: t.Optional[list[str]] = None, managed_only: bool = True
+    ) -> None:
         """Print all routes."""
-        routes: list[Route] = self.get_routes()
+        routes = self.get_routes(tags=tags, managed_only=managed_only)
         routes.sort(key=lambda r: r.relative_url)
 
-        table = Table("Relative url", "Target", "HTTP methods", "JWT", "CORS")
+        table = Table(
+            "Relative url",
+            "Target",
+            "HTTP methods",
+            "JWT",
+            "CORS",
+            "Cache",
+            "Protocols",
+            "Timeouts",
+            "Tags",
+        )
         for route in routes:
             jwt = "On" if route.jwt else "-"
             cors = "On" if route.cors else "-"
             http_methods = " ".join(route.http_methods) if route.http_methods else "All"
-            table.add_row(route.relative_url, route.target, http_methods, jwt, cors)
+            cache = "-"
+            if route.cache_ttl:
+                cache_methods = route.cache_methods or DEFAULT_CACHE_METHODS
+                cache_types = route.cache_content_types or DEFAULT_CACHE_CONTENT_TYPES
+                cache = (
+                    f"{route.cache_ttl}s {' '.join(cache_methods)}\n"
+                    f"{' '.join(cache_types)}"
+                )
+            target = route.target
+            if route.upstream:
+                target = route.upstream.algorithm
+                for upstream_target in route.upstream.targets:
+                    health = (upstream_target.health or "-").lower()
+                    target += (
+                        f"\n{upstream_target.url} "
+                        f"({upstream_target.weight}) {health}"
+                    )
+            protocols = " ".join(route.protocols or DEFAULT_ROUTE_PROTOCOLS)
+            if not route.request_buffering:
+                protocols += "\nunbuffered requests"
+            if not route.response_buffering:
+                protocols += "\nunbuffered responses"
+            timeouts = "-"
+            if route.timeouts:
+                # Connect, read and write timeouts, then retries
+                settings = DEFAULT_TIMEOUTS | route.timeouts
+                timeouts = (
+                    f"{_format_ms(settings['connect_timeout'])} "
+                    f"{_format_ms(settings['read_timeout'])} "
+                    f"{_format_ms(settings['write_timeout'])}\n"
+                    f"{settings['retries']} retries"
+                )
+            tags_str = " ".join(route.tags or [])
+            table.add_row(
+                route.relative_url,
+                target,
+                http_methods,
+                jwt,
+                cors,
+                cache,
+                protocols,
+                timeouts,
+                tags_str,
+            )
 
         console.print(table)
 
-    def get_routes(self) -> list[Route]:
+    def get_routes(
+        self, tags: t.Optional[list[str]] = None, managed_only: bool = True
+    ) -> list[Route]:
         """Get all routes from Kong."""
-        # Get routes
-        resp = self._request(method="GET", url=self.routes_url)
-        route_data = {r.get("name"): r for r in resp.json().get("data")}
+        return list(self.iter_routes(tags=tags, managed_only=managed_only))
+
+    def iter_routes(
+        self, tags: t.Optional[list[str]] = None, managed_only: bool = True
+    ) -> t.Iterator[Route]:
+        """Iterate over all routes from Kong.
 
-        # Get services
-        resp = self._request(method="GET", url=self.services_url)
-        service_data = {s.get("name"): s for s in resp.json().get("data")}
+        By default, only the routes managed by the CLI are listed, which can be
+        further filtered by tags.
 
-        # Get plugins
-        resp = self._request(method="GET", url=self.plugins_url)
-        plugins_json = resp.json().get("data")
+        Routes, services, plugins and upstreams are fetched concurrently.
+        Routes are yielded in order as their pages arrive, once the entities
+        they are joined with have been fully read. The targets of load balanced
+        routes are read along with their health, several upstreams at a time.
+        """
+        # User tags can differ between a route and its plugins, as plugins
+        # created before a tag change are kept as is
+        managed_tags = [MANAGED_TAG] if managed_only else []
+        route_tags = managed_tags + (tags or [])
+
+        # Routes waiting for the health of their upstream, in order
+        pending: deque[tuple[Route, t.Optional[futures.Future]]] = deque()
+
+        # Three workers read the joined collections, the others the upstreams
+        with futures.ThreadPoolExecutor(
+            max_workers=3 + DEFAULT_PARALLELISM
+        ) as executor:
+            services_future = executor.submit(self._get_services_by_name, managed_tags)
+            plugins_future = executor.submit(self._get_plugins_by_route, managed_tags)
+            upstreams_future = executor.submit(
+                self._get_upstreams_by_name, managed_tags
+            )
+
+            for route_json in self.iter_collection(self.routes_url, tags=route_tags):
+                service_data = services_future.result()
+                route_plugins = plugins_future.result()
+
+                route = self._route_from_json(route_json, service_data, route_plugins)
+                if not route:
+                    continue
 
+                upstream_json = upstreams_future.result().get(
+                    service_data[route_json["name"]]["host"]
+                )
+                upstream_future = None
+                if upstream_json:
+                    upstream_future = executor.submit(
+                        self._set_route_upstream, route, upstream_json
+                    )
+                pending.append((route, upstream_future))
+
+                while pending and (pending[0][1] is None or pending[0][1].done()):
+                    yield self._pop_pending_route(pending)
+
+            while pending:
+                yield self._pop_pending_route(pending)
+
+    @staticmethod
+    def _pop_pending_route(
+        pending: deque[tuple[Route, t.Optional[futures.Future]]],
+    ) -> Route:
+        route, upstream_future = pending.popleft()
+        if upstream_future:
+            upstream_future.result()
+        return route
+
+    def _get_services_by_name(self, tags: list[str]) -> dict[str, dict]:
+        services = self.iter_collection(self.services_url, tags=tags)
+        return {s["name"]: s for s in services}
+
+    def _get_upstreams_by_name(self, tags: list[str]) -> dict[str, dict]:
+        upstreams = self.iter_collection(self.upstreams_url, tags=tags)
+        return {u["name"]: u for u in upstreams}
+
+    def _set_route_upstream(self, route: Route, upstream_json: dict) -> None:
+        # Health is live data, it is never read from the cache
+        health_url = f"{self.upstreams_url}/{upstream_json['name']}/health"
+        targets_json = list(self._iter_pages(health_url))
+        if not targets_json:
+            return
+
+        route.upstream = Upstream.from_json(upstream_json, route.target, targets_json)
+        route.target = route.upstream.targets[0].url
+
+    def _get_plugins_by_route(self, tags: list[str]) -> dict[str, list[dict]]:
         # Work out which plugins apply to which routes
         route_plugins = defaultdict(list)
-        for p in plugins_json:
+        for p in self.iter_collection(self.plugins_url, tags=tags):
             plugin_route = p.get("route")
             plugin_id = plugin_route.get("id") if plugin_route else None
             if plugin_id:
                 route_plugins[plugin_id].append(p)
 
-        routes = []
-        for _, route_json in route_data.items():
-            route_id = route_json["id"]
-            route_name = route_json["name"]
-            route_path = route_json["paths"][0]
-            http_methods = route_json.get("methods")
-
-            service = service_data.get(route_name)
-            if not service:
-                continue
-
-            service_port = service["port"]
-            service_host = service["host"]
-            service_protocol = service["protocol"]
-            service_url = f"{service_protocol}://{service_host}:{service_port}"
-
-            r = Route(
-                relative_url=route_path,
-                target=service_url,
-                http_methods=http_methods,
-            )
-
-            # Check if route has plugins installed
-            # There will be an entry per route per plugin
-            for p in route_plugins.get(route_id) or []:
-                if p.get("name") == "jwt":
-                    r.jwt = True
-                elif p.get("name") == "cors":
-                    r.cors = True
-
-            routes.append(r)
-
-        return routes
+        return route_plugins
+
+    @staticmethod
+    def _route_from_json(
+        route_json: dict,
+        service_data: dict[str, dict],
+        route_plugins: dict[str, list[dict]],
+    ) -> t.Optional[Route]:
+        route_id = route_json["id"]
+        route_name = route_json["name"]
+        route_path = route_json["paths"][0]
+        http_methods = route_json.get("methods")
+
+        service = service_data.get(route_name)
+        if not service:
+            return None
+
+        service_port = service["port"]
+        service_host = service["host"]
+        service_protocol = service["protocol"]
+        service_path = service.get("path") or ""
+        service_url = (
+            f"{service_protocol}://{service_host}:{service_port}{service_path}"
+        )
 
-    def get_consumers(self) -> list[Consumer]:
-        """Get all consumers from Kong."""
-        resp = self._request(method="GET", url=self.consumers_url)
-        consumer_data = resp.json().get("data")
+        r = Route(
+            relative_url=route_path,
+            target=service_url,
+            http_methods=http_methods,
+            tags=user_tags(route_json.get("tags")),
+        )
+        r.set_streaming_from_json(route_json)
+        r.set_timeouts_from_json(service)
+
+        # Check if route has plugins installed
+        # There will be an entry per route per plugin
+        for p in route_plugins.get(route_id) or []:
+            if p.get("name") == "jwt":
+                r.jwt = True
+            elif p.get("name") == "cors":
+                r.cors = True
+            elif p.get("name") == "proxy-cache":
+                r.set_proxy_cache_from_json(p)
+
+        return r
+
+    def get_consumers(
+        self, tags: t.Optional[list[str]] = None, managed_only: bool = True
+    ) -> list[Consumer]:
+        """Get all consumers from Kong, by default only the ones managed by the CLI."""
+        managed_tags = [MANAGED_TAG] if managed_only else []
+        consumer_data = list(
+            self.iter_collection(self.consumers_url, tags=managed_tags + (tags or []))
+        )
         consumer_data.sort(key=lambda x: x["username"])
 
         return [Consumer.from_json(c) for c in consumer_data]
 
-    def print_consumers(self) -> None:
+    def print_consumers(
+        self, tags: t.Optional[list[str]] = None, managed_only: bool = True
+    ) -> None:
         """Print all consumers."""
-        consumers: list[Consumer] = self.get_consumers()
+        consumers = self.get_consumers(tags=tags, managed_only=managed_only)
 
-        table = Table("Consumer")
+        table = Table("Consumer", "Tags")
         for consumer in consumers:
-            table.add_row(consumer.username)
+            table.add_row(consumer.username, " ".join(consumer.tags or []))
 
         console.print(table)
 
@@ -211,9 +598,11 @@ class GatewayManager:
         consumer_url = f"{self.consumers_url}/{consumer_name}"
         self._request(method="DELETE", url=consumer_url)
 
-    def add_consumer(self, consumer_name: str) -> None:
+    def add_consumer(
+        self, consumer_name: str, tags: t.Optional[list[str]] = None
+    ) -> None:
         """Add a consumer to Kong given its name."""
-        consumer = Consumer(username=consumer_name)
+        consumer = Consumer(username=consumer_name, tags=tags)
         self._request(method="POST", url=self.consumers_url, json=consumer.json())
 
     def add_jwt_cred(self, consumer_name: str) -> JwtCredential:
@@ -231,9 +620,7 @@ class GatewayManager:
         """Get all JWT credentials for a consumer given its name."""
         jwt_url = f"{self.consumers_url}/{consumer_name}/jwt"
 
-        resp = self._request(method="GET", url=jwt_url)
-        creds_data = resp.json()["data"]
-        return [JwtCredential.from_json(d) for d in creds_data]
+        return [JwtCredential.from_json(d) for d in self.iter_collection(jwt_url)]
 
     def print_jwt_creds(self, creds: list[JwtCredential]):
         """Print JWT credentials for a consumer."""
@@ -248,34 +635,76 @@ class GatewayManager:
         creds = self.get_jwt_creds(consumer_name)
         self.print_jwt_creds(creds)
 
-    def setup_global_kong_statsd_plugin(self) -> str:
-        """Install the kong statsd plugin on the kong admin API.
+    def delete_global_kong_metrics_plugins(self) -> None:
+        """Delete the plugins of all the metrics modes from the kong admin API."""
+        plugins_url = self.admin_url + "/plugins"
+
+        # Collected first, as deleting while paginating would skip plugins
+        plugin_ids = [
+            plugin["id"]
+            for plugin in self.iter_collection(plugins_url)
+            if plugin["name"] in METRICS_MODES and not plugin.get("route")
+        ]
+        for plugin_id in plugin_ids:
+            self._request(method="DELETE", url=f"{plugins_url}/{plugin_id}")
+
+    def setup_global_kong_metrics_plugin(
+        self, metrics_mode: str, statsd: StatsdSettings = StatsdSettings()
+    ) -> str:
+        """Install the kong plugin of a metrics mode on the kong admin API.
 
         This plugin is used to send metrics to Cockpit.
-        It is installed globally for all services.
+        It is installed globally for all services, replacing the plugin of the
+        other metrics mode if the gateway used it.
         """
-        plugins_url = self.admin_url + "/plugins"
+        self.delete_global_kong_metrics_plugins()
 
-        # Delete existing statsd plugin if it exists
-        resp = self._request(method="GET", url=plugins_url)
-        plugins = resp.json()["data"]
-        for plugin in plugins:
-            if plugin["name"] == "statsd":
-                self._request(method="DELETE", url=f"{plugins_url}/{plugin['id']}")
-                break
-
-        # Install statsd plugin
         resp = self._request(
             method="POST",
-            url=plugins_url,
-            json={
-                "name": "statsd",
-                "config": {
-                    "port": 8125,
-                    "prefix": "kong",
-                },
-            },
+            url=self.admin_url + "/plugins",
+            json=metrics_plugin_json(metrics_mode, statsd),
         )
         body_json = resp.json()
         plugin_id = body_json["id"]
         return plugin_id
+
+    def get_unmanaged_entities(self) -> dict[str, list[dict]]:
+        """Get the entities without the managed tag, by collection.
+
+        These were created by hand, or by a version of the CLI that did not tag
+        its entities yet, and are not listed by default.
+        """
+        unmanaged = {}
+        for collection in MANAGED_COLLECTIONS:
+            entities = self._iter_pages(f"{self.admin_url}/{collection}")
+            unmanaged[collection] = [
+                e for e in entities if MANAGED_TAG not in (e.get("tags") or [])
+            ]
+
+        return unmanaged
+
+    def tag_entities(
+        self,
+        entities: dict[str, list[dict]],
+        parallelism: int = DEFAULT_PARALLELISM,
+    ) -> None:
+        """Add the managed tag to entities, keeping their other tags."""
+        with futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+            tasks = [
+                executor.submit(
+                    self._request,
+                    method="PATCH",
+                    url=f"{self.admin_url}/{collection}/{entity['id']}",
+                    json={"tags": [MANAGED_TAG] + (entity.get("tags") or [])},
+                )
+                for collection, collection_entities in entities.items()
+                for entity in collection_entities
+            ]
+
+        # Raise the first error, if any
+        for task in tasks:
+            task.result()
+
+    def push_declarative_config(self, config: dict) -> None:
+        """Replace the whole configuration of a DB-less Kong node."""
+        self._request(method="POST", url=self.admin_url + "/config", json=config)
@@ -2,8 +2,12 @@
 # flake8: noqa
 from . import cockpit as cpt
 from . import container as cnt
+from . import dns as dns
 from . import function as fnc
 from . import image as image
 from . import rdb as rdb
 from . import secrets as secrets
+from . import statsd as statsd
+from . import tuning as tuning
+from . import vpc as vpc
 from .manager import InfraManager as InfraManager
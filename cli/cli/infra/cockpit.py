@@ -9,6 +9,7 @@ from scaleway_core.utils import WaitForOptions
 
 from cli import conf
 from cli.console import console
+from cli.model import METRICS_MODE_PROMETHEUS, METRICS_MODE_STATSD
 
 METRICS_TOKEN_NAME = "scw-gw-write-metrics"
 WRITE_METRICS_SCOPE = sdk.TokenScopes(
@@ -19,12 +20,19 @@ WRITE_METRICS_SCOPE = sdk.TokenScopes(
     write_logs=False,
     setup_logs_rules=False,
     setup_alerts=False,
+    query_traces=False,
+    write_traces=False,
 )
 
 # We create a temporary user to import the dashboard
 # This user will be deleted after the import
 GRAFANA_TEMPOARY_USER_LOGIN = "tmp-sls-gw-dashboard"
 KONG_STATSD_DASHBOARD_ID = "16897"
+KONG_PROMETHEUS_DASHBOARD_ID = "7424"
+KONG_DASHBOARD_IDS = {
+    METRICS_MODE_STATSD: KONG_STATSD_DASHBOARD_ID,
+    METRICS_MODE_PROMETHEUS: KONG_PROMETHEUS_DASHBOARD_ID,
+}
 
 # TODO: this could be modified by the user
 METRICS_DATASOURCE_NAME = "Metrics"
@@ -133,10 +141,12 @@ def get_metrics_data_source_uid(grafana_url: str, auth: HTTPBasicAuth) -> str:
     return resp.json().get("uid")
 
 
-def import_kong_statsd_dashboard(
-    api: sdk.CockpitV1Beta1API, user: sdk.GrafanaUser
+def import_kong_dashboard(
+    api: sdk.CockpitV1Beta1API,
+    user: sdk.GrafanaUser,
+    dashboard_id: str = KONG_STATSD_DASHBOARD_ID,
 ) -> str:
-    """Import the Kong StatsD dashboard into Grafana
+    """Import a Kong dashboard into Grafana, the StatsD one by default
 
     Returns the url of the imported dashboard
     """
@@ -148,7 +158,7 @@ def import_kong_statsd_dashboard(
 
     # We first get the dashboard from gnet as a json to import it
     resp = requests.get(
-        url=url + f"/api/gnet/dashboards/{KONG_STATSD_DASHBOARD_ID}",
+        url=url + f"/api/gnet/dashboards/{dashboard_id}",
         auth=basic,
         timeout=5,
     )
@@ -1,8 +1,28 @@
+import dataclasses
+import typing as t
+from dataclasses import dataclass
+
 import scaleway.container.v1beta1 as sdk
 
 from cli.conf import DB_DATABASE_NAME
-from cli.infra.image import IMAGE_TAG
-from cli.infra.rdb import DB_USERNAME
+from cli.infra.dns import DnsSettings, get_dns_env_vars
+from cli.infra.image import IMAGE_SLIM_TAG, get_image_tag
+from cli.infra.rdb import DB_RESERVED_CONNECTIONS, DB_USERNAME
+from cli.infra.statsd import get_statsd_env_vars, get_statsd_settings
+from cli.infra.tuning import (
+    DEFAULT_TUNING_PROFILE,
+    PROXY_CACHE_MEMORY_RATIO,
+    TUNING_PROFILES,
+    get_tuning_env_vars,
+    get_tuning_profile,
+    get_worker_processes,
+)
+from cli.model import (
+    DEFAULT_METRICS_MODE,
+    METRICS_MODE_STATSD,
+    PROXY_CACHE_DICTIONARY,
+    StatsdSettings,
+)
 
 CONTAINER_NAMESPACE = "scw-sls-gw"
 
@@ -11,18 +31,145 @@ CONTAINER_MIN_SCALE = 1
 CONTAINER_MAX_SCALE = 5
 CONTAINER_CPU_LIMIT = 2000
 CONTAINER_MEMORY_LIMIT = 1024
+# Requests handled by an instance at once before the gateway scales out
+CONTAINER_MAX_CONCURRENCY = 50
 
 CONTAINER_ADMIN_NAME = "scw-sls-gw-admin"
 CONTAINER_ADMIN_MIN_SCALE = 1
 CONTAINER_ADMIN_MAX_SCALE = 1
 CONTAINER_ADMIN_MEMORY_LIMIT = 1024
 CONTAINER_ADMIN_PORT = 8001
+# The admin API has little traffic, a single worker keeps its connections low
+CONTAINER_ADMIN_WORKER_PROCESSES = 1
+
+# Database timeouts of Kong, in ms. Idle connections are closed sooner than the
+# default of 60s to give them back when the traffic of an instance drops.
+PG_TIMEOUT = 5000
+PG_KEEPALIVE_TIMEOUT = 30000
+
+# Entities loaded in memory when Kong starts, instead of on their first use
+DEFAULT_CACHE_WARMUP_ENTITIES = [
+    "services",
+    "routes",
+    "plugins",
+    "consumers",
+    "jwt_secrets",
+]
+CACHE_WARMUP_ENV_VAR = "KONG_DB_CACHE_WARMUP_ENTITIES"
+# Entities of Kong and of its bundled plugins that can be warmed up, Kong refuses
+# to start with any other name
+CACHE_WARMUP_ENTITIES = [
+    *DEFAULT_CACHE_WARMUP_ENTITIES,
+    "upstreams",
+    "targets",
+    "certificates",
+    "snis",
+    "ca_certificates",
+    "vaults",
+    "keys",
+    "key_sets",
+    "acls",
+    "basicauth_credentials",
+    "hmacauth_credentials",
+    "keyauth_credentials",
+    "oauth2_credentials",
+]
+
+
+@dataclass(frozen=True)
+class ScalingPolicy:
+    """Autoscaling and resources of the gateway container.
+
+    The CPU limit is in mVCPU and the memory limit in MB.
+    """
+
+    min_scale: int = CONTAINER_MIN_SCALE
+    max_scale: int = CONTAINER_MAX_SCALE
+    max_concurrency: int = CONTAINER_MAX_CONCURRENCY
+    cpu_limit: int = CONTAINER_CPU_LIMIT
+    memory_limit: int = CONTAINER_MEMORY_LIMIT
+
+    def __post_init__(self):
+        if self.min_scale < 0 or self.max_scale < 1:
+            raise ValueError("Scale must be positive, with at least one instance")
+        if self.min_scale > self.max_scale:
+            raise ValueError(
+                f"Min scale {self.min_scale} is above max scale {self.max_scale}"
+            )
+        if self.max_concurrency < 1:
+            raise ValueError("Max concurrency must be at least 1")
+
+    @staticmethod
+    def from_container(container: sdk.Container) -> "ScalingPolicy":
+        """Get the scaling policy a container is deployed with."""
+        return ScalingPolicy(
+            min_scale=container.min_scale,
+            max_scale=container.max_scale,
+            max_concurrency=container.max_concurrency or CONTAINER_MAX_CONCURRENCY,
+            cpu_limit=container.cpu_limit,
+            memory_limit=container.memory_limit,
+        )
+
+    def replace(self, **changes: t.Optional[int]) -> "ScalingPolicy":
+        """Get a copy of the policy, with the changes that are set."""
+        return dataclasses.replace(
+            self, **{k: v for k, v in changes.items() if v is not None}
+        )
+
+
+@dataclass(frozen=True)
+class KongSettings:
+    """Settings of the Kong gateway container, kept in its environment.
+
+    Without a database, all entities are already in memory and the cache
+    warm-up entities are ignored.
+    """
+
+    tuning_profile: str = DEFAULT_TUNING_PROFILE
+    cache_warmup_entities: list[str] = dataclasses.field(
+        default_factory=lambda: list(DEFAULT_CACHE_WARMUP_ENTITIES)
+    )
+    scaling: ScalingPolicy = ScalingPolicy()
+    dns: DnsSettings = DnsSettings()
+    metrics_mode: str = DEFAULT_METRICS_MODE
+    statsd: StatsdSettings = StatsdSettings()
+
+    @staticmethod
+    def from_container(container: sdk.Container) -> "KongSettings":
+        """Get the settings a container is deployed with."""
+        return KongSettings(
+            tuning_profile=get_tuning_profile(container),
+            cache_warmup_entities=get_cache_warmup_entities(container),
+            scaling=ScalingPolicy.from_container(container),
+            dns=DnsSettings.from_container(container),
+            metrics_mode=get_metrics_mode(container),
+            statsd=get_statsd_settings(container),
+        )
+
+    def replace(self, **changes: t.Any) -> "KongSettings":
+        """Get a copy of the settings, with the changes that are set."""
+        return dataclasses.replace(
+            self, **{k: v for k, v in changes.items() if v is not None}
+        )
+
+
+@dataclass(frozen=True)
+class KongDatabase:
+    """Connection of Kong to its database, and to its read replica if any."""
+
+    host: str
+    port: int
+    password: str
+    ro_host: t.Optional[str] = None
+    ro_port: t.Optional[int] = None
+    pg_pool_size: t.Optional[int] = None
 
 
 def create_namespace(api: sdk.ContainerV1Beta1API) -> sdk.Namespace:
     """Create a namespace for the containers."""
     return api.create_namespace(
         name=CONTAINER_NAMESPACE,
+        activate_vpc_integration=True,
     )
 
 
@@ -53,6 +200,17 @@ def get_container_by_name(
     return containers[0]
 
 
+def get_proxy_cache_env_vars(memory_limit: int) -> dict[str, str]:
+    """Get the environment variables declaring the response cache.
+
+    The cache is an nginx shared dict, sized from the container memory limit.
+    """
+    size_mb = max(1, int(memory_limit * PROXY_CACHE_MEMORY_RATIO))
+    return {
+        "KONG_NGINX_HTTP_LUA_SHARED_DICT": f"{PROXY_CACHE_DICTIONARY} {size_mb}m",
+    }
+
+
 def get_base_container_env_vars(db_host: str, db_port: int) -> dict[str, str]:
     """Get the base environment variables for the container."""
     return {
@@ -63,6 +221,63 @@ def get_base_container_env_vars(db_host: str, db_port: int) -> dict[str, str]:
     }
 
 
+def get_read_replica_env_vars(db_ro_host: str, db_ro_port: int) -> dict[str, str]:
+    """Get the environment variables sending the reads of Kong to a read replica.
+
+    The user, password and database default to the ones of the primary.
+    """
+    return {
+        "KONG_PG_RO_HOST": db_ro_host,
+        "KONG_PG_RO_PORT": str(db_ro_port),
+    }
+
+
+def get_pg_pool_size(
+    max_connections: int,
+    tuning_profile: str = DEFAULT_TUNING_PROFILE,
+    scaling: ScalingPolicy = ScalingPolicy(),
+) -> int:
+    """Get the number of database connections each Kong worker can open.
+
+    Each worker has its own pool. The connections of the database are split
+    between the workers of all gateway instances at their maximum scale, and the
+    worker of the admin container.
+    """
+    gateway_workers = get_worker_processes(
+        TUNING_PROFILES[tuning_profile], scaling.cpu_limit, scaling.memory_limit
+    )
+    workers = scaling.max_scale * gateway_workers + CONTAINER_ADMIN_WORKER_PROCESSES
+
+    return max(1, (max_connections - DB_RESERVED_CONNECTIONS) // workers)
+
+
+def get_pg_pool_env_vars(pg_pool_size: int) -> dict[str, str]:
+    """Get the environment variables limiting the database connections of Kong.
+
+    Queries above the pool size wait for a connection instead of opening one.
+    """
+    return {
+        "KONG_PG_POOL_SIZE": str(pg_pool_size),
+        "KONG_PG_MAX_CONCURRENT_QUERIES": str(pg_pool_size),
+        "KONG_PG_TIMEOUT": str(PG_TIMEOUT),
+        "KONG_PG_KEEPALIVE_TIMEOUT": str(PG_KEEPALIVE_TIMEOUT),
+    }
+
+
+def get_cache_warmup_env_vars(entities: list[str]) -> dict[str, str]:
+    """Get the environment variables warming up the entity cache of Kong."""
+    return {CACHE_WARMUP_ENV_VAR: ",".join(entities)}
+
+
+def get_cache_warmup_entities(container: sdk.Container) -> list[str]:
+    """Get the entities a container warms up its cache with."""
+    env_vars = container.environment_variables or {}
+    if CACHE_WARMUP_ENV_VAR not in env_vars:
+        return DEFAULT_CACHE_WARMUP_ENTITIES
+
+    return [e for e in env_vars[CACHE_WARMUP_ENV_VAR].split(",") if e]
+
+
 def get_base_secret_env_vars(db_password: str) -> list[sdk.Secret]:
     """Get the secret environment variables for the container."""
     return [
@@ -70,52 +285,145 @@ def get_base_secret_env_vars(db_password: str) -> list[sdk.Secret]:
     ]
 
 
-def create_kong_container(
-    api: sdk.ContainerV1Beta1API,
-    namespace_id: str,
-    db_host: str,
-    db_port: int,
-    db_password: str,
-    metrics_token: str | None,
-    metrics_push_url: str | None,
-) -> sdk.Container:
-    """Create the Kong container."""
-    env_vars = get_base_container_env_vars(db_host=db_host, db_port=db_port)
-    secret_env_vars = get_base_secret_env_vars(db_password=db_password)
+def get_db_less_env_vars(
+    declarative_config: str,
+) -> tuple[dict[str, str], list[sdk.Secret]]:
+    """Get the environment variables to run Kong without a database.
+
+    The declarative config holds JWT secrets, so it is passed as a secret.
+    """
+    env_vars = {"KONG_DATABASE": "off"}
+    secret_env_vars = [
+        sdk.Secret(key="KONG_DECLARATIVE_CONFIG_STRING", value=declarative_config),
+    ]
+    return env_vars, secret_env_vars
+
+
+def is_db_less(container: sdk.Container) -> bool:
+    """Check if a Kong container runs without a database."""
+    env_vars = container.environment_variables or {}
+    return env_vars.get("KONG_DATABASE") == "off"
+
+
+def get_metrics_mode(container: sdk.Container) -> str:
+    """Get the metrics mode of a Kong container."""
+    env_vars = container.environment_variables or {}
+    return env_vars.get("METRICS_MODE", DEFAULT_METRICS_MODE)
+
+
+def get_kong_env_vars(
+    settings: KongSettings,
+    database: KongDatabase | None = None,
+    declarative_config: str | None = None,
+    metrics_token: str | None = None,
+    metrics_push_url: str | None = None,
+) -> tuple[dict[str, str], list[sdk.Secret]]:
+    """Get the environment variables of the Kong container.
+
+    Without a database, all entities are already in memory and are not warmed up.
+    With a read replica, the cache misses of the gateway are read from it.
+    """
+    if declarative_config:
+        env_vars, secret_env_vars = get_db_less_env_vars(declarative_config)
+    elif database:
+        env_vars = get_base_container_env_vars(
+            db_host=database.host, db_port=database.port
+        )
+        secret_env_vars = get_base_secret_env_vars(db_password=database.password)
+        env_vars.update(get_cache_warmup_env_vars(settings.cache_warmup_entities))
+        if database.ro_host and database.ro_port:
+            env_vars.update(
+                get_read_replica_env_vars(database.ro_host, database.ro_port)
+            )
+        if database.pg_pool_size:
+            env_vars.update(get_pg_pool_env_vars(database.pg_pool_size))
+    else:
+        raise ValueError("Kong needs either a database or a declarative config")
+
+    scaling = settings.scaling
+    env_vars.update(get_dns_env_vars(settings.dns))
+    env_vars.update(get_proxy_cache_env_vars(scaling.memory_limit))
+    env_vars.update(
+        get_tuning_env_vars(
+            settings.tuning_profile, scaling.cpu_limit, scaling.memory_limit
+        )
+    )
 
     if metrics_token and metrics_push_url:
         secret_env_vars.append(sdk.Secret("COCKPIT_METRICS_TOKEN", metrics_token))
         env_vars["FORWARD_METRICS"] = "1"
         env_vars["COCKPIT_METRICS_PUSH_URL"] = metrics_push_url
+        env_vars["METRICS_MODE"] = settings.metrics_mode
+        if settings.metrics_mode == METRICS_MODE_STATSD:
+            env_vars.update(get_statsd_env_vars(settings.statsd))
+
+    return env_vars, secret_env_vars
+
+
+def create_kong_container(
+    api: sdk.ContainerV1Beta1API,
+    namespace_id: str,
+    settings: KongSettings,
+    database: KongDatabase | None = None,
+    declarative_config: str | None = None,
+    metrics_token: str | None = None,
+    metrics_push_url: str | None = None,
+    private_network_id: str | None = None,
+) -> sdk.Container:
+    """Create the Kong container."""
+    env_vars, secret_env_vars = get_kong_env_vars(
+        settings,
+        database=database,
+        declarative_config=declarative_config,
+        metrics_token=metrics_token,
+        metrics_push_url=metrics_push_url,
+    )
+    scaling = settings.scaling
 
     return api.create_container(
         namespace_id=namespace_id,
         name=CONTAINER_NAME,
-        cpu_limit=CONTAINER_CPU_LIMIT,
-        memory_limit=CONTAINER_MEMORY_LIMIT,
-        min_scale=CONTAINER_MIN_SCALE,
-        max_scale=CONTAINER_MAX_SCALE,
+        cpu_limit=scaling.cpu_limit,
+        memory_limit=scaling.memory_limit,
+        min_scale=scaling.min_scale,
+        max_scale=scaling.max_scale,
+        max_concurrency=scaling.max_concurrency,
         privacy=sdk.ContainerPrivacy.PUBLIC,
         protocol=sdk.ContainerProtocol.HTTP1,
         http_option=sdk.ContainerHttpOption.REDIRECTED,
-        registry_image=IMAGE_TAG,
+        registry_image=get_image_tag("FORWARD_METRICS" in env_vars),
         environment_variables=env_vars,
         secret_environment_variables=secret_env_vars,
+        private_network_id=private_network_id,
     )
 
 
+def get_kong_admin_env_vars(database: KongDatabase) -> dict[str, str]:
+    """Get the environment variables of the Kong admin container.
+
+    The admin container always writes to the primary database.
+    """
+    env_vars = get_base_container_env_vars(db_host=database.host, db_port=database.port)
+    env_vars["IS_ADMIN_CONTAINER"] = "1"
+    env_vars["KONG_NGINX_WORKER_PROCESSES"] = str(CONTAINER_ADMIN_WORKER_PROCESSES)
+    env_vars.update(get_proxy_cache_env_vars(CONTAINER_ADMIN_MEMORY_LIMIT))
+
+    if database.pg_pool_size:
+        env_vars.update(get_pg_pool_env_vars(database.pg_pool_size))
+
+    return env_vars
+
+
 def create_kong_admin_container(
     api: sdk.ContainerV1Beta1API,
     namespace_id: str,
-    db_host: str,
-    db_port: int,
-    db_password: str,
+    database: KongDatabase,
+    private_network_id: str | None = None,
 ) -> sdk.Container:
     """Create the Kong admin container."""
-    env_vars = get_base_container_env_vars(db_host=db_host, db_port=db_port)
-    env_vars["IS_ADMIN_CONTAINER"] = "1"
+    env_vars = get_kong_admin_env_vars(database)
 
-    secret_env_vars = get_base_secret_env_vars(db_password=db_password)
+    secret_env_vars = get_base_secret_env_vars(db_password=database.password)
 
     return api.create_container(
         namespace_id=namespace_id,
@@ -127,56 +435,60 @@ def create_kong_admin_container(
         privacy=sdk.ContainerPrivacy.PRIVATE,
         protocol=sdk.ContainerProtocol.HTTP1,
         http_option=sdk.ContainerHttpOption.REDIRECTED,
-        registry_image=IMAGE_TAG,
+        registry_image=IMAGE_SLIM_TAG,
         environment_variables=env_vars,
         secret_environment_variables=secret_env_vars,
+        private_network_id=private_network_id,
     )
 
 
 def update_kong_container(
     api: sdk.ContainerV1Beta1API,
     container_id: str,
-    db_host: str,
-    db_port: int,
-    db_password: str,
-    metrics_token: str | None,
-    metrics_push_url: str | None,
+    settings: KongSettings,
+    database: KongDatabase | None = None,
+    declarative_config: str | None = None,
+    metrics_token: str | None = None,
+    metrics_push_url: str | None = None,
+    private_network_id: str | None = None,
 ) -> sdk.Container:
-    """Create the Kong container."""
-    env_vars = get_base_container_env_vars(db_host=db_host, db_port=db_port)
-    secret_env_vars = get_base_secret_env_vars(db_password=db_password)
-
-    if metrics_token and metrics_push_url:
-        secret_env_vars.append(sdk.Secret("COCKPIT_METRICS_TOKEN", metrics_token))
-        env_vars["FORWARD_METRICS"] = "1"
-        env_vars["COCKPIT_METRICS_PUSH_URL"] = metrics_push_url
+    """Update the Kong container."""
+    env_vars, secret_env_vars = get_kong_env_vars(
+        settings,
+        database=database,
+        declarative_config=declarative_config,
+        metrics_token=metrics_token,
+        metrics_push_url=metrics_push_url,
+    )
+    scaling = settings.scaling
 
     return api.update_container(
         container_id=container_id,
-        memory_limit=CONTAINER_MEMORY_LIMIT,
-        min_scale=CONTAINER_MIN_SCALE,
-        max_scale=CONTAINER_MAX_SCALE,
+        cpu_limit=scaling.cpu_limit,
+        memory_limit=scaling.memory_limit,
+        min_scale=scaling.min_scale,
+        max_scale=scaling.max_scale,
+        max_concurrency=scaling.max_concurrency,
         privacy=sdk.ContainerPrivacy.PUBLIC,
         protocol=sdk.ContainerProtocol.HTTP1,
         http_option=sdk.ContainerHttpOption.REDIRECTED,
-        registry_image=IMAGE_TAG,
+        registry_image=get_image_tag("FORWARD_METRICS" in env_vars),
         environment_variables=env_vars,
         secret_environment_variables=secret_env_vars,
+        private_network_id=private_network_id,
     )
 
 
 def update_kong_admin_container(
     api: sdk.ContainerV1Beta1API,
     container_id: str,
-    db_host: str,
-    db_port: int,
-    db_password: str,
+    database: KongDatabase,
+    private_network_id: str | None = None,
 ) -> sdk.Container:
-    """Create the Kong admin container."""
-    env_vars = get_base_container_env_vars(db_host=db_host, db_port=db_port)
-    env_vars["IS_ADMIN_CONTAINER"] = "1"
+    """Update the Kong admin container."""
+    env_vars = get_kong_admin_env_vars(database)
 
-    secret_env_vars = get_base_secret_env_vars(db_password=db_password)
+    secret_env_vars = get_base_secret_env_vars(db_password=database.password)
 
     return api.update_container(
         container_id=container_id,
@@ -187,7 +499,27 @@ def update_kong_admin_container(
         privacy=sdk.ContainerPrivacy.PRIVATE,
         protocol=sdk.ContainerProtocol.HTTP1,
         http_option=sdk.ContainerHttpOption.REDIRECTED,
-        registry_image=IMAGE_TAG,
+        registry_image=IMAGE_SLIM_TAG,
         environment_variables=env_vars,
         secret_environment_variables=secret_env_vars,
+        private_network_id=private_network_id,
+    )
+
+
+def update_kong_container_scaling(
+    api: sdk.ContainerV1Beta1API, container_id: str, scaling: ScalingPolicy
+) -> sdk.Container:
+    """Update the scale of the Kong container, without redeploying it.
+
+    The environment is left as it is, so the resources must not change.
+    """
+    return api.update_container(
+        container_id=container_id,
+        min_scale=scaling.min_scale,
+        max_scale=scaling.max_scale,
+        max_concurrency=scaling.max_concurrency,
+        privacy=sdk.ContainerPrivacy.PUBLIC,
+        protocol=sdk.ContainerProtocol.HTTP1,
+        http_option=sdk.ContainerHttpOption.REDIRECTED,
+        redeploy=False,
     )
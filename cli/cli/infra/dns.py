@@ -0,0 +1,86 @@
+import dataclasses
+import socket
+import time
+import typing as t
+from dataclasses import dataclass
+
+import scaleway.container.v1beta1 as sdk
+
+# Record types Kong looks up in order, LAST being the type that last succeeded.
+# Function domains have no SRV records, looking them up first costs a query.
+DEFAULT_DNS_ORDER = "LAST,A,CNAME"
+DNS_RECORD_TYPES = ["LAST", "SRV", "A", "AAAA", "CNAME"]
+
+# Seconds an expired record is still used while it is refreshed in the
+# background, so that a slow or failing resolver does not fail requests
+DEFAULT_DNS_STALE_TTL = 60
+DEFAULT_DNS_NOT_FOUND_TTL = 30
+
+
+@dataclass(frozen=True)
+class DnsSettings:
+    """Settings of the DNS client of Kong, resolving the hosts of the targets.
+
+    Kong caches the records for their TTL, unless a valid TTL overrides it. The
+    resolver is the one of the container, unless one is given as ip[:port].
+    """
+
+    stale_ttl: int = DEFAULT_DNS_STALE_TTL
+    valid_ttl: t.Optional[int] = None
+    not_found_ttl: int = DEFAULT_DNS_NOT_FOUND_TTL
+    order: str = DEFAULT_DNS_ORDER
+    resolver: t.Optional[str] = None
+
+    def __post_init__(self):
+        unknown = set(self.order.split(",")) - set(DNS_RECORD_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown DNS record types {','.join(sorted(unknown))}")
+
+    @staticmethod
+    def from_container(container: sdk.Container) -> "DnsSettings":
+        """Get the DNS settings a container is deployed with."""
+        env_vars = container.environment_variables or {}
+        valid_ttl = env_vars.get("KONG_DNS_VALID_TTL")
+        return DnsSettings(
+            stale_ttl=int(env_vars.get("KONG_DNS_STALE_TTL", DEFAULT_DNS_STALE_TTL)),
+            valid_ttl=int(valid_ttl) if valid_ttl else None,
+            not_found_ttl=int(
+                env_vars.get("KONG_DNS_NOT_FOUND_TTL", DEFAULT_DNS_NOT_FOUND_TTL)
+            ),
+            order=env_vars.get("KONG_DNS_ORDER", DEFAULT_DNS_ORDER),
+            resolver=env_vars.get("KONG_DNS_RESOLVER"),
+        )
+
+    def replace(self, **changes: t.Any) -> "DnsSettings":
+        """Get a copy of the settings, with the changes that are set."""
+        return dataclasses.replace(
+            self, **{k: v for k, v in changes.items() if v is not None}
+        )
+
+
+def get_dns_env_vars(dns: DnsSettings) -> dict[str, str]:
+    """Get the environment variables configuring the DNS client of Kong."""
+    env_vars = {
+        "KONG_DNS_STALE_TTL": str(dns.stale_ttl),
+        "KONG_DNS_NOT_FOUND_TTL": str(dns.not_found_ttl),
+        "KONG_DNS_ORDER": dns.order,
+    }
+    if dns.valid_ttl:
+        env_vars["KONG_DNS_VALID_TTL"] = str(dns.valid_ttl)
+    if dns.resolver:
+        env_vars["KONG_DNS_RESOLVER"] = dns.resolver
+
+    return env_vars
+
+
+def resolve_host(host: str) -> tuple[list[str], float]:
+    """Resolve a host with the resolver of this machine.
+
+    Returns its addresses, and the time the resolution took in ms.
+    """
+    start = time.perf_counter()
+    infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+    return addresses, elapsed_ms
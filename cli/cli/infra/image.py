@@ -8,3 +8,14 @@ IMAGE_NAME = "serverless-gateway"
 IMAGE_VERSION = version("scw-gateway")
 
 IMAGE_TAG = f"{IMAGE_REGISTRY}/{IMAGE_ORG}/{IMAGE_NAME}:{IMAGE_VERSION}"
+
+# Same image without the Grafana Agent, which is smaller to pull on cold starts
+IMAGE_SLIM_TAG = f"{IMAGE_TAG}-slim"
+
+
+def get_image_tag(forward_metrics: bool) -> str:
+    """Get the image of a gateway container.
+
+    Only containers forwarding metrics need the Grafana Agent of the full image.
+    """
+    return IMAGE_TAG if forward_metrics else IMAGE_SLIM_TAG
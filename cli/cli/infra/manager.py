@@ -1,6 +1,7 @@
 import socket
 import typing as t
 from concurrent import futures
+from urllib.parse import urlsplit
 
 import click
 import scaleway.cockpit.v1beta1 as cpt
@@ -8,12 +9,14 @@ import scaleway.container.v1beta1 as cnt
 import scaleway.function.v1beta1 as fnc
 import scaleway.rdb.v1 as rdb
 import scaleway.secret.v1alpha1 as sec
+import scaleway.vpc.v2 as vpc
 from loguru import logger
 from rich.table import Table
 from scaleway import Client, ScalewayException
 from scaleway_core.utils import WaitForOptions
 
 from cli import conf, infra
+from cli.model import DEFAULT_METRICS_MODE, Route, StatsdSettings
 
 from ..console import console
 
@@ -44,14 +47,15 @@ class InfraManager:
         self.rdb = rdb.RdbV1API(self.scw_client, bypass_validation=True)
         self.secrets = sec.SecretV1Alpha1API(self.scw_client, bypass_validation=True)
         self.cockpit = cpt.CockpitV1Beta1API(self.scw_client, bypass_validation=True)
+        self.vpc = vpc.VpcV2API(self.scw_client, bypass_validation=True)
 
-    def set_up_config(self, is_local: bool) -> None:
+    def set_up_config(self, is_local: bool, local_variant: str = "traditional") -> None:
         """Set up the configuration for the gateway.
 
         Used by the GatewayManager to set up the route configuration.
         """
         if is_local:
-            config = conf.InfraConfiguration.from_local()
+            config = conf.InfraConfiguration.from_local(local_variant)
         else:
             config = conf.InfraConfiguration.from_infra(self)
         config.save()
@@ -105,17 +109,16 @@ class InfraManager:
         return instance
 
     def _get_database_endpoint_or_abort(
-        self, database_instance: rdb.Instance
+        self, database_instance: rdb.Instance, private: bool = False
     ) -> tuple[str, int]:
-        endpoints = database_instance.endpoints
-        if not endpoints:
+        endpoint = infra.rdb.get_endpoint(database_instance, private=private)
+        if not endpoint:
             console.print(
                 f"Database instance {database_instance.name} has no endpoints",
                 style="bold red",
             )
             raise click.Abort()
 
-        endpoint = endpoints[0]
         address = endpoint.ip or endpoint.hostname
         if not address:
             console.print(
@@ -126,6 +129,40 @@ class InfraManager:
 
         return address, endpoint.port
 
+    def _get_container_private_network_id(
+        self, namespace: cnt.Namespace, database_instance: rdb.Instance
+    ) -> str | None:
+        """Get the private network the containers join to reach the database."""
+        endpoint = infra.rdb.get_endpoint(database_instance, private=True)
+        if not endpoint or not endpoint.private_network:
+            return None
+
+        if not infra.vpc.is_namespace_in_private_network(namespace):
+            console.print(
+                f"Namespace {namespace.name} has no VPC integration, "
+                "containers use the public endpoint of the database",
+                style="yellow",
+            )
+            return None
+
+        return endpoint.private_network.private_network_id
+
+    def _get_read_replica_endpoint(
+        self, database_instance: rdb.Instance
+    ) -> tuple[str | None, int | None]:
+        """Get the endpoint of the read replica, if the database has a ready one."""
+        read_replica = infra.rdb.get_read_replica(database_instance)
+        if not read_replica or read_replica.status != rdb.ReadReplicaStatus.READY:
+            return None, None
+
+        for endpoint in read_replica.endpoints:
+            address = endpoint.ip or endpoint.hostname
+            if address:
+                return address, endpoint.port
+
+        logger.debug(f"Read replica {read_replica.id} has no address, skipping")
+        return None, None
+
     def _get_db_password_or_abort(self) -> str:
         try:
             password = infra.secrets.get_db_password(self.secrets)
@@ -154,8 +191,17 @@ class InfraManager:
         container = self._get_admin_container_or_abort()
         return container.domain_name
 
-    def create_db(self) -> rdb.Instance:
-        """Create the database instance."""
+    def create_db(
+        self,
+        node_type: str = infra.rdb.DB_NODE_TYPE,
+        is_ha_cluster: bool = False,
+        volume_type: str = infra.rdb.DB_VOLUME_TYPE,
+        volume_size: int = infra.rdb.DB_VOLUME_SIZE,
+    ) -> rdb.Instance:
+        """Create the database instance.
+
+        An existing instance is kept as it is, whatever its size.
+        """
 
         instance_name = infra.rdb.DB_INSTANCE_NAME
         instance = infra.rdb.get_database_instance_by_name(self.rdb, instance_name)
@@ -171,7 +217,14 @@ class InfraManager:
         logger.debug("Saving database password")
         infra.secrets.create_db_password_secret(self.secrets, password)
 
-        instance = infra.rdb.create_database_instance(self.rdb, password)
+        instance = infra.rdb.create_database_instance(
+            self.rdb,
+            password,
+            node_type=node_type,
+            is_ha_cluster=is_ha_cluster,
+            volume_type=volume_type,
+            volume_size=volume_size,
+        )
         return instance
 
     def check_db(self):
@@ -179,6 +232,44 @@ class InfraManager:
         instance = self._get_database_instance_or_abort()
         console.print(f"Database status: {instance.status}", style="bold")
 
+        read_replica = infra.rdb.get_read_replica(instance)
+        if read_replica:
+            console.print(
+                f"Database read replica status: {read_replica.status}", style="bold"
+            )
+
+    def create_db_read_replica(self) -> rdb.ReadReplica:
+        """Create a read replica of the database instance."""
+        instance = self._get_database_instance_or_abort()
+
+        read_replica = infra.rdb.get_read_replica(instance)
+        if read_replica:
+            console.print("Kong database read replica already exists")
+            return read_replica
+
+        logger.debug(f"Creating read replica of database instance {instance.name}")
+        return infra.rdb.create_read_replica(self.rdb, instance.id)
+
+    def await_db_read_replica(self) -> None:
+        """Wait for the read replica of the database instance to be ready."""
+        instance = self._get_database_instance_or_abort()
+        read_replica = infra.rdb.get_read_replica(instance)
+        if not read_replica:
+            console.print("Database has no read replica", style="bold red")
+            raise click.Abort()
+
+        options: WaitForOptions[rdb.ReadReplica, bool] = WaitForOptions()
+        options.timeout = conf.RESOURCE_AWAIT_TIMEOUT_SECONDS
+
+        read_replica = self.rdb.wait_for_read_replica(
+            read_replica_id=read_replica.id,
+            options=options,
+        )
+
+        if read_replica.status != rdb.ReadReplicaStatus.READY:
+            console.print("Database read replica is not ready", style="bold red")
+            raise click.Abort()
+
     def await_db(self, on_tick: t.Callable[[rdb.Instance], None]) -> None:
         """Wait for the database instance to be ready."""
         instance = self._get_database_instance_or_abort()
@@ -200,6 +291,71 @@ class InfraManager:
             console.print("Database is not ready", style="bold red")
             raise click.Abort()
 
+    def create_private_network(self) -> None:
+        """Create the private network, and attach the database instance to it."""
+        private_network_name = infra.vpc.PRIVATE_NETWORK_NAME
+        private_network = infra.vpc.get_private_network_by_name(
+            self.vpc, private_network_name
+        )
+        if private_network:
+            console.print("Private network already exists")
+        else:
+            logger.debug(f"Creating private network {private_network_name}")
+            private_network = infra.vpc.create_private_network(self.vpc)
+
+        instance = self._get_database_instance_or_abort()
+        if infra.rdb.get_endpoint(instance, private=True):
+            console.print("Kong database already attached to the private network")
+            return
+
+        logger.debug(f"Attaching database instance {instance.name}")
+        infra.rdb.create_private_endpoint(self.rdb, instance.id, private_network.id)
+
+    def delete_private_network(self) -> None:
+        """Delete the private network."""
+        private_network = infra.vpc.get_private_network_by_name(
+            self.vpc, infra.vpc.PRIVATE_NETWORK_NAME
+        )
+        if not private_network:
+            logger.debug("Private network not found, skipping")
+            return
+
+        try:
+            self.vpc.delete_private_network(private_network_id=private_network.id)
+            console.print("Private network deleted")
+        except ScalewayException as exception:
+            logger.debug(f"Could not delete private network: {exception}")
+            console.print(
+                f"Private network {private_network.name} is still in use, "
+                "delete it once the database and containers are deleted",
+                style="yellow",
+            )
+
+    def check_db_latency(self) -> None:
+        """Print the round trip time to the public and private database endpoints.
+
+        The private endpoint is only reachable from the private network.
+        """
+        instance = self._get_database_instance_or_abort()
+
+        table = Table("Path", "Endpoint", "Round trip")
+        for private in (False, True):
+            path = "private" if private else "public"
+            endpoint = infra.rdb.get_endpoint(instance, private=private)
+            address = endpoint and (endpoint.ip or endpoint.hostname)
+            if not endpoint or not address:
+                table.add_row(path, "-", "not configured")
+                continue
+
+            try:
+                round_trip = infra.rdb.measure_round_trip(address, endpoint.port)
+                result = f"{round_trip:.1f}ms"
+            except OSError:
+                result = "unreachable"
+            table.add_row(path, f"{address}:{endpoint.port}", result)
+
+        console.print(table)
+
     def delete_db(self) -> None:
         """Delete the database instance."""
         # Delete the secret
@@ -209,9 +365,19 @@ class InfraManager:
         try:
             instance = self._get_database_instance_or_abort()
             self.rdb.delete_instance(instance_id=instance.id)
-            console.print("Kong database deleted")
         except click.Abort:
             logger.debug("Database not found, skipping")
+            return
+
+        # The private endpoint is only released once the instance is deleted
+        options: WaitForOptions[rdb.Instance, bool] = WaitForOptions()
+        options.timeout = conf.RESOURCE_AWAIT_TIMEOUT_SECONDS
+        try:
+            self.rdb.wait_for_instance(instance_id=instance.id, options=options)
+        except ScalewayException as exception:
+            if exception.status_code != 404:
+                raise exception
+        console.print("Kong database deleted")
 
     def create_namespace(self):
         """Create the namespace for the gateway."""
@@ -262,38 +428,43 @@ class InfraManager:
         try:
             namespace = self._get_namespace_or_abort()
             self.containers.delete_namespace(namespace_id=namespace.id)
-            console.print("Kong container namespace deleted")
         except click.Abort:
             logger.debug("Namespace not found, skipping")
+            return
 
-    def create_containers(self) -> None:
-        """Create containers for Kong and Kong Admin."""
-        database_instance = self._get_database_instance_or_abort()
-        db_password = self._get_db_password_or_abort()
-        db_host, db_port = self._get_database_endpoint_or_abort(database_instance)
-
+        # The containers leave the private network once they are deleted
+        options: WaitForOptions[cnt.Namespace, bool] = WaitForOptions()
+        options.timeout = conf.RESOURCE_AWAIT_TIMEOUT_SECONDS
+        try:
+            self.containers.wait_for_namespace(
+                namespace_id=namespace.id, options=options
+            )
+        except ScalewayException as exception:
+            if exception.status_code != 404:
+                raise exception
+        console.print("Kong container namespace deleted")
+
+    def create_containers(
+        self,
+        declarative_config: t.Optional[str] = None,
+        settings: infra.cnt.KongSettings = infra.cnt.KongSettings(),
+    ) -> None:
+        """Create containers for Kong and Kong Admin.
+
+        When a declarative config is given, Kong runs in DB-less mode and only the
+        Kong Gateway container is created.
+        """
         # Namespace should be created before creating containers
         namespace = self._get_namespace_or_abort()
 
-        admin_container_name = infra.cnt.CONTAINER_ADMIN_NAME
-        admin_container = infra.cnt.get_container_by_name(
-            self.containers, namespace.id, admin_container_name
-        )
-
-        if admin_container:
-            console.print(
-                "Kong Admin API container already exists",
+        database, private_network_id = None, None
+        if not declarative_config:
+            database, private_network_id = self._get_kong_database_or_abort(
+                namespace, settings
             )
-        else:
-            console.print(
-                "Creating Kong Admin API container",
+            self._create_admin_container(
+                namespace, database, private_network_id=private_network_id
             )
-            created_container = infra.cnt.create_kong_admin_container(
-                self.containers, namespace.id, db_host, db_port, db_password
-            )
-
-            logger.debug(f"Deploying container {admin_container_name}")
-            self.containers.deploy_container(container_id=created_container.id)
 
         container_name = infra.cnt.CONTAINER_NAME
         container = infra.cnt.get_container_by_name(
@@ -303,15 +474,7 @@ class InfraManager:
             console.print("Kong Gateway container already exists")
             return
 
-        # Check if token exists
-        token = infra.cpt.get_metrics_token(self.cockpit)
-        if token:
-            logger.debug("Cockpit token already exists, deleting")
-            infra.cpt.delete_metrics_token(self.cockpit, token)
-
-        logger.debug("Creating Cockpit token")
-        token_key = infra.cpt.create_metrics_token(self.cockpit)
-        metrics_push_url = infra.cpt.get_metrics_push_url(self.cockpit)
+        token_key, metrics_push_url = self._create_metrics_token()
 
         console.print(
             "Creating Kong Gateway container",
@@ -319,22 +482,105 @@ class InfraManager:
         created_container = infra.cnt.create_kong_container(
             self.containers,
             namespace.id,
-            db_host,
-            db_port,
-            db_password,
+            settings,
+            database=database,
+            declarative_config=declarative_config,
             metrics_token=token_key,
             metrics_push_url=metrics_push_url,
+            private_network_id=private_network_id,
         )
 
         logger.debug(f"Deploying container {container_name}")
         self.containers.deploy_container(container_id=created_container.id)
 
+    def _get_kong_database_or_abort(
+        self, namespace: cnt.Namespace, settings: infra.cnt.KongSettings
+    ) -> tuple[infra.cnt.KongDatabase, str | None]:
+        """Get the database connection of the containers, and their private network.
+
+        The connection pools are sized so that all the instances fit in the
+        database at their maximum scale.
+        """
+        database_instance = self._get_database_instance_or_abort()
+        private_network_id = self._get_container_private_network_id(
+            namespace, database_instance
+        )
+        db_host, db_port = self._get_database_endpoint_or_abort(
+            database_instance, private=bool(private_network_id)
+        )
+        db_ro_host, db_ro_port = self._get_read_replica_endpoint(database_instance)
+        database = infra.cnt.KongDatabase(
+            host=db_host,
+            port=db_port,
+            password=self._get_db_password_or_abort(),
+            ro_host=db_ro_host,
+            ro_port=db_ro_port,
+            pg_pool_size=infra.cnt.get_pg_pool_size(
+                infra.rdb.get_max_connections(database_instance),
+                settings.tuning_profile,
+                settings.scaling,
+            ),
+        )
+
+        return database, private_network_id
+
+    def _create_admin_container(
+        self,
+        namespace: cnt.Namespace,
+        database: infra.cnt.KongDatabase,
+        private_network_id: str | None = None,
+    ) -> None:
+        admin_container_name = infra.cnt.CONTAINER_ADMIN_NAME
+        admin_container = infra.cnt.get_container_by_name(
+            self.containers, namespace.id, admin_container_name
+        )
+
+        if admin_container:
+            console.print(
+                "Kong Admin API container already exists",
+            )
+            return
+
+        console.print(
+            "Creating Kong Admin API container",
+        )
+        created_container = infra.cnt.create_kong_admin_container(
+            self.containers,
+            namespace.id,
+            database,
+            private_network_id=private_network_id,
+        )
+
+        logger.debug(f"Deploying container {admin_container_name}")
+        self.containers.deploy_container(container_id=created_container.id)
+
+    def _create_metrics_token(self) -> tuple[str, str]:
+        """Replace the Cockpit token used to forward metrics."""
+        token = infra.cpt.get_metrics_token(self.cockpit)
+        if token:
+            logger.debug("Cockpit token already exists, deleting")
+            infra.cpt.delete_metrics_token(self.cockpit, token)
+
+        logger.debug("Creating Cockpit token")
+        token_key = infra.cpt.create_metrics_token(self.cockpit)
+        metrics_push_url = infra.cpt.get_metrics_push_url(self.cockpit)
+
+        return token_key, metrics_push_url
+
+    def is_db_less(self) -> bool:
+        """Check if the gateway runs in DB-less mode."""
+        container = self._get_container_or_abort()
+        return infra.cnt.is_db_less(container)
+
     def check_containers(self):
         """Check the status of the containers."""
-        admin_container = self._get_admin_container_or_abort()
         container = self._get_container_or_abort()
+        if not infra.cnt.is_db_less(container):
+            admin_container = self._get_admin_container_or_abort()
+            console.print(
+                f"Admin container status: {admin_container.status}", style="bold"
+            )
 
-        console.print(f"Admin container status: {admin_container.status}", style="bold")
         console.print(f"Container status: {container.status}", style="bold")
 
     def _handle_container_not_ready(self, container: cnt.Container) -> None:
@@ -352,37 +598,25 @@ class InfraManager:
 
     def await_containers(self):
         """Wait for the containers to be ready."""
-        admin_container = self._get_admin_container_or_abort()
         container = self._get_container_or_abort()
+        containers = [container]
+        if not infra.cnt.is_db_less(container):
+            containers.append(self._get_admin_container_or_abort())
 
         options: WaitForOptions[cnt.Container, bool] = WaitForOptions()
         options.timeout = conf.RESOURCE_AWAIT_TIMEOUT_SECONDS
 
         # Execute in parallel
-        executor = futures.ThreadPoolExecutor(max_workers=2)
-        admin_future = executor.submit(
-            lambda id: self.containers.wait_for_container(
-                container_id=id, options=options
-            ),
-            admin_container.id,
-        )
-        container_future = executor.submit(
-            lambda id: self.containers.wait_for_container(
-                container_id=id, options=options
-            ),
-            container.id,
-        )
-
-        # Wait for both futures to complete
-        futures.wait(
-            [admin_future, container_future], return_when=futures.ALL_COMPLETED
-        )
-
-        admin_container = admin_future.result()
-        self._handle_container_not_ready(admin_container)
+        with futures.ThreadPoolExecutor(max_workers=len(containers)) as executor:
+            waited = executor.map(
+                lambda c: self.containers.wait_for_container(
+                    container_id=c.id, options=options
+                ),
+                containers,
+            )
 
-        container = container_future.result()
-        self._handle_container_not_ready(container)
+            for container in waited:
+                self._handle_container_not_ready(container)
 
         console.print("Containers are ready")
 
@@ -416,9 +650,9 @@ class InfraManager:
         token = self.containers.create_token(container_id=admin_container.id)
         return token.token
 
-    def update_container(self):
-        """Update the container."""
-        self.update_container_without_deploy()
+    def update_container(self, settings: infra.cnt.KongSettings) -> None:
+        """Update the containers with new settings, and redeploy them."""
+        self.update_container_without_deploy(settings)
 
         admin_container = self._get_admin_container_or_abort()
         container = self._get_container_or_abort()
@@ -429,41 +663,196 @@ class InfraManager:
         console.print("Deploying Kong Gateway container")
         self.containers.deploy_container(container_id=container.id)
 
-    def update_container_without_deploy(self):
-        """Update the container without deploying it."""
+    def update_container_without_deploy(self, settings: infra.cnt.KongSettings):
+        """Update the containers with new settings, without deploying them.
+
+        The current settings are read with get_kong_settings.
+        """
+        if self.is_db_less():
+            console.print(
+                "Gateway runs in DB-less mode, update it with:", style="bold red"
+            )
+            console.print("scwgw infra push-config -f <file>", style="bold red")
+            raise click.Abort()
+
+        namespace = self._get_namespace_or_abort()
         admin_container = self._get_admin_container_or_abort()
         container = self._get_container_or_abort()
 
-        database_instance = self._get_database_instance_or_abort()
-        db_host, db_port = self._get_database_endpoint_or_abort(database_instance)
-        db_password = self._get_db_password_or_abort()
+        database, private_network_id = self._get_kong_database_or_abort(
+            namespace, settings
+        )
 
         console.print(f"Updating container {admin_container.name}")
         infra.cnt.update_kong_admin_container(
-            self.containers, admin_container.id, db_host, db_port, db_password
+            self.containers,
+            admin_container.id,
+            database,
+            private_network_id=private_network_id,
         )
         console.print(f"Updating container {container.name}")
 
-        token, metrics_push_url = None, None
+        token_key, metrics_push_url = None, None
         if container.environment_variables.get("FORWARD_METRICS"):
-            token = infra.cpt.get_metrics_token(self.cockpit)
-            if token:
-                infra.cpt.delete_metrics_token(self.cockpit, token)
+            token_key, metrics_push_url = self._create_metrics_token()
 
-            logger.debug("Creating Cockpit token to forward metrics")
-            token_key = infra.cpt.create_metrics_token(self.cockpit)
-            metrics_push_url = infra.cpt.get_metrics_push_url(self.cockpit)
+        infra.cnt.update_kong_container(
+            self.containers,
+            container.id,
+            settings,
+            database=database,
+            metrics_token=token_key,
+            metrics_push_url=metrics_push_url,
+            private_network_id=private_network_id,
+        )
+
+    def update_db_less_config(
+        self, declarative_config: str, statsd: t.Optional[StatsdSettings] = None
+    ) -> None:
+        """Replace the declarative config of a DB-less gateway and redeploy it.
+
+        The statsd settings are kept, unless new ones are given.
+        """
+        container = self._get_container_or_abort()
+        if not infra.cnt.is_db_less(container):
+            console.print("Gateway is not running in DB-less mode", style="bold red")
+            raise click.Abort()
 
+        token_key, metrics_push_url = None, None
+        if container.environment_variables.get("FORWARD_METRICS"):
+            token_key, metrics_push_url = self._create_metrics_token()
+
+        console.print(f"Updating container {container.name}")
         infra.cnt.update_kong_container(
             self.containers,
             container.id,
-            db_host,
-            db_port,
-            db_password,
+            infra.cnt.KongSettings.from_container(container).replace(statsd=statsd),
+            declarative_config=declarative_config,
             metrics_token=token_key,
             metrics_push_url=metrics_push_url,
         )
 
+        console.print("Deploying Kong Gateway container")
+        self.containers.deploy_container(container_id=container.id)
+
+    def get_kong_settings(self) -> infra.cnt.KongSettings:
+        """Get the settings of the gateway container."""
+        container = self._get_container_or_abort()
+        return infra.cnt.KongSettings.from_container(container)
+
+    def get_metrics_mode(self) -> str:
+        """Get the metrics mode of the gateway container."""
+        container = self._get_container_or_abort()
+        return infra.cnt.get_metrics_mode(container)
+
+    def get_statsd_settings(self) -> StatsdSettings:
+        """Get the statsd settings of the gateway container."""
+        container = self._get_container_or_abort()
+        return infra.statsd.get_statsd_settings(container)
+
+    def print_statsd_series_estimate(
+        self, statsd: StatsdSettings, n_routes: int, n_consumers: int
+    ) -> None:
+        """Print the number of series the statsd metrics add to Cockpit.
+
+        Series are estimated for the gateway at its maximum scale. Sampling does
+        not change them, only the number of packets.
+        """
+        container = self._get_container_or_abort()
+        n_nodes = infra.cnt.ScalingPolicy.from_container(container).max_scale
+        series = infra.statsd.estimate_series(
+            statsd.metrics, n_routes, n_consumers, n_nodes
+        )
+
+        table = Table("Metric", "Series")
+        for name, n_series in series.items():
+            table.add_row(name, str(n_series))
+        table.add_row("Total", str(sum(series.values())), style="bold")
+
+        console.print(
+            f"Estimated series for {n_routes} routes, {n_consumers} consumers"
+            f" and up to {n_nodes} instances:"
+        )
+        console.print(table)
+
+    def check_dns(self, routes: list[Route]) -> None:
+        """Print the time to resolve the hosts of the route targets.
+
+        Hosts are resolved from this machine, whose resolver and cache may differ
+        from those of the gateway containers.
+        """
+        table = Table("Route", "Host", "Addresses", "Resolution")
+        for route in routes:
+            urls = [route.target]
+            if route.upstream:
+                urls = [target.url for target in route.upstream.targets]
+
+            for url in urls:
+                host = urlsplit(url).hostname
+                if not host:
+                    continue
+
+                try:
+                    addresses, elapsed_ms = infra.dns.resolve_host(host)
+                    table.add_row(
+                        route.relative_url,
+                        host,
+                        ", ".join(addresses),
+                        f"{elapsed_ms:.1f}ms",
+                    )
+                except OSError as error:
+                    table.add_row(route.relative_url, host, "-", f"failed: {error}")
+
+        console.print(table)
+
+    def scale_container(self, **changes: t.Optional[int]) -> None:
+        """Change the scaling policy of the gateway container.
+
+        Changes of scale only are applied without redeploying the container. Its
+        resources and the connection pools sized from its maximum scale are set
+        from its environment, so changing them updates and redeploys it.
+        """
+        container = self._get_container_or_abort()
+        current = infra.cnt.ScalingPolicy.from_container(container)
+        try:
+            scaling = current.replace(**changes)
+        except ValueError as error:
+            console.print(str(error), style="bold red")
+            raise click.Abort()
+
+        if scaling == current:
+            console.print("Gateway scaling policy is unchanged")
+            return
+
+        needs_redeploy = (scaling.cpu_limit, scaling.memory_limit) != (
+            current.cpu_limit,
+            current.memory_limit,
+        )
+        if infra.cnt.is_db_less(container):
+            if needs_redeploy:
+                console.print(
+                    "Resources of a DB-less gateway cannot be changed", style="bold red"
+                )
+                raise click.Abort()
+        elif scaling.max_scale > current.max_scale:
+            # More instances must share the connections of the database
+            database_instance = self._get_database_instance_or_abort()
+            pg_pool_size = infra.cnt.get_pg_pool_size(
+                infra.rdb.get_max_connections(database_instance),
+                infra.tuning.get_tuning_profile(container),
+                scaling,
+            )
+            current_pool_size = container.environment_variables.get("KONG_PG_POOL_SIZE")
+            needs_redeploy |= current_pool_size != str(pg_pool_size)
+
+        if needs_redeploy:
+            settings = infra.cnt.KongSettings.from_container(container)
+            self.update_container(settings.replace(scaling=scaling))
+            return
+
+        console.print(f"Updating scaling of container {container.name}")
+        infra.cnt.update_kong_container_scaling(self.containers, container.id, scaling)
+
     def print_domains_for_container(self) -> None:
         """Prints the custom domains set on the container"""
         container = self._get_container_or_abort()
@@ -529,11 +918,15 @@ class InfraManager:
         """Check if the cockpit is activated."""
         infra.cpt.ensure_cockpit_activated(self.cockpit)
 
-    def import_kong_dashboard(self):
-        """Import the kong dashboard via the Grafana API."""
+    def import_kong_dashboard(self, metrics_mode: str = DEFAULT_METRICS_MODE):
+        """Import the kong dashboard of a metrics mode via the Grafana API."""
         # We need to create a temporary user to import the dashboard
         with infra.cpt.temporary_grafana_user(api=self.cockpit) as user:
-            url = infra.cpt.import_kong_statsd_dashboard(api=self.cockpit, user=user)
+            url = infra.cpt.import_kong_dashboard(
+                api=self.cockpit,
+                user=user,
+                dashboard_id=infra.cpt.KONG_DASHBOARD_IDS[metrics_mode],
+            )
             console.print("\nKong dashboard available at:")
             console.print(f"{url}\n")
 
@@ -545,7 +938,25 @@ class InfraManager:
 
         console.print("\nYour gateway is configured at the following URLs:")
         console.print(f"Kong Gateway:         {c.gw_url}")
-        console.print(f"Kong Admin (private): {c.gw_admin_url}")
+        if c.db_less:
+            console.print("Kong Admin:           disabled (DB-less mode)")
+        else:
+            console.print(f"Kong Admin (private): {c.gw_admin_url}")
+
+        container = self._get_container_or_abort()
+        scaling = infra.cnt.ScalingPolicy.from_container(container)
+        console.print("\nYour gateway scales with the following policy:")
+        console.print(f"Status:               {container.status}")
+        console.print(
+            f"Instances:            {scaling.min_scale} to {scaling.max_scale}"
+        )
+        console.print(
+            f"Max concurrency:      {scaling.max_concurrency} requests per instance"
+        )
+        console.print(
+            f"Resources:            {scaling.cpu_limit} mVCPU and "
+            f"{scaling.memory_limit} MB per instance"
+        )
 
         console.print("\nYou can find metrics for your gateway in your Cockpit at:")
         console.print("https://console.scaleway.com/cockpit/overview")
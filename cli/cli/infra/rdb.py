@@ -1,3 +1,7 @@
+import socket
+import struct
+import time
+
 import scaleway.rdb.v1 as sdk
 
 DB_INSTANCE_NAME = "scw-sls-gw"
@@ -7,8 +11,23 @@ DB_VOLUME_TYPE = "lssd"
 DB_NODE_TYPE = "DB-DEV-S"
 DB_VOLUME_SIZE = 5000000000  # Expressed in bytes
 
+# Used when the instance does not report its max_connections setting
+DB_DEFAULT_MAX_CONNECTIONS = 100
+# Connections left for the superuser, the RDB agents and manual sessions
+DB_RESERVED_CONNECTIONS = 10
+
+# Request code of the SSLRequest message opening a Postgres connection
+PG_SSL_REQUEST_CODE = 80877103
 
-def create_database_instance(api: sdk.RdbV1API, password: str) -> sdk.Instance:
+
+def create_database_instance(
+    api: sdk.RdbV1API,
+    password: str,
+    node_type: str = DB_NODE_TYPE,
+    is_ha_cluster: bool = False,
+    volume_type: str = DB_VOLUME_TYPE,
+    volume_size: int = DB_VOLUME_SIZE,
+) -> sdk.Instance:
     """Create a managed database instance."""
 
     return api.create_instance(
@@ -16,15 +35,25 @@ def create_database_instance(api: sdk.RdbV1API, password: str) -> sdk.Instance:
         engine=DB_ENGINE,
         user_name=DB_USERNAME,
         password=password,
-        is_ha_cluster=False,
+        is_ha_cluster=is_ha_cluster,
         disable_backup=True,
         backup_same_region=True,
-        node_type=DB_NODE_TYPE,
-        volume_type=sdk.VolumeType(DB_VOLUME_TYPE),
-        volume_size=DB_VOLUME_SIZE,
+        node_type=node_type,
+        volume_type=sdk.VolumeType(volume_type),
+        volume_size=volume_size,
     )
 
 
+def get_max_connections(instance: sdk.Instance) -> int:
+    """Get the connections a database instance accepts, set by its node type."""
+
+    for setting in instance.settings or []:
+        if setting.name == "max_connections":
+            return int(setting.value)
+
+    return DB_DEFAULT_MAX_CONNECTIONS
+
+
 def get_database_instance_by_name(
     api: sdk.RdbV1API, instance_name: str
 ) -> sdk.Instance | None:
@@ -37,3 +66,69 @@ def get_database_instance_by_name(
         return None
 
     return instances[0]
+
+
+def create_read_replica(api: sdk.RdbV1API, instance_id: str) -> sdk.ReadReplica:
+    """Create a read replica of a database instance, with a public endpoint."""
+
+    return api.create_read_replica(
+        instance_id=instance_id,
+        endpoint_spec=[
+            sdk.ReadReplicaEndpointSpec(
+                direct_access=sdk.ReadReplicaEndpointSpecDirectAccess(),
+                private_network=None,
+            )
+        ],
+    )
+
+
+def get_read_replica(instance: sdk.Instance) -> sdk.ReadReplica | None:
+    """Get the read replica of a database instance, if it has one."""
+
+    if not instance.read_replicas:
+        return None
+
+    return instance.read_replicas[0]
+
+
+def create_private_endpoint(
+    api: sdk.RdbV1API, instance_id: str, private_network_id: str
+) -> sdk.Endpoint:
+    """Attach a database instance to a private network, its IP is given by IPAM."""
+
+    return api.create_endpoint(
+        instance_id=instance_id,
+        endpoint_spec=sdk.EndpointSpec(
+            load_balancer=None,
+            private_network=sdk.EndpointSpecPrivateNetwork(
+                private_network_id=private_network_id,
+                service_ip=None,
+                ipam_config=sdk.EndpointSpecPrivateNetworkIpamConfig(),
+            ),
+        ),
+    )
+
+
+def get_endpoint(instance: sdk.Instance, private: bool = False) -> sdk.Endpoint | None:
+    """Get the public or private endpoint of a database instance."""
+
+    for endpoint in instance.endpoints or []:
+        if bool(endpoint.private_network) == private:
+            return endpoint
+
+    return None
+
+
+def measure_round_trip(host: str, port: int, timeout: float = 2) -> float:
+    """Measure the time of a round trip to a Postgres server, in ms.
+
+    Opens a connection and asks for TLS, which the server answers without
+    authenticating the client, so that no credentials are needed.
+    """
+    start = time.perf_counter()
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(struct.pack("!ii", 8, PG_SSL_REQUEST_CODE))
+        if sock.recv(1) not in (b"S", b"N"):
+            raise ConnectionError(f"{host}:{port} is not a Postgres server")
+
+    return (time.perf_counter() - start) * 1000
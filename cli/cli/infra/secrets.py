@@ -45,6 +45,7 @@ def create_db_password_secret(api: sdk.SecretV1Alpha1API, db_password: str):
         name=PASSWORD_NAME,
         tags=["scw-gw"],
         description="Password for the database for scw-gw",
+        is_protected=False,
     )
 
     data = db_password.encode("utf-8")
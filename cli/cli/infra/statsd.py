@@ -0,0 +1,242 @@
+import json
+import typing as t
+
+import scaleway.container.v1beta1 as sdk
+import yaml
+
+from cli.model import StatsdSettings
+
+# Series of the statsd exporter of the Grafana agent, for each statsd metric.
+# Labels are taken from the wildcards of the statsd metric names
+STATSD_MAPPINGS: dict[str, list[dict]] = {
+    "request_count": [
+        {
+            "match": "kong.service.*.request.count",
+            "match_metric_type": "counter",
+            "name": "kong_statsd_requests_proxy",
+            "labels": {"service": "$1"},
+        },
+    ],
+    "request_size": [
+        {
+            "match": "kong.service.*.request.size",
+            "match_metric_type": "observer",
+            "name": "kong_statsd_request_size_bytes",
+            "timer_type": "histogram",
+            "labels": {"service": "$1"},
+        },
+    ],
+    "response_size": [
+        {
+            "match": "kong.service.*.response.size",
+            "match_metric_type": "observer",
+            "name": "kong_statsd_response_size_bytes",
+            "timer_type": "histogram",
+            "labels": {"service": "$1"},
+        },
+    ],
+    "latency": [
+        {
+            "match": "kong.service.*.latency",
+            "match_metric_type": "observer",
+            "name": "kong_statsd_request_latency_ms",
+            "timer_type": "histogram",
+            "labels": {"service": "$1"},
+        },
+    ],
+    "upstream_latency": [
+        {
+            "match": "kong.service.*.upstream_latency",
+            "match_metric_type": "observer",
+            "name": "kong_statsd_upstream_latency_ms",
+            "timer_type": "histogram",
+            "labels": {"service": "$1"},
+        },
+    ],
+    "kong_latency": [
+        {
+            "match": "kong.service.*.kong_latency",
+            "match_metric_type": "observer",
+            "name": "kong_statsd_latency_ms",
+            "timer_type": "histogram",
+            "labels": {"service": "$1"},
+        },
+    ],
+    "status_count": [
+        {
+            "match": "kong.service.*.status.*",
+            "match_metric_type": "counter",
+            "name": "kong_statsd_status_count",
+            "labels": {"service": "$1", "code": "$2"},
+        },
+    ],
+    "request_per_user": [
+        {
+            "match": "kong.service.*.user.*.request.count",
+            "match_metric_type": "counter",
+            "name": "kong_statsd_request_count_per_consumer",
+            "labels": {"service": "$1", "consumer": "$2"},
+        },
+    ],
+    "status_count_per_user": [
+        {
+            "match": "kong.service.*.user.*.status.*",
+            "match_metric_type": "counter",
+            "name": "kong_statsd_status_per_consumer",
+            "labels": {"service": "$1", "consumer": "$2", "code": "$3"},
+        },
+    ],
+    "status_count_per_workspace": [
+        {
+            "match": "kong.service.*.workspace.*.status.*",
+            "match_metric_type": "counter",
+            "name": "kong_statsd_status_per_workspace",
+            "labels": {"service": "$1", "workspace": "$2", "code": "$3"},
+        },
+    ],
+    # Sent by Kong 3 under kong.route, instead of kong.service
+    "status_count_per_user_per_route": [
+        {
+            "match": "kong.route.*.user.*.status.*",
+            "match_metric_type": "counter",
+            "name": "kong_statsd_status_per_route_per_consumer",
+            "labels": {"route": "$1", "consumer": "$2", "code": "$3"},
+        },
+    ],
+    "shdict_usage": [
+        {
+            "match": "kong.node.*.shdict.*.free_space",
+            "match_metric_type": "gauge",
+            "name": "kong_statsd_memory_lua_shared_dict_free_bytes",
+            "labels": {"kong_node": "$1", "shared_dict": "$2"},
+        },
+        {
+            "match": "kong.node.*.shdict.*.capacity",
+            "match_metric_type": "gauge",
+            "name": "kong_statsd_memory_lua_shared_dict_total_bytes",
+            "labels": {"kong_node": "$1", "shared_dict": "$2"},
+        },
+    ],
+}
+STATSD_JOB = "kong_metrics"
+
+# Used to estimate the number of series: the status codes returned by a route,
+# and the shared dicts of a Kong node
+ESTIMATED_STATUS_CODES = 5
+ESTIMATED_SHARED_DICTS = 20
+# Buckets of the default histogram of the statsd exporter, with +Inf, sum and count
+HISTOGRAM_SERIES = 14
+
+
+def get_statsd_settings(container: sdk.Container) -> StatsdSettings:
+    """Get the statsd settings a container is deployed with."""
+    env_vars = container.environment_variables or {}
+    defaults = StatsdSettings()
+    metrics = env_vars.get("STATSD_METRICS")
+    return StatsdSettings(
+        metrics=tuple(metrics.split(",")) if metrics else defaults.metrics,
+        sample_rate=float(env_vars.get("STATSD_SAMPLE_RATE", defaults.sample_rate)),
+        consumer_identifier=env_vars.get(
+            "STATSD_CONSUMER_IDENTIFIER", defaults.consumer_identifier
+        ),
+        udp_packet_size=int(
+            env_vars.get("STATSD_UDP_PACKET_SIZE", defaults.udp_packet_size)
+        ),
+        queue_size=int(env_vars.get("STATSD_QUEUE_SIZE", defaults.queue_size)),
+        flush_timeout=int(env_vars.get("STATSD_FLUSH_TIMEOUT", defaults.flush_timeout)),
+    )
+
+
+def get_statsd_env_vars(statsd: StatsdSettings) -> dict[str, str]:
+    """Get the environment variables of a container sending statsd metrics.
+
+    The settings are kept to render the plugin when updating the gateway, and the
+    Grafana agent is configured with the mappings of the selected metrics.
+    """
+    return {
+        "STATSD_METRICS": ",".join(statsd.metrics),
+        "STATSD_SAMPLE_RATE": str(statsd.sample_rate),
+        "STATSD_CONSUMER_IDENTIFIER": statsd.consumer_identifier,
+        "STATSD_UDP_PACKET_SIZE": str(statsd.udp_packet_size),
+        "STATSD_QUEUE_SIZE": str(statsd.queue_size),
+        "STATSD_FLUSH_TIMEOUT": str(statsd.flush_timeout),
+        # JSON is valid YAML, and is more compact
+        "STATSD_AGENT_CONFIG": json.dumps(
+            render_agent_config(statsd.metrics), separators=(",", ":")
+        ),
+    }
+
+
+def get_mappings(metrics: t.Iterable[str]) -> list[dict]:
+    """Get the mappings of the statsd exporter for some statsd metrics."""
+    selected = set(metrics)
+    return [
+        {**mapping, "job": STATSD_JOB}
+        for name, mappings in STATSD_MAPPINGS.items()
+        if name in selected
+        for mapping in mappings
+    ]
+
+
+def render_agent_config(metrics: t.Iterable[str]) -> dict:
+    """Render the Grafana agent config receiving some statsd metrics."""
+    return {
+        "metrics": {
+            "wal_directory": "/tmp/wal",
+            "global": {
+                "scrape_interval": "${METRICS_SCRAPE_INTERVAL:-15s}",
+                "remote_write": [
+                    {
+                        "url": "${COCKPIT_METRICS_PUSH_URL}",
+                        "headers": {"X-Token": "${COCKPIT_METRICS_TOKEN}"},
+                    }
+                ],
+            },
+        },
+        "integrations": {
+            "statsd_exporter": {
+                "enabled": True,
+                "listen_udp": ":8125",
+                "listen_tcp": "",
+                "mapping_config": {"mappings": get_mappings(metrics)},
+            }
+        },
+    }
+
+
+def render_agent_file(metrics: t.Collection[str]) -> str:
+    """Render the Grafana agent config file of the image for some statsd metrics."""
+    header = (
+        "# Grafana agent receiving statsd metrics, rendered by\n"
+        f"# scwgw dev agent-config --statsd-metrics {','.join(metrics)}\n"
+    )
+    return header + yaml.safe_dump(render_agent_config(metrics), sort_keys=False)
+
+
+def estimate_series(
+    metrics: t.Iterable[str], n_routes: int, n_consumers: int, n_nodes: int
+) -> dict[str, int]:
+    """Estimate the number of series of each statsd metric in Cockpit.
+
+    Each route has its own service, and the nodes are the gateway instances.
+    """
+    label_values = {
+        "service": n_routes,
+        "route": n_routes,
+        "consumer": n_consumers,
+        "code": ESTIMATED_STATUS_CODES,
+        "workspace": 1,
+        "kong_node": n_nodes,
+        "shared_dict": ESTIMATED_SHARED_DICTS,
+    }
+
+    series = {}
+    for name in metrics:
+        series[name] = 0
+        for mapping in STATSD_MAPPINGS[name]:
+            n_series = HISTOGRAM_SERIES if "timer_type" in mapping else 1
+            for label in mapping["labels"]:
+                n_series *= label_values[label]
+            series[name] += n_series
+
+    return series
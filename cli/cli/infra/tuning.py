@@ -0,0 +1,140 @@
+import typing as t
+from dataclasses import dataclass
+
+import scaleway.container.v1beta1 as sdk
+
+# Ports of the proxy, the second one accepts HTTP/2 in cleartext for gRPC
+PROXY_PORT = 8080
+PROXY_HTTP2_PORT = 9080
+
+# Memory needed by each Kong worker, which runs its own Lua VM
+WORKER_MEMORY_MB = 192
+
+# Share of the container memory used to cache responses, see the proxy-cache plugin
+PROXY_CACHE_MEMORY_RATIO = 0.125
+
+# Seconds an idle connection to a target is kept, a bit less than the 60s after
+# which servers commonly close it, so that a closing connection is not reused
+UPSTREAM_KEEPALIVE_IDLE_TIMEOUT = 55
+
+# Environment variable recording the profile a container was deployed with
+TUNING_PROFILE_ENV_VAR = "SCWGW_TUNING_PROFILE"
+
+
+@dataclass(frozen=True)
+class TuningProfile:
+    """Kong settings scaling with the CPU and memory of the gateway container."""
+
+    # Kong workers per vCPU
+    workers_per_cpu: float
+    # Share of the container memory used to cache database entities
+    mem_cache_ratio: float
+
+    worker_connections: int
+    socket_pool_size: int
+    listen_backlog: int
+
+    # Idle connections to the targets kept by each worker, reused to skip the TCP
+    # and TLS handshakes, and the requests sent on one before closing it
+    upstream_keepalive_pool_size: int
+    upstream_keepalive_max_requests: int
+
+
+TUNING_PROFILES = {
+    # Few workers and small caches, for gateways with little traffic
+    "small": TuningProfile(
+        workers_per_cpu=0.5,
+        mem_cache_ratio=0.0625,
+        worker_connections=1024,
+        socket_pool_size=64,
+        listen_backlog=4096,
+        upstream_keepalive_pool_size=64,
+        upstream_keepalive_max_requests=1000,
+    ),
+    "default": TuningProfile(
+        workers_per_cpu=1,
+        mem_cache_ratio=0.125,
+        worker_connections=4096,
+        socket_pool_size=256,
+        listen_backlog=16384,
+        upstream_keepalive_pool_size=256,
+        upstream_keepalive_max_requests=10000,
+    ),
+    # Many concurrent connections, kept alive towards the targets
+    "high-throughput": TuningProfile(
+        workers_per_cpu=1,
+        mem_cache_ratio=0.1875,
+        worker_connections=16384,
+        socket_pool_size=512,
+        listen_backlog=65535,
+        upstream_keepalive_pool_size=1024,
+        upstream_keepalive_max_requests=100000,
+    ),
+}
+DEFAULT_TUNING_PROFILE = "default"
+
+
+def get_worker_processes(profile: TuningProfile, cpu_limit: int, memory_limit: int):
+    """Get the number of Kong workers fitting in the container limits.
+
+    Kong defaults to one worker per CPU of the host, which can be many more than
+    the vCPUs of the container, and does not fit in its memory.
+    """
+    by_cpu = int(cpu_limit / 1000 * profile.workers_per_cpu)
+
+    caches_mb = memory_limit * (profile.mem_cache_ratio + PROXY_CACHE_MEMORY_RATIO)
+    by_memory = int((memory_limit - caches_mb) // WORKER_MEMORY_MB)
+
+    return max(1, min(by_cpu, by_memory))
+
+
+def get_tuning_env_vars(
+    profile_name: str, cpu_limit: int, memory_limit: int
+) -> dict[str, str]:
+    """Get the environment variables of a tuning profile.
+
+    The CPU limit is in mVCPU and the memory limit in MB, as for containers.
+    """
+    if profile_name not in TUNING_PROFILES:
+        raise ValueError(f"Unknown tuning profile {profile_name}")
+
+    profile = TUNING_PROFILES[profile_name]
+
+    workers = get_worker_processes(profile, cpu_limit, memory_limit)
+    mem_cache_mb = max(1, int(memory_limit * profile.mem_cache_ratio))
+    listen_options = f"reuseport backlog={profile.listen_backlog}"
+
+    return {
+        TUNING_PROFILE_ENV_VAR: profile_name,
+        "KONG_NGINX_WORKER_PROCESSES": str(workers),
+        "KONG_NGINX_EVENTS_WORKER_CONNECTIONS": str(profile.worker_connections),
+        "KONG_MEM_CACHE_SIZE": f"{mem_cache_mb}m",
+        "KONG_LUA_SOCKET_POOL_SIZE": str(profile.socket_pool_size),
+        "KONG_UPSTREAM_KEEPALIVE_POOL_SIZE": str(profile.upstream_keepalive_pool_size),
+        "KONG_UPSTREAM_KEEPALIVE_MAX_REQUESTS": str(
+            profile.upstream_keepalive_max_requests
+        ),
+        "KONG_UPSTREAM_KEEPALIVE_IDLE_TIMEOUT": str(UPSTREAM_KEEPALIVE_IDLE_TIMEOUT),
+        "KONG_PROXY_LISTEN": (
+            f"0.0.0.0:{PROXY_PORT} {listen_options}, "
+            f"0.0.0.0:{PROXY_HTTP2_PORT} http2 {listen_options}"
+        ),
+    }
+
+
+def get_tuning_profile(container: sdk.Container) -> str:
+    """Get the tuning profile a container was deployed with."""
+    env_vars = container.environment_variables or {}
+    return env_vars.get(TUNING_PROFILE_ENV_VAR, DEFAULT_TUNING_PROFILE)
+
+
+def render_env_file(
+    profile_name: str, cpu_limit: int, memory_limit: int
+) -> t.Iterator[str]:
+    """Render the lines of a docker-compose env file for a tuning profile."""
+    yield f"# Kong tuning for {cpu_limit} mVCPU and {memory_limit} MB, rendered by"
+    yield f"# scwgw dev tuning-env --tuning-profile {profile_name}"
+
+    env_vars = get_tuning_env_vars(profile_name, cpu_limit, memory_limit)
+    for key, value in env_vars.items():
+        yield f"{key}={value}"
@@ -0,0 +1,38 @@
+import scaleway.container.v1beta1 as cnt
+import scaleway.vpc.v2 as sdk
+
+PRIVATE_NETWORK_NAME = "scw-sls-gw"
+
+
+def create_private_network(api: sdk.VpcV2API) -> sdk.PrivateNetwork:
+    """Create the private network between the containers and the database.
+
+    Serverless Containers can only join regional private networks, which are the
+    ones of the v2 API.
+    """
+
+    return api.create_private_network(
+        name=PRIVATE_NETWORK_NAME, default_route_propagation_enabled=False
+    )
+
+
+def get_private_network_by_name(
+    api: sdk.VpcV2API, private_network_name: str
+) -> sdk.PrivateNetwork | None:
+    """Get a private network by its name."""
+
+    private_networks = api.list_private_networks_all(
+        name=private_network_name,
+    )
+    if not private_networks:
+        return None
+
+    return private_networks[0]
+
+
+def is_namespace_in_private_network(namespace: cnt.Namespace) -> bool:
+    """Check if the containers of a namespace can join a private network.
+
+    Only namespaces with the VPC integration of Serverless Containers can.
+    """
+    return bool(namespace.vpc_integration_activated)
@@ -1,5 +1,308 @@
-from dataclasses import dataclass
+import dataclasses
+import hashlib
+import re
+import typing as t
+from dataclasses import dataclass, field
 from typing import Optional
+from urllib.parse import urlsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443, "grpc": 80, "grpcs": 443}
+
+# Protocols accepted by routes, websockets are upgraded from http and https
+ROUTE_PROTOCOLS = ["http", "https", "grpc", "grpcs"]
+DEFAULT_ROUTE_PROTOCOLS = ["http", "https"]
+GRPC_PROTOCOLS = ["grpc", "grpcs"]
+
+# Tag set on every Kong entity managed by the CLI
+MANAGED_TAG = "scwgw"
+
+# Shared dict holding cached responses, declared in the Kong configuration
+PROXY_CACHE_DICTIONARY = "scwgw_proxy_cache"
+# Defaults of the Kong proxy-cache plugin
+DEFAULT_CACHE_METHODS = ["GET", "HEAD"]
+DEFAULT_CACHE_CONTENT_TYPES = ["text/plain", "application/json"]
+
+# Defaults of Kong services, timeouts are in milliseconds
+DEFAULT_TIMEOUTS = {
+    "connect_timeout": 60_000,
+    "read_timeout": 60_000,
+    "write_timeout": 60_000,
+    "retries": 5,
+}
+TIMEOUT_PROFILES = {
+    # The Scaleway ingress accepts connections while a function scales from
+    # zero, so the time spent cold starting is part of the read timeout.
+    # Retrying requests that timed out only adds load while instances start.
+    "serverless-cold-start": {
+        "connect_timeout": 5_000,
+        "read_timeout": 120_000,
+        "write_timeout": 60_000,
+        "retries": 1,
+    },
+}
+
+# Load balancing of routes with several targets, via a Kong upstream
+LB_ALGORITHMS = ["round-robin", "least-connections", "consistent-hashing"]
+HASH_ON = ["header", "consumer", "ip"]
+DEFAULT_TARGET_WEIGHT = 100
+UPSTREAM_SUFFIX = ".upstream"
+
+# Health checks, with thresholds suited to functions scaling from zero
+HEALTHCHECK_INTERVAL_SECONDS = 5
+HEALTHCHECK_TIMEOUT_SECONDS = 5
+
+# statsd pushes metrics to the Grafana agent over UDP on each request, prometheus
+# counts them in the memory of Kong and the agent scrapes them from the status API
+METRICS_MODE_STATSD = "statsd"
+METRICS_MODE_PROMETHEUS = "prometheus"
+METRICS_MODES = [METRICS_MODE_STATSD, METRICS_MODE_PROMETHEUS]
+DEFAULT_METRICS_MODE = METRICS_MODE_STATSD
+
+# Metrics of the statsd plugin, with their type. Per-consumer metrics have series
+# for each consumer, and are only sent when selected
+STATSD_METRICS = {
+    "request_count": "counter",
+    "request_size": "timer",
+    "response_size": "timer",
+    "latency": "timer",
+    "upstream_latency": "timer",
+    "kong_latency": "timer",
+    "status_count": "counter",
+    "request_per_user": "counter",
+    "status_count_per_user": "counter",
+    "status_count_per_workspace": "counter",
+    "status_count_per_user_per_route": "counter",
+    "shdict_usage": "gauge",
+}
+PER_CONSUMER_STATSD_METRICS = [
+    "request_per_user",
+    "status_count_per_user",
+    "status_count_per_user_per_route",
+]
+DEFAULT_STATSD_METRICS = tuple(
+    m for m in STATSD_METRICS if m not in PER_CONSUMER_STATSD_METRICS
+)
+STATSD_CONSUMER_IDENTIFIERS = ["consumer_id", "custom_id", "username"]
+DEFAULT_STATSD_CONSUMER_IDENTIFIER = "username"
+# Metrics are combined in UDP packets of up to this size, which fits in an
+# Ethernet frame, instead of being sent in a packet each
+DEFAULT_STATSD_UDP_PACKET_SIZE = 1432
+# Requests whose metrics are sent at once, and seconds after which they are sent
+# anyway. One request per batch sends its metrics without delay
+DEFAULT_STATSD_QUEUE_SIZE = 1
+DEFAULT_STATSD_FLUSH_TIMEOUT = 2
+
+
+def kong_tags(tags: t.Optional[list[str]]) -> list[str]:
+    """Get the Kong tags of a managed entity, given its user tags."""
+    for tag in tags or []:
+        if not tag or "," in tag or "/" in tag:
+            raise ValueError(f"Invalid tag {tag!r}, tags can't contain , or /")
+
+    return [MANAGED_TAG] + [tag for tag in tags or [] if tag != MANAGED_TAG]
+
+
+def user_tags(tags: t.Optional[list[str]]) -> list[str]:
+    """Get the user tags of a managed entity, given its Kong tags."""
+    return [tag for tag in tags or [] if tag != MANAGED_TAG]
+
+
+def normalise_target(target: str) -> str:
+    """Make the port of a target explicit, as Kong does when storing services."""
+    url = urlsplit(target)
+    if url.port or url.scheme not in DEFAULT_PORTS or not url.hostname:
+        return target
+
+    return url._replace(netloc=f"{url.netloc}:{DEFAULT_PORTS[url.scheme]}").geturl()
+
+
+def profile_timeouts(name: t.Optional[str]) -> dict[str, int]:
+    """Get the timeouts and retries of a profile, none are set without one."""
+    if not name:
+        return {}
+    if name not in TIMEOUT_PROFILES:
+        raise ValueError(f"Unknown timeout profile {name}")
+
+    return dict(TIMEOUT_PROFILES[name])
+
+
+@dataclass
+class UpstreamTarget:
+    url: str
+    weight: int = DEFAULT_TARGET_WEIGHT
+
+    # Health as seen by the Kong node serving the admin API, only set on listing
+    health: Optional[str] = None
+
+    @property
+    def address(self) -> str:
+        """Address of the target in Kong, as host:port."""
+        url = urlsplit(normalise_target(self.url))
+        return f"{url.hostname}:{url.port}"
+
+    def json(self):
+        return {"target": self.address, "weight": self.weight}
+
+    def __eq__(self, other):
+        return self.address == other.address and self.weight == other.weight
+
+
+@dataclass
+class Upstream:
+    """Kong upstream balancing the traffic of a route across several targets.
+
+    Targets share the scheme and path of the route target, Kong only
+    balances between their hosts and ports.
+    """
+
+    targets: list[UpstreamTarget]
+    algorithm: str = "round-robin"
+
+    # Consistent hashing is done on a header or the authenticated consumer
+    hash_on: Optional[str] = None
+    hash_on_header: Optional[str] = None
+
+    # Active checks probe this path, passive ones watch proxied responses
+    healthcheck_path: Optional[str] = None
+    passive_healthchecks: bool = False
+
+    def __post_init__(self):
+        if not self.targets:
+            raise ValueError("Upstream must have at least one target")
+        if self.algorithm not in LB_ALGORITHMS:
+            raise ValueError(f"Invalid load balancing algorithm {self.algorithm}")
+        if self.algorithm == "consistent-hashing" and not self.hash_on:
+            raise ValueError("Consistent hashing needs a value to hash on")
+        if self.hash_on == "header" and not self.hash_on_header:
+            raise ValueError("Hashing on a header needs the header name")
+
+        urls = [urlsplit(target.url) for target in self.targets]
+        if len({(url.scheme, url.path) for url in urls}) > 1:
+            raise ValueError("Upstream targets must share the same scheme and path")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Upstream":
+        """Build an upstream from an entry of a declarative routes file."""
+        targets = data.get("targets") or []
+        if not isinstance(targets, list) or not all(
+            isinstance(target, dict) and target.get("url") for target in targets
+        ):
+            raise ValueError("Upstream targets must be a list of mappings with a url")
+
+        return Upstream(
+            targets=[
+                UpstreamTarget(
+                    url=target["url"],
+                    weight=target.get("weight", DEFAULT_TARGET_WEIGHT),
+                )
+                for target in targets
+            ],
+            algorithm=data.get("algorithm", "round-robin"),
+            hash_on=data.get("hash_on"),
+            hash_on_header=data.get("hash_on_header"),
+            healthcheck_path=data.get("healthcheck_path"),
+            passive_healthchecks=data.get("passive_healthchecks", False),
+        )
+
+    @classmethod
+    def from_json(
+        cls, upstream_json: dict, target_url: str, targets_json: list[dict]
+    ) -> "Upstream":
+        """Read an upstream and its targets, in the scheme and path of a route."""
+        url = urlsplit(target_url)
+
+        targets = []
+        for target_json in targets_json:
+            weight = target_json.get("weight", DEFAULT_TARGET_WEIGHT)
+            if isinstance(weight, dict):
+                # The health endpoint details the weight of each address
+                weight = weight.get("total", DEFAULT_TARGET_WEIGHT)
+            targets.append(
+                UpstreamTarget(
+                    url=url._replace(netloc=target_json["target"]).geturl(),
+                    weight=weight,
+                    health=target_json.get("health"),
+                )
+            )
+        targets.sort(key=lambda target: target.url)
+
+        hash_on = upstream_json.get("hash_on")
+        healthchecks = upstream_json.get("healthchecks") or {}
+        active = healthchecks.get("active") or {}
+        passive = healthchecks.get("passive") or {}
+        active_interval = (active.get("healthy") or {}).get("interval")
+        passive_failures = (passive.get("unhealthy") or {}).get("http_failures")
+
+        return Upstream(
+            targets=targets,
+            algorithm=upstream_json.get("algorithm") or "round-robin",
+            hash_on=hash_on if hash_on in HASH_ON else None,
+            hash_on_header=upstream_json.get("hash_on_header"),
+            healthcheck_path=active.get("http_path") if active_interval else None,
+            passive_healthchecks=bool(passive_failures),
+        )
+
+    def json(self, name: str, scheme: str, tags: t.Optional[list[str]]):
+        data: dict[str, t.Any] = {
+            "name": name,
+            "algorithm": self.algorithm,
+            "hash_on": self.hash_on or "none",
+            "healthchecks": self.healthchecks_json(scheme),
+            "tags": kong_tags(tags),
+        }
+        if self.hash_on == "header":
+            data["hash_on_header"] = self.hash_on_header
+
+        return data
+
+    def healthchecks_json(self, scheme: str) -> dict:
+        # Zero intervals and thresholds disable the checks in Kong
+        active: dict[str, t.Any] = {
+            "type": scheme,
+            "timeout": HEALTHCHECK_TIMEOUT_SECONDS,
+            "healthy": {"interval": 0},
+            "unhealthy": {"interval": 0},
+        }
+        if self.healthcheck_path:
+            active.update(
+                http_path=self.healthcheck_path,
+                healthy={"interval": HEALTHCHECK_INTERVAL_SECONDS, "successes": 1},
+                unhealthy={
+                    "interval": HEALTHCHECK_INTERVAL_SECONDS,
+                    "http_failures": 2,
+                    "tcp_failures": 2,
+                    "timeouts": 3,
+                },
+            )
+
+        passive: dict[str, t.Any] = {
+            "type": scheme,
+            "healthy": {"successes": 0},
+            "unhealthy": {"http_failures": 0, "tcp_failures": 0, "timeouts": 0},
+        }
+        if self.passive_healthchecks:
+            passive.update(
+                healthy={"successes": 5},
+                unhealthy={"http_failures": 5, "tcp_failures": 2, "timeouts": 3},
+            )
+
+        return {"active": active, "passive": passive}
+
+    def __eq__(self, other):
+        if other is None:
+            return False
+
+        equal = True
+        equal &= sorted(self.targets, key=lambda target: target.address) == sorted(
+            other.targets, key=lambda target: target.address
+        )
+        equal &= self.algorithm == other.algorithm
+        equal &= self.hash_on == other.hash_on
+        equal &= self.hash_on_header == other.hash_on_header
+        equal &= self.healthcheck_path == other.healthcheck_path
+        equal &= bool(self.passive_healthchecks) == bool(other.passive_healthchecks)
+
+        return equal
 
 
 @dataclass
@@ -10,52 +313,288 @@ class Route:
     http_methods: Optional[list[str]] = None
     cors: Optional[bool] = False
     jwt: Optional[bool] = False
+    tags: Optional[list[str]] = None
+
+    # Responses are cached by the gateway when a TTL is set
+    cache_ttl: Optional[int] = None
+    cache_methods: Optional[list[str]] = None
+    cache_content_types: Optional[list[str]] = None
+
+    # Traffic is balanced across several targets when set
+    upstream: Optional[Upstream] = None
+
+    # Clients speaking other protocols than http and https, e.g. grpc
+    protocols: Optional[list[str]] = None
+    # Streaming routes pass bodies through as they are sent or received
+    request_buffering: bool = True
+    response_buffering: bool = True
+
+    # Kong defaults are used for the timeouts and retries that are not set
+    connect_timeout: Optional[int] = None
+    read_timeout: Optional[int] = None
+    write_timeout: Optional[int] = None
+    retries: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Route":
+        """Build a route from an entry of a declarative routes file.
+
+        Routes with an upstream can omit their target, which is then the first
+        target of the upstream.
+        """
+        if not data.get("relative_url"):
+            raise ValueError("Missing relative_url")
+
+        upstream = None
+        if data.get("upstream"):
+            if not isinstance(data["upstream"], dict):
+                raise ValueError("Upstream must be a mapping")
+            upstream = Upstream.from_dict(data["upstream"])
+
+        target = data.get("target") or (upstream.targets[0].url if upstream else None)
+        if not target:
+            raise ValueError("Missing target or upstream")
+
+        timeouts = profile_timeouts(data.get("timeout_profile"))
+        timeouts.update({k: data[k] for k in DEFAULT_TIMEOUTS if k in data})
+
+        return Route(
+            relative_url=data["relative_url"],
+            target=target,
+            http_methods=data.get("http_methods"),
+            cors=data.get("cors", False),
+            jwt=data.get("jwt", False),
+            tags=data.get("tags"),
+            cache_ttl=data.get("cache_ttl"),
+            cache_methods=data.get("cache_methods"),
+            cache_content_types=data.get("cache_content_types"),
+            upstream=upstream,
+            protocols=data.get("protocols"),
+            request_buffering=data.get("request_buffering", True),
+            response_buffering=data.get("response_buffering", True),
+            **timeouts,
+        )
 
     @property
     def name(self):
         return self.relative_url.replace("/", "_")
 
+    @property
+    def upstream_name(self) -> str:
+        """Name of the upstream of the route, which must be a valid hostname."""
+        slug = re.sub(r"[^a-z0-9]+", "-", self.relative_url.lower()).strip("-")
+        digest = hashlib.sha256(self.relative_url.encode("utf-8")).hexdigest()[:8]
+        return f"{slug[:40] or 'root'}-{digest}{UPSTREAM_SUFFIX}"
+
+    @property
+    def is_grpc(self) -> bool:
+        return any(p in GRPC_PROTOCOLS for p in self.protocols or [])
+
     def route_json(self):
-        return {
+        route = {
             "name": self.name,
             "paths": [self.relative_url],
             "service": {"name": self.name},
             "methods": self.http_methods,
+            "tags": kong_tags(self.tags),
         }
+        if self.protocols:
+            route["protocols"] = self.protocols
+        # Kong buffers bodies unless told otherwise
+        if not self.request_buffering:
+            route["request_buffering"] = False
+        if not self.response_buffering:
+            route["response_buffering"] = False
+
+        return route
+
+    def set_streaming_from_json(self, route_json: dict) -> None:
+        """Read the protocols and buffering of a route, unless they are defaults."""
+        protocols = route_json.get("protocols")
+        if protocols and sorted(protocols) != DEFAULT_ROUTE_PROTOCOLS:
+            self.protocols = protocols
+        self.request_buffering = route_json.get("request_buffering", True)
+        self.response_buffering = route_json.get("response_buffering", True)
 
     def service_json(self):
-        return {"name": self.name, "url": self.target}
+        url = self.target
+        if self.upstream:
+            # The service points at the upstream, which picks the target host
+            url = urlsplit(self.target)._replace(netloc=self.upstream_name).geturl()
+
+        service = {"name": self.name, "url": url, "tags": kong_tags(self.tags)}
+        service.update(self.timeouts)
+
+        return service
+
+    @property
+    def timeouts(self) -> dict[str, int]:
+        """Timeouts and retries set on the route, Kong defaults apply to others."""
+        timeouts = {
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "write_timeout": self.write_timeout,
+            "retries": self.retries,
+        }
+        return {k: v for k, v in timeouts.items() if v is not None}
+
+    def set_timeouts_from_json(self, service_json: dict) -> None:
+        """Read the timeouts and retries of a service, unless they are defaults."""
+        for key, default in DEFAULT_TIMEOUTS.items():
+            value = service_json.get(key)
+            if value is not None and value != default:
+                setattr(self, key, value)
+
+    def upstream_json(self):
+        if not self.upstream:
+            return None
+
+        scheme = urlsplit(self.target).scheme
+        return self.upstream.json(self.upstream_name, scheme, self.tags)
 
     def cors_json(self):
         return {
             "name": "cors",
             "config": {"origins": ["*"], "headers": ["*"], "credentials": True},
+            "tags": kong_tags(self.tags),
         }
 
     def jwt_json(self):
         return {
             "name": "jwt",
+            "tags": kong_tags(self.tags),
+        }
+
+    def proxy_cache_json(self):
+        return {
+            "name": "proxy-cache",
+            "config": {
+                "strategy": "memory",
+                "memory": {"dictionary_name": PROXY_CACHE_DICTIONARY},
+                "cache_ttl": self.cache_ttl,
+                "request_method": self.cache_methods or DEFAULT_CACHE_METHODS,
+                "content_type": self.cache_content_types or DEFAULT_CACHE_CONTENT_TYPES,
+            },
+            "tags": kong_tags(self.tags),
         }
 
+    def set_proxy_cache_from_json(self, plugin_json: dict) -> None:
+        """Read the cache settings from a proxy-cache plugin."""
+        config = plugin_json.get("config") or {}
+        self.cache_ttl = config.get("cache_ttl")
+        self.cache_methods = config.get("request_method")
+        self.cache_content_types = config.get("content_type")
+
     def __eq__(self, other):
         equal = True
         equal &= self.relative_url == other.relative_url
-        equal &= self.target == other.target
-        equal &= self.http_methods == other.http_methods
-        equal &= self.cors == other.cors
-        equal &= self.jwt == other.jwt
+        if self.upstream and other.upstream:
+            # Targets only differ by host between the upstream targets
+            url, other_url = urlsplit(self.target), urlsplit(other.target)
+            equal &= (url.scheme, url.path) == (other_url.scheme, other_url.path)
+        else:
+            equal &= normalise_target(self.target) == normalise_target(other.target)
+        equal &= sorted(self.http_methods or []) == sorted(other.http_methods or [])
+        equal &= bool(self.cors) == bool(other.cors)
+        equal &= bool(self.jwt) == bool(other.jwt)
+        equal &= sorted(self.tags or []) == sorted(other.tags or [])
+        equal &= self.cache_ttl == other.cache_ttl
+        if self.cache_ttl:
+            equal &= sorted(self.cache_methods or DEFAULT_CACHE_METHODS) == sorted(
+                other.cache_methods or DEFAULT_CACHE_METHODS
+            )
+            equal &= sorted(
+                self.cache_content_types or DEFAULT_CACHE_CONTENT_TYPES
+            ) == sorted(other.cache_content_types or DEFAULT_CACHE_CONTENT_TYPES)
+        equal &= sorted(self.protocols or DEFAULT_ROUTE_PROTOCOLS) == sorted(
+            other.protocols or DEFAULT_ROUTE_PROTOCOLS
+        )
+        equal &= self.request_buffering == other.request_buffering
+        equal &= self.response_buffering == other.response_buffering
+        equal &= (DEFAULT_TIMEOUTS | self.timeouts) == (
+            DEFAULT_TIMEOUTS | other.timeouts
+        )
+        if self.upstream or other.upstream:
+            equal &= self.upstream == other.upstream
 
         return equal
 
 
+class RouteTable:
+    """Routes indexed by their name and their relative url."""
+
+    def __init__(self, routes: t.Iterable[Route] = ()):
+        self.by_name: dict[str, Route] = {}
+        self.by_path: dict[str, Route] = {}
+
+        for route in routes:
+            self.add(route)
+
+    def add(self, route: Route) -> None:
+        """Add a route, names and relative urls must be unique."""
+        if route.relative_url in self.by_path:
+            raise ValueError(f"Duplicate route for {route.relative_url}")
+        if route.name in self.by_name:
+            other = self.by_name[route.name]
+            raise ValueError(
+                f"Routes {route.relative_url} and {other.relative_url} "
+                f"have the same name {route.name}"
+            )
+
+        self.by_name[route.name] = route
+        self.by_path[route.relative_url] = route
+
+    def get(self, route: Route) -> Optional[Route]:
+        """Get the route matching the name or relative url of another route."""
+        return self.by_name.get(route.name) or self.by_path.get(route.relative_url)
+
+    def __iter__(self) -> t.Iterator[Route]:
+        return iter(self.by_name.values())
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+
+@dataclass
+class RoutePlan:
+    """Changes needed to go from the routes on a gateway to the desired ones."""
+
+    creates: list[Route] = field(default_factory=list)
+    # Pairs of (desired, current) routes
+    updates: list[tuple[Route, Route]] = field(default_factory=list)
+    deletes: list[Route] = field(default_factory=list)
+
+    @classmethod
+    def diff(cls, desired: RouteTable, current: RouteTable) -> "RoutePlan":
+        plan = RoutePlan()
+        for route in desired:
+            existing = current.get(route)
+            if not existing:
+                plan.creates.append(route)
+            elif existing != route:
+                plan.updates.append((route, existing))
+
+        for route in current:
+            if not desired.get(route):
+                plan.deletes.append(route)
+
+        return plan
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.creates or self.updates or self.deletes)
+
+
 @dataclass
 class Consumer:
     username: Optional[str] = None
+    tags: Optional[list[str]] = None
 
     @classmethod
     def from_json(cls, json_data: dict):
         c = Consumer(
             username=json_data.get("username"),
+            tags=user_tags(json_data.get("tags")),
         )
 
         return c
@@ -63,6 +602,7 @@ class Consumer:
     def json(self):
         return {
             "username": self.username,
+            "tags": kong_tags(self.tags),
         }
 
     def __eq__(self, other):
@@ -84,3 +624,101 @@ class JwtCredential:
         )
 
         return c
+
+    def json(self):
+        return {
+            "algorithm": self.algorithm,
+            "key": self.iss,
+            "secret": self.secret,
+        }
+
+
+@dataclass(frozen=True)
+class StatsdSettings:
+    """Settings of the statsd plugin, sending the metrics of each request.
+
+    Counters and gauges are sampled, which the Grafana agent makes up for by
+    scaling the values it receives.
+    """
+
+    metrics: tuple[str, ...] = DEFAULT_STATSD_METRICS
+    sample_rate: float = 1.0
+    consumer_identifier: str = DEFAULT_STATSD_CONSUMER_IDENTIFIER
+    udp_packet_size: int = DEFAULT_STATSD_UDP_PACKET_SIZE
+    queue_size: int = DEFAULT_STATSD_QUEUE_SIZE
+    flush_timeout: int = DEFAULT_STATSD_FLUSH_TIMEOUT
+
+    def __post_init__(self):
+        unknown = set(self.metrics) - set(STATSD_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown statsd metrics {','.join(sorted(unknown))}")
+        if not 0 < self.sample_rate <= 1:
+            raise ValueError("The statsd sample rate must be in ]0, 1]")
+        if self.consumer_identifier not in STATSD_CONSUMER_IDENTIFIERS:
+            raise ValueError(
+                f"Unknown statsd consumer identifier {self.consumer_identifier}"
+            )
+
+    def replace(self, **changes: t.Any) -> "StatsdSettings":
+        """Get a copy of the settings, with the changes that are set."""
+        return dataclasses.replace(
+            self, **{k: v for k, v in changes.items() if v is not None}
+        )
+
+    def metrics_json(self) -> list[dict]:
+        """Get the metrics of the statsd plugin config."""
+        metrics = []
+        for name in self.metrics:
+            metric: dict[str, t.Any] = {
+                "name": name,
+                "stat_type": STATSD_METRICS[name],
+            }
+            # Timers are not sampled by Kong
+            if STATSD_METRICS[name] in ("counter", "gauge"):
+                metric["sample_rate"] = self.sample_rate
+            metrics.append(metric)
+
+        return metrics
+
+
+def statsd_plugin_json(statsd: StatsdSettings = StatsdSettings()):
+    """Global statsd plugin forwarding metrics to the Grafana agent."""
+    return {
+        "name": "statsd",
+        "config": {
+            "port": 8125,
+            "prefix": "kong",
+            "metrics": statsd.metrics_json(),
+            "consumer_identifier_default": statsd.consumer_identifier,
+            "udp_packet_size": statsd.udp_packet_size,
+            "queue_size": statsd.queue_size,
+            "flush_timeout": statsd.flush_timeout,
+        },
+        "tags": kong_tags(None),
+    }
+
+
+def prometheus_plugin_json():
+    """Global prometheus plugin scraped by the Grafana agent.
+
+    Latencies are histograms per service and route. Per-consumer series are left
+    out, as their number grows with the consumers.
+    """
+    return {
+        "name": "prometheus",
+        "config": {
+            "per_consumer": False,
+            "status_code_metrics": True,
+            "latency_metrics": True,
+            "bandwidth_metrics": True,
+            "upstream_health_metrics": True,
+        },
+        "tags": kong_tags(None),
+    }
+
+
+def metrics_plugin_json(metrics_mode: str, statsd: StatsdSettings = StatsdSettings()):
+    """Global plugin exporting the metrics of a metrics mode."""
+    if metrics_mode == METRICS_MODE_PROMETHEUS:
+        return prometheus_plugin_json()
+    return statsd_plugin_json(statsd)
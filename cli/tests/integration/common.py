@@ -1,5 +1,7 @@
 import contextlib
 import json
+import pathlib
+import subprocess
 import time
 from typing import Optional
 
@@ -12,6 +14,41 @@ from cli.infra import InfraManager
 from cli.model import Route
 from tests.integration.environment import IntegrationEnvironment
 
+# Directory of the docker compose stack of the gateway
+COMPOSE_DIR = pathlib.Path(__file__).parents[3] / "gateway"
+
+
+def start_replica(env_vars: dict[str, str], port: int) -> str:
+    """Start a new docker compose gateway replica, and wait for it to be healthy."""
+    env_args = [arg for k, v in env_vars.items() for arg in ("--env", f"{k}={v}")]
+    container_id = subprocess.run(
+        ["docker", "compose", "run", "--detach", "--rm", "--no-deps"]
+        + ["--publish", f"{port}:8080"]
+        + env_args
+        + ["kong"],
+        cwd=COMPOSE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+    for _ in range(60):
+        status = subprocess.run(
+            ["docker", "inspect", "--format", "{{.State.Health.Status}}"]
+            + [container_id],
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        if status == "healthy":
+            return container_id
+        time.sleep(2)
+
+    raise RuntimeError(f"Replica {container_id} did not become healthy")
+
+
+def stop_replica(container_id: str) -> None:
+    subprocess.run(["docker", "stop", container_id], capture_output=True)
+
 
 class GatewayTest:
     """Base class for integration tests."""
@@ -26,6 +26,10 @@ class IntegrationEnvironment:
     host_func_a_url: str
     # URL of the function visible from the gateway
     gw_func_a_url: str
+    # Second function, only deployed with docker compose
+    gw_func_b_url: Optional[str] = None
+    # Streaming endpoint, only deployed with docker compose
+    gw_stream_url: Optional[str] = None
 
     # S3 bucket
     @staticmethod
@@ -44,6 +48,8 @@ class IntegrationEnvironment:
             gw_url=gw_url,
             host_func_a_url="http://localhost:8004",
             gw_func_a_url="http://func-a:80",
+            gw_func_b_url="http://func-b:80",
+            gw_stream_url="http://stream:80",
         )
 
     @staticmethod
@@ -0,0 +1,65 @@
+import shutil
+
+import jwt
+import pytest
+import requests
+from loguru import logger
+
+from cli.infra.container import DEFAULT_CACHE_WARMUP_ENTITIES
+from cli.model import Route
+from tests.integration.common import GatewayTest, start_replica, stop_replica
+
+# Port of the fresh replicas started by the benchmark
+REPLICA_PORT = 8090
+
+
+class TestCacheWarmup(GatewayTest):
+    @pytest.fixture(autouse=True)
+    def require_docker_compose(self):
+        if self.infra or not shutil.which("docker"):
+            pytest.skip("Fresh replicas are started with docker compose")
+
+    def test_first_request_latency(self):
+        consumer_name = "warmup-app"
+        self.manager.delete_consumer(consumer_name)
+        self.manager.add_consumer(consumer_name)
+        cred = self.manager.add_jwt_cred(consumer_name)
+        token = jwt.encode({"iss": cred.iss}, cred.secret, algorithm=cred.algorithm)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        route = Route("/warmup-test", self.env.gw_func_a_url, jwt=True)
+        self.manager.delete_route(route)
+        self.manager.add_route(route)
+
+        self.call_endpoint_until_response_code(
+            f"{self.env.gw_url}/warmup-test/hello", requests.codes.ok, headers=headers
+        )
+
+        latencies = {}
+        for warmup_entities in ([], DEFAULT_CACHE_WARMUP_ENTITIES):
+            container_id = start_replica(
+                {"KONG_DB_CACHE_WARMUP_ENTITIES": ",".join(warmup_entities)},
+                REPLICA_PORT,
+            )
+            try:
+                url = f"http://localhost:{REPLICA_PORT}/warmup-test/hello"
+
+                first = requests.get(url, headers=headers, timeout=10)
+                second = requests.get(url, headers=headers, timeout=10)
+                assert first.status_code == second.status_code == requests.codes.ok
+
+                # Time spent in Kong, excluding the target
+                latencies[bool(warmup_entities)] = [
+                    int(resp.headers["X-Kong-Proxy-Latency"])
+                    for resp in (first, second)
+                ]
+            finally:
+                stop_replica(container_id)
+
+        logger.info(
+            f"Kong latency of the first and second requests, "
+            f"without warm-up: {latencies[False]}ms, with warm-up: {latencies[True]}ms"
+        )
+
+        self.manager.delete_route(route)
+        self.manager.delete_consumer(consumer_name)
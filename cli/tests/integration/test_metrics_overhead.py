@@ -0,0 +1,93 @@
+import shutil
+import subprocess
+from concurrent import futures
+
+import pytest
+import requests
+from loguru import logger
+
+from cli.model import METRICS_MODES, Route
+from tests.integration.common import GatewayTest, start_replica, stop_replica
+
+# Port of the fresh replicas started by the benchmark
+REPLICA_PORT = 8092
+
+N_REQUESTS = 5000
+CONCURRENCY = 32
+
+
+def docker_exec(container_id: str, *command: str) -> str:
+    return subprocess.run(
+        ["docker", "exec", container_id, *command],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def get_cpu_usage_ms(container_id: str) -> float:
+    """Get the CPU time used by a container since it started, from its cgroup."""
+    cpu_stat = docker_exec(container_id, "cat", "/sys/fs/cgroup/cpu.stat")
+    counters = dict(line.split() for line in cpu_stat.splitlines())
+
+    return int(counters["usage_usec"]) / 1000
+
+
+class TestMetricsOverhead(GatewayTest):
+    @pytest.fixture(autouse=True)
+    def require_docker_compose(self):
+        if self.infra or not shutil.which("docker"):
+            pytest.skip("Fresh replicas are started with docker compose")
+
+    def send_requests(self, url: str) -> None:
+        def send(_: int) -> None:
+            resp = requests.get(url, timeout=10)
+            assert resp.status_code == requests.codes.ok
+
+        with futures.ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            list(executor.map(send, range(N_REQUESTS)))
+
+    def test_cpu_overhead_by_metrics_mode(self):
+        route = Route("/metrics-overhead", self.env.gw_func_a_url)
+        self.manager.delete_route(route)
+        self.manager.add_route(route)
+        self.call_endpoint_until_response_code(
+            f"{self.env.gw_url}{route.relative_url}/hello", requests.codes.ok
+        )
+        url = f"http://localhost:{REPLICA_PORT}{route.relative_url}/hello"
+
+        # None is the baseline, without any metrics plugin
+        cpu_ms: dict[str | None, float] = {}
+        try:
+            for mode in [None, *METRICS_MODES]:
+                if mode:
+                    self.manager.setup_global_kong_metrics_plugin(mode)
+                else:
+                    self.manager.delete_global_kong_metrics_plugins()
+
+                # Only Kong is measured, the replicas do not run the agent
+                container_id = start_replica({}, REPLICA_PORT)
+                try:
+                    before = get_cpu_usage_ms(container_id)
+                    self.send_requests(url)
+                    # Scraped once, as the agent would at each interval
+                    metrics = docker_exec(
+                        container_id, "curl", "-s", "http://127.0.0.1:8100/metrics"
+                    )
+                    cpu_ms[mode] = get_cpu_usage_ms(container_id) - before
+                finally:
+                    stop_replica(container_id)
+
+                logger.info(
+                    f"Metrics mode {mode or 'none'}: {cpu_ms[mode]:.0f}ms of CPU "
+                    f"for {N_REQUESTS} requests, "
+                    f"{(cpu_ms[mode] - cpu_ms[None]) / N_REQUESTS * 1000:.1f}us "
+                    "per request over the baseline"
+                )
+
+                if mode == "prometheus":
+                    assert "kong_request_latency_ms_bucket" in metrics
+                    assert route.name in metrics
+        finally:
+            self.manager.delete_global_kong_metrics_plugins()
+            self.manager.delete_route(route)
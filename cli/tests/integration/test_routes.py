@@ -1,11 +1,15 @@
+import shutil
+import subprocess
+import threading
 import time
 
 import jwt
 import pytest
 import requests
+from loguru import logger
 
-from cli.model import Consumer, Route
-from tests.integration.common import GatewayTest
+from cli.model import Consumer, Route, Upstream, UpstreamTarget
+from tests.integration.common import COMPOSE_DIR, GatewayTest
 
 
 class TestEndpoint(GatewayTest):
@@ -292,3 +296,176 @@ class TestEndpoint(GatewayTest):
         # Delete the routes
         for r in routes:
             self.manager.delete_route(r)
+
+    def test_proxy_cache(self):
+        relative_url = "/cache-test"
+        full_url = f"{self.env.gw_url}{relative_url}/hello"
+        route = Route(
+            relative_url,
+            self.env.gw_func_a_url,
+            cache_ttl=30,
+            cache_content_types=["text/plain", "text/html", "application/json"],
+        )
+
+        self.manager.delete_route(route)
+        self.manager.add_route(route)
+
+        # Route listing round-trips the cache settings
+        matches = [r for r in self.manager.get_routes() if r == route]
+        assert len(matches) == 1
+
+        # Wait for the route to be ready, which fills the cache
+        miss = self.call_endpoint_until_response_code(full_url, requests.codes.ok)
+
+        hit = None
+        for _ in range(5):
+            hit = requests.get(full_url, timeout=5)
+            if hit.headers.get("X-Cache-Status") == "Hit":
+                break
+            time.sleep(2)
+
+        assert hit is not None
+        assert hit.headers.get("X-Cache-Status") == "Hit"
+        assert hit.content == miss.content
+
+        logger.info(
+            f"Upstream latency on miss: {miss.headers.get('X-Kong-Upstream-Latency')}"
+            f", on hit: {hit.headers.get('X-Kong-Upstream-Latency', 0)}"
+        )
+
+        self.manager.delete_route(route)
+
+    def test_load_balanced_route(self):
+        if not self.env.gw_func_b_url:
+            pytest.skip("Only one function is deployed")
+
+        relative_url = "/lb-test"
+        full_url = f"{self.env.gw_url}{relative_url}/hello"
+        route = Route(
+            relative_url,
+            self.env.gw_func_a_url,
+            upstream=Upstream(
+                targets=[
+                    UpstreamTarget(self.env.gw_func_a_url),
+                    UpstreamTarget(self.env.gw_func_b_url),
+                ],
+                passive_healthchecks=True,
+            ),
+        )
+
+        self.manager.delete_route(route)
+        self.manager.add_route(route)
+
+        # Route listing round-trips the upstream and its targets
+        matches = [r for r in self.manager.get_routes() if r == route]
+        assert len(matches) == 1
+
+        self.call_endpoint_until_response_code(full_url, requests.codes.ok)
+
+        # Round-robin spreads the requests over both functions
+        contents = {requests.get(full_url, timeout=5).content for _ in range(10)}
+        assert contents == {b"Hello from function A", b"Hello from function B"}
+
+        self.manager.delete_route(route)
+
+    def test_streaming_route(self):
+        if not self.env.gw_stream_url:
+            pytest.skip("Streaming endpoint is only deployed with docker compose")
+
+        events_path = "/events?count=5&interval=0.5"
+        for buffering in (True, False):
+            relative_url = "/stream-test"
+            route = Route(
+                relative_url,
+                self.env.gw_stream_url,
+                request_buffering=buffering,
+                response_buffering=buffering,
+            )
+
+            self.manager.delete_route(route)
+            self.manager.add_route(route)
+
+            matches = [r for r in self.manager.get_routes() if r == route]
+            assert len(matches) == 1
+
+            base_url = f"{self.env.gw_url}{relative_url}"
+            self.call_endpoint_until_response_code(
+                base_url + events_path, requests.codes.ok
+            )
+
+            start = time.perf_counter()
+            with requests.get(base_url + events_path, stream=True, timeout=10) as resp:
+                first_event = next(resp.iter_lines())
+                first_byte = time.perf_counter() - start
+            assert first_event == b"data: event 0"
+
+            with GatewayMemorySampler() as memory:
+                resp = requests.get(base_url + "/download?size_mb=256", timeout=60)
+                assert len(resp.content) == 256 * 1024 * 1024
+
+                upload = requests.post(
+                    base_url + "/upload", data=b"0" * 64 * 1024 * 1024, timeout=60
+                )
+                assert upload.json() == {"size": 64 * 1024 * 1024}
+
+            logger.info(
+                f"Buffering {'on' if buffering else 'off'}: "
+                f"first event after {first_byte * 1000:.0f}ms, "
+                f"peak gateway memory {memory.peak_mb or 'unknown'}MB"
+            )
+
+            if not buffering:
+                # Events are forwarded as they are sent, not when all are
+                assert first_byte < 2
+
+            self.manager.delete_route(route)
+
+
+class GatewayMemorySampler:
+    """Sample the memory of the docker compose gateway in the background."""
+
+    def __init__(self, service: str = "kong", interval: float = 0.5):
+        self.service = service
+        self.interval = interval
+        self.peak_mb: float | None = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        container = subprocess.run(
+            ["docker", "compose", "ps", "-q", self.service],
+            cwd=COMPOSE_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        if not container:
+            return
+
+        while not self._stop.is_set():
+            usage = subprocess.run(
+                ["docker", "stats", "--no-stream", "--format", "{{.MemUsage}}"]
+                + [container],
+                capture_output=True,
+                text=True,
+            ).stdout
+            # e.g. 215.3MiB / 7.7GiB
+            used = usage.split("/")[0].strip()
+            if used.endswith("MiB"):
+                mb = float(used.removesuffix("MiB"))
+            elif used.endswith("GiB"):
+                mb = float(used.removesuffix("GiB")) * 1024
+            else:
+                continue
+            self.peak_mb = max(self.peak_mb or 0, mb)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        if shutil.which("docker"):
+            self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
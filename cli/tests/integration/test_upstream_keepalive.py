@@ -0,0 +1,106 @@
+import shutil
+import statistics
+import subprocess
+from concurrent import futures
+
+import pytest
+import requests
+from loguru import logger
+
+from cli.model import Route
+from tests.integration.common import GatewayTest, start_replica, stop_replica
+
+# Port of the fresh replicas started by the benchmark
+REPLICA_PORT = 8091
+
+# Pool sizes compared by the benchmark, 0 disables the keepalive
+POOL_SIZES = [0, 16, 256]
+
+N_REQUESTS = 2000
+CONCURRENCY = 32
+
+
+def count_tcp_handshakes(container_id: str) -> int:
+    """Count the TCP connections opened by a container since it started.
+
+    Includes the connections to the database, which are kept in a pool.
+    """
+    snmp = subprocess.run(
+        ["docker", "exec", container_id, "cat", "/proc/net/snmp"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    header, values = [line for line in snmp.splitlines() if line.startswith("Tcp:")]
+    counters = dict(zip(header.split()[1:], values.split()[1:]))
+
+    return int(counters["ActiveOpens"])
+
+
+def p99(values: list[float]) -> float:
+    return statistics.quantiles(values, n=100)[98]
+
+
+class TestUpstreamKeepalive(GatewayTest):
+    @pytest.fixture(autouse=True)
+    def require_docker_compose(self):
+        if self.infra or not shutil.which("docker"):
+            pytest.skip("Fresh replicas are started with docker compose")
+
+    def send_requests(self, urls: list[str]) -> tuple[list[float], list[float]]:
+        """Send requests to the targets, and get their total and upstream latency."""
+
+        def send(i: int) -> tuple[float, float]:
+            resp = requests.get(urls[i % len(urls)], timeout=10)
+            assert resp.status_code == requests.codes.ok
+            return (
+                resp.elapsed.total_seconds() * 1000,
+                float(resp.headers["X-Kong-Upstream-Latency"]),
+            )
+
+        with futures.ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            latencies = list(executor.map(send, range(N_REQUESTS)))
+
+        return [total for total, _ in latencies], [up for _, up in latencies]
+
+    def test_handshakes_and_latency_by_pool_size(self):
+        routes = [
+            Route("/keepalive-a", self.env.gw_func_a_url),
+            Route("/keepalive-b", self.env.gw_func_b_url),
+        ]
+        for route in routes:
+            self.manager.delete_route(route)
+            self.manager.add_route(route)
+            self.call_endpoint_until_response_code(
+                f"{self.env.gw_url}{route.relative_url}/hello", requests.codes.ok
+            )
+
+        urls = [
+            f"http://localhost:{REPLICA_PORT}{route.relative_url}/hello"
+            for route in routes
+        ]
+
+        handshakes = {}
+        for pool_size in POOL_SIZES:
+            container_id = start_replica(
+                {"KONG_UPSTREAM_KEEPALIVE_POOL_SIZE": str(pool_size)}, REPLICA_PORT
+            )
+            try:
+                before = count_tcp_handshakes(container_id)
+                total, upstream = self.send_requests(urls)
+                handshakes[pool_size] = count_tcp_handshakes(container_id) - before
+            finally:
+                stop_replica(container_id)
+
+            logger.info(
+                f"Upstream keepalive pool of {pool_size}: "
+                f"{handshakes[pool_size]} TCP handshakes for {N_REQUESTS} requests, "
+                f"p99 latency {p99(total):.1f}ms, upstream {p99(upstream):.1f}ms"
+            )
+
+        # Without keepalive, each request opens a connection to its target
+        assert handshakes[0] >= N_REQUESTS
+        assert handshakes[max(POOL_SIZES)] < handshakes[0]
+
+        for route in routes:
+            self.manager.delete_route(route)
@@ -0,0 +1,37 @@
+import asyncio
+
+import responses
+
+from cli.async_gateway import AsyncGatewayManager, run_batch
+from cli.conf import InfraConfiguration
+from cli.gateway import GatewayManager, KongAPIException
+
+ADMIN_URL = "http://localhost:8001"
+
+
+@responses.activate
+def test_run_batch_collects_errors():
+    responses.post(
+        ADMIN_URL + "/consumers",
+        status=409,
+        json={"message": "UNIQUE violation detected"},
+        match=[
+            responses.matchers.json_params_matcher(
+                {"username": "taken"}, strict_match=False
+            )
+        ],
+    )
+    responses.post(ADMIN_URL + "/consumers", json={})
+
+    async def add_consumers(names: list[str]):
+        manager = GatewayManager(config=InfraConfiguration.from_local())
+        async with AsyncGatewayManager(manager, concurrency=4) as async_manager:
+            return await run_batch({n: async_manager.add_consumer(n) for n in names})
+
+    names = [f"consumer-{i}" for i in range(10)] + ["taken"]
+    batch = asyncio.run(add_consumers(names))
+
+    assert not batch.ok
+    assert set(batch.results) == set(names) - {"taken"}
+    assert list(batch.errors) == ["taken"]
+    assert isinstance(batch.errors["taken"], KongAPIException)
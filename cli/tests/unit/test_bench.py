@@ -0,0 +1,79 @@
+import threading
+from http import server
+
+import responses
+
+from cli import bench
+
+URL = "http://localhost:8080/func-a"
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 1001)]
+
+    assert bench.get_percentiles(values) == {
+        "p50": 500.0,
+        "p90": 900.0,
+        "p99": 990.0,
+        "p999": 999.0,
+    }
+    assert bench.percentile([], 0.5) is None
+
+
+def test_direct_url_of_local_target_uses_published_port():
+    assert (
+        bench.get_direct_url("http://func-a:80", "/hello", local=True)
+        == "http://localhost:8004/hello"
+    )
+    assert (
+        bench.get_direct_url(
+            "https://func-a.functions.fnc.fr-par.scw.cloud", "/hello", local=False
+        )
+        == "https://func-a.functions.fnc.fr-par.scw.cloud/hello"
+    )
+
+
+@responses.activate
+def test_run_load_counts_errors():
+    responses.get(URL, status=200, headers={bench.KONG_PROXY_LATENCY_HEADER: "2"})
+    responses.get(URL, status=502)
+
+    result = bench.run_load(URL, bench.LoadSettings(n_requests=20, warmup=0))
+
+    assert result.n_requests == 20
+    assert result.status_codes["502"] == result.n_errors
+    assert 0 < result.error_rate < 1
+    assert bench.get_percentiles(result.kong_latencies_ms)["p50"] == 2.0
+
+
+def test_run_load_measures_open_connections():
+    connections = []
+
+    class Handler(server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{httpd.server_port}/"
+        settings = bench.LoadSettings(n_requests=40, concurrency=4, warmup=4)
+        result = bench.run_load(url, settings)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert result.status_codes == {"200": 40}
+    # Only the warm-up requests of each worker open a connection
+    assert len(connections) == settings.concurrency
@@ -0,0 +1,69 @@
+import pytest
+import responses
+
+from cli import cache
+from cli.conf import InfraConfiguration
+from cli.gateway import GatewayManager
+
+ADMIN_URL = "http://localhost:8001"
+DB_LESS_ADMIN_URL = "http://localhost:8002"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+
+
+def get_manager(variant: str = "traditional") -> GatewayManager:
+    return GatewayManager(config=InfraConfiguration.from_local(variant), use_cache=True)
+
+
+def count_calls(url: str) -> int:
+    return len([c for c in responses.calls if str(c.request.url).startswith(url)])
+
+
+@responses.activate
+def test_reads_are_cached_until_a_write():
+    responses.get(ADMIN_URL + "/consumers", json={"data": [{"username": "alpha"}]})
+    responses.post(ADMIN_URL + "/consumers", json={})
+
+    get_manager().get_consumers()
+    get_manager().get_consumers()
+    assert count_calls(ADMIN_URL + "/consumers") == 1
+
+    get_manager().add_consumer("beta")
+    get_manager().get_consumers()
+    assert count_calls(ADMIN_URL + "/consumers?") == 2
+
+
+@responses.activate
+def test_expired_entries_are_revalidated_with_configuration_hash():
+    responses.get(DB_LESS_ADMIN_URL + "/status", json={"configuration_hash": "abc"})
+    responses.get(
+        DB_LESS_ADMIN_URL + "/consumers", json={"data": [{"username": "alpha"}]}
+    )
+
+    manager = get_manager("db-less")
+    manager.cache.ttl = 0
+    manager.get_consumers()
+
+    manager = get_manager("db-less")
+    manager.cache.ttl = 0
+    consumers = manager.get_consumers()
+
+    assert [c.username for c in consumers] == ["alpha"]
+    assert count_calls(DB_LESS_ADMIN_URL + "/consumers") == 1
+    assert count_calls(DB_LESS_ADMIN_URL + "/status") == 2
+
+
+@responses.activate
+def test_expired_entries_with_a_database_are_refetched_without_probe():
+    responses.get(ADMIN_URL + "/consumers", json={"data": [{"username": "alpha"}]})
+
+    for _ in range(2):
+        manager = get_manager()
+        manager.cache.ttl = 0
+        manager.get_consumers()
+
+    assert count_calls(ADMIN_URL + "/consumers") == 2
+    assert count_calls(ADMIN_URL + "/status") == 0
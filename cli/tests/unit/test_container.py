@@ -0,0 +1,165 @@
+import pathlib
+from unittest import mock
+
+import click
+import pytest
+import scaleway.container.v1beta1 as sdk
+
+from cli.commands import options
+from cli.infra import container, image, rdb, tuning
+
+KONG_CONF = pathlib.Path(__file__).parents[3] / "gateway/config/kong.conf"
+DATABASE = container.KongDatabase(host="db", port=5432, password="password")
+
+
+def test_kong_env_vars_warm_up_cache():
+    env_vars, _ = container.get_kong_env_vars(
+        container.KongSettings(cache_warmup_entities=["services", "routes"]),
+        database=DATABASE,
+    )
+
+    assert env_vars["KONG_DB_CACHE_WARMUP_ENTITIES"] == "services,routes"
+
+
+def test_db_less_env_vars_skip_cache_warmup():
+    env_vars, _ = container.get_kong_env_vars(
+        container.KongSettings(), declarative_config="{}"
+    )
+
+    assert "KONG_DB_CACHE_WARMUP_ENTITIES" not in env_vars
+
+
+def test_kong_conf_warms_up_default_entities():
+    entities = ",".join(container.DEFAULT_CACHE_WARMUP_ENTITIES)
+
+    assert f"db_cache_warmup_entities = {entities}\n" in KONG_CONF.read_text()
+
+
+def test_cache_warmup_option_rejects_unknown_entities():
+    ctx = click.Context(click.Command("deploy"))
+    param = click.Option(["--cache-warmup-entities"])
+
+    assert options.split_cache_warmup_entities(ctx, param, "none") == []
+    assert options.split_cache_warmup_entities(ctx, param, "routes, upstreams") == [
+        "routes",
+        "upstreams",
+    ]
+    with pytest.raises(click.BadParameter, match="Unknown Kong entity route"):
+        options.split_cache_warmup_entities(ctx, param, "route")
+
+
+def test_image_without_metrics_is_slim():
+    assert image.get_image_tag(forward_metrics=False) == image.IMAGE_SLIM_TAG
+    assert image.get_image_tag(forward_metrics=True) == image.IMAGE_TAG
+
+
+def test_kong_env_vars_set_metrics_mode():
+    env_vars, secret_env_vars = container.get_kong_env_vars(
+        container.KongSettings(metrics_mode="prometheus"),
+        database=DATABASE,
+        metrics_token="token",
+        metrics_push_url="https://metrics",
+    )
+
+    assert env_vars["FORWARD_METRICS"] == "1"
+    assert env_vars["METRICS_MODE"] == "prometheus"
+    assert "COCKPIT_METRICS_TOKEN" in [s.key for s in secret_env_vars]
+
+
+def test_kong_env_vars_read_from_replica():
+    env_vars, _ = container.get_kong_env_vars(
+        container.KongSettings(),
+        database=container.KongDatabase(
+            "primary", 5432, "password", ro_host="replica", ro_port=5433
+        ),
+    )
+
+    assert env_vars["KONG_PG_HOST"] == "primary"
+    assert env_vars["KONG_PG_RO_HOST"] == "replica"
+    assert env_vars["KONG_PG_RO_PORT"] == "5433"
+
+
+def test_pg_pool_fits_in_max_connections():
+    max_connections = 100
+    pool_size = container.get_pg_pool_size(max_connections)
+
+    workers = tuning.get_worker_processes(
+        tuning.TUNING_PROFILES[tuning.DEFAULT_TUNING_PROFILE],
+        container.CONTAINER_CPU_LIMIT,
+        container.CONTAINER_MEMORY_LIMIT,
+    )
+    total = pool_size * (
+        container.CONTAINER_MAX_SCALE * workers
+        + container.CONTAINER_ADMIN_WORKER_PROCESSES
+    )
+    assert 0 < total <= max_connections - rdb.DB_RESERVED_CONNECTIONS
+
+    env_vars = container.get_kong_admin_env_vars(
+        container.KongDatabase("db", 5432, "password", pg_pool_size=pool_size)
+    )
+    assert env_vars["KONG_PG_POOL_SIZE"] == str(pool_size)
+    assert env_vars["KONG_NGINX_WORKER_PROCESSES"] == "1"
+
+
+def test_scaling_policy_sizes_kong():
+    scaling = container.ScalingPolicy().replace(
+        max_scale=10, cpu_limit=1000, memory_limit=2048, min_scale=None
+    )
+
+    assert scaling.min_scale == container.CONTAINER_MIN_SCALE
+    assert container.get_pg_pool_size(100, scaling=scaling) == 8
+
+    env_vars, _ = container.get_kong_env_vars(
+        container.KongSettings(scaling=scaling), database=DATABASE
+    )
+    assert env_vars["KONG_NGINX_WORKER_PROCESSES"] == "1"
+    assert env_vars["KONG_MEM_CACHE_SIZE"] == "256m"
+
+    with pytest.raises(ValueError):
+        scaling.replace(min_scale=20)
+
+
+def test_containers_join_private_network():
+    api = mock.Mock()
+
+    container.create_kong_container(
+        api,
+        "namespace",
+        container.KongSettings(),
+        database=DATABASE,
+        private_network_id="private-network",
+    )
+    container.create_kong_admin_container(
+        api, "namespace", DATABASE, private_network_id="private-network"
+    )
+
+    for call in api.create_container.call_args_list:
+        assert call.kwargs["private_network_id"] == "private-network"
+
+
+def test_kong_settings_read_from_container():
+    settings = container.KongSettings(
+        tuning_profile="small",
+        cache_warmup_entities=["routes"],
+        scaling=container.ScalingPolicy(max_scale=3),
+    )
+    env_vars, _ = container.get_kong_env_vars(settings, database=DATABASE)
+    deployed = mock.Mock(
+        spec=sdk.Container,
+        environment_variables=env_vars,
+        min_scale=settings.scaling.min_scale,
+        max_scale=settings.scaling.max_scale,
+        max_concurrency=settings.scaling.max_concurrency,
+        cpu_limit=settings.scaling.cpu_limit,
+        memory_limit=settings.scaling.memory_limit,
+    )
+
+    assert container.KongSettings.from_container(deployed) == settings
+
+
+def test_namespace_activates_vpc_integration():
+    api = mock.Mock()
+
+    container.create_namespace(api)
+
+    assert api.create_namespace.call_args.kwargs["activate_vpc_integration"]
@@ -0,0 +1,128 @@
+import io
+import re
+import textwrap
+
+import click
+import pytest
+
+from cli.commands import options
+from cli.declarative import DeclarativeFile, render_config
+
+DECLARATIVE_FILE = """
+routes:
+  - relative_url: /func-a
+    target: http://func-a:80
+    cors: true
+  - relative_url: /func-b
+    target: http://func-b:80
+    http_methods: [GET]
+    jwt: true
+consumers:
+  - username: app
+    jwt_credentials:
+      - algorithm: HS256
+        key: app-issuer
+        secret: secret
+"""
+
+
+def test_render_config():
+    declarative_file = DeclarativeFile.load(io.StringIO(DECLARATIVE_FILE))
+
+    config = render_config(declarative_file.routes, declarative_file.consumers)
+
+    assert config["_format_version"] == "3.0"
+
+    services = {s["name"]: s for s in config["services"]}
+    assert services.keys() == {"_func-a", "_func-b"}
+    assert services["_func-a"]["url"] == "http://func-a:80"
+
+    route_a = services["_func-a"]["routes"][0]
+    assert route_a["paths"] == ["/func-a"]
+    assert "methods" not in route_a
+    assert [p["name"] for p in route_a["plugins"]] == ["cors"]
+
+    route_b = services["_func-b"]["routes"][0]
+    assert route_b["methods"] == ["GET"]
+    assert [p["name"] for p in route_b["plugins"]] == ["jwt"]
+
+    assert config["consumers"] == [
+        {
+            "username": "app",
+            "tags": ["scwgw"],
+            "jwt_secrets": [
+                {"algorithm": "HS256", "key": "app-issuer", "secret": "secret"}
+            ],
+        }
+    ]
+    assert [p["name"] for p in config["plugins"]] == ["statsd"]
+
+
+def test_render_config_with_prometheus_metrics():
+    declarative_file = DeclarativeFile.load(io.StringIO(DECLARATIVE_FILE))
+
+    config = render_config(declarative_file.routes, metrics_mode="prometheus")
+
+    assert [p["name"] for p in config["plugins"]] == ["prometheus"]
+    assert not config["plugins"][0]["config"]["per_consumer"]
+
+
+@pytest.mark.parametrize(
+    "routes, error",
+    [
+        ("- target: http://func-a:80", "route 0 (without relative_url)"),
+        ("- relative_url: /func-a", "route 0 (/func-a): Missing target or upstream"),
+        (
+            "- {relative_url: /func-a, target: http://func-a:80}\n"
+            "- {relative_url: /func-a, target: http://func-b:80}",
+            "route 1 (/func-a): Duplicate route",
+        ),
+    ],
+)
+def test_load_rejects_invalid_routes(routes: str, error: str):
+    with pytest.raises(ValueError, match=re.escape(error)):
+        DeclarativeFile.load(io.StringIO(f"routes:\n{textwrap.indent(routes, '  ')}"))
+
+
+def test_declarative_file_option_reports_errors_through_click():
+    ctx = click.Context(click.Command("apply"))
+    stream = io.StringIO("routes:\n  - relative_url: /func-a\n")
+
+    with pytest.raises(click.BadParameter, match="Missing target or upstream"):
+        options.load_declarative_file(ctx, click.Option(["--file"]), stream)
+
+
+@pytest.mark.parametrize(
+    "content, error",
+    [
+        ("- relative_url: /func-a", "Expected a mapping"),
+        ("routes: {relative_url: /func-a}", "Expected a list of routes"),
+        ("consumers:\n  - jwt_credentials: []", "consumer 0: expected a username"),
+        (
+            "consumers:\n  - username: app\n    jwt_credentials: secret",
+            "consumer 0 (app): expected a list of jwt_credentials",
+        ),
+        (
+            "consumers:\n  - username: app\n    jwt_credentials: [{key: app}]",
+            "with algorithm, key, secret",
+        ),
+    ],
+)
+def test_load_rejects_invalid_structure(content: str, error: str):
+    with pytest.raises(ValueError, match=re.escape(error)):
+        DeclarativeFile.load(io.StringIO(content))
+
+
+def test_grpc_routes_need_local_gateway():
+    routes = DeclarativeFile.load(
+        io.StringIO(
+            "routes:\n"
+            "  - relative_url: /my.Service\n"
+            "    target: grpc://my-grpc-server:50051\n"
+            "    protocols: [grpc, grpcs]\n"
+        )
+    ).routes
+
+    options.check_grpc_routes(routes, is_local=True)
+    with pytest.raises(click.UsageError, match="Route /my.Service uses gRPC"):
+        options.check_grpc_routes(routes, is_local=False)
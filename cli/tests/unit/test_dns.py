@@ -0,0 +1,37 @@
+import pathlib
+from unittest import mock
+
+import pytest
+import scaleway.container.v1beta1 as sdk
+
+from cli.infra import dns
+
+KONG_CONF = pathlib.Path(__file__).parents[3] / "gateway/config/kong.conf"
+
+
+def test_dns_settings_read_from_container():
+    settings = dns.DnsSettings().replace(valid_ttl=300, resolver="10.0.0.2:53")
+    env_vars = dns.get_dns_env_vars(settings)
+    container = mock.Mock(spec=sdk.Container, environment_variables=env_vars)
+
+    assert dns.DnsSettings.from_container(container) == settings
+
+
+def test_dns_order_rejects_unknown_types():
+    with pytest.raises(ValueError):
+        dns.DnsSettings(order="LAST,MX")
+
+
+def test_kong_conf_has_default_dns_settings():
+    kong_conf = KONG_CONF.read_text()
+
+    for key, value in dns.get_dns_env_vars(dns.DnsSettings()).items():
+        setting = key.removeprefix("KONG_").lower()
+        assert f"{setting} = {value}\n" in kong_conf
+
+
+def test_resolve_host():
+    addresses, elapsed_ms = dns.resolve_host("localhost")
+
+    assert addresses
+    assert elapsed_ms >= 0
@@ -0,0 +1,276 @@
+import json
+
+import pytest
+import responses
+
+from cli.conf import InfraConfiguration
+from cli.gateway import GatewayManager
+from cli.model import Route, RoutePlan, Upstream, UpstreamTarget
+
+ADMIN_URL = "http://localhost:8001"
+
+
+@pytest.fixture
+def manager() -> GatewayManager:
+    return GatewayManager(config=InfraConfiguration.from_local(), page_size=2)
+
+
+def add_collection(
+    url: str, entities: list[dict], page_size: int = 2, tags: str = "scwgw"
+):
+    """Register a paginated Kong collection, one response per page."""
+    pages = [entities[i : i + page_size] for i in range(0, len(entities), page_size)]
+    for i, page in enumerate(pages or [[]]):
+        body: dict = {"data": page, "next": None}
+        if i < len(pages) - 1:
+            body["offset"] = f"page-{i + 1}"
+            body["next"] = f"{url}?offset=page-{i + 1}"
+
+        params = {"size": str(page_size)}
+        if tags:
+            params["tags"] = tags
+        if i > 0:
+            params["offset"] = f"page-{i}"
+
+        responses.get(
+            ADMIN_URL + url,
+            json=body,
+            match=[responses.matchers.query_param_matcher(params)],
+        )
+
+
+@responses.activate
+def test_iter_collection_follows_offset(manager: GatewayManager):
+    consumers = [{"username": f"user-{i}"} for i in range(5)]
+    add_collection("/consumers", consumers, tags="")
+
+    actual = list(manager.iter_collection(manager.consumers_url))
+
+    assert actual == consumers
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_get_routes_reads_all_pages(manager: GatewayManager):
+    n_routes = 5
+    routes: list[dict] = []
+    services: list[dict] = []
+    for i in range(n_routes):
+        name = f"_route-{i}"
+        routes.append(
+            {"id": f"id-{i}", "name": name, "paths": [f"/route-{i}"], "methods": None}
+        )
+        services.append(
+            {"name": name, "host": f"func-{i}", "port": 80, "protocol": "http"}
+        )
+
+    plugins: list[dict] = [
+        {"name": "jwt", "route": {"id": "id-1"}},
+        {"name": "cors", "route": {"id": "id-4"}},
+        {"name": "statsd", "route": None},
+    ]
+
+    add_collection("/routes", routes)
+    add_collection("/services", services)
+    add_collection("/plugins", plugins)
+    add_collection("/upstreams", [])
+
+    actual = manager.get_routes()
+
+    expected = [Route(f"/route-{i}", f"http://func-{i}:80") for i in range(n_routes)]
+    expected[1].jwt = True
+    expected[4].cors = True
+    assert actual == expected
+
+
+@responses.activate
+def test_apply_unchanged_routes_makes_no_writes(manager: GatewayManager):
+    add_collection(
+        "/routes", [{"id": "id-a", "name": "_a", "paths": ["/a"], "methods": None}]
+    )
+    add_collection(
+        "/services", [{"name": "_a", "host": "func-a", "port": 80, "protocol": "http"}]
+    )
+    add_collection("/plugins", [])
+    add_collection("/upstreams", [])
+
+    plan = manager.plan_routes([Route("/a", "http://func-a")])
+    manager.apply_route_plan(plan)
+
+    assert plan.is_empty
+    assert all(call.request.method == "GET" for call in responses.calls)
+
+
+@responses.activate
+def test_get_routes_reads_upstream_health(manager: GatewayManager):
+    route = Route(
+        "/lb",
+        "https://func-a.functions.fnc.fr-par.scw.cloud",
+        upstream=Upstream(
+            targets=[
+                UpstreamTarget("https://func-a.functions.fnc.fr-par.scw.cloud", 70),
+                UpstreamTarget("https://func-b.functions.fnc.fr-par.scw.cloud", 30),
+            ],
+            algorithm="least-connections",
+            healthcheck_path="/health",
+        ),
+    )
+
+    add_collection("/routes", [{"id": "id-lb", "name": route.name, "paths": ["/lb"]}])
+    add_collection(
+        "/services",
+        [
+            {
+                "name": route.name,
+                "host": route.upstream_name,
+                "port": 443,
+                "protocol": "https",
+            }
+        ],
+    )
+    add_collection("/plugins", [])
+    add_collection("/upstreams", [route.upstream_json()])
+    add_collection(
+        f"/upstreams/{route.upstream_name}/health",
+        [
+            {
+                "target": "func-a.functions.fnc.fr-par.scw.cloud:443",
+                "weight": 70,
+                "health": "HEALTHY",
+            },
+            {
+                "target": "func-b.functions.fnc.fr-par.scw.cloud:443",
+                "weight": 30,
+                "health": "UNHEALTHY",
+            },
+        ],
+        tags="",
+    )
+
+    [actual] = manager.get_routes()
+
+    assert actual == route
+    assert actual.upstream
+    assert [t.health for t in actual.upstream.targets] == ["HEALTHY", "UNHEALTHY"]
+
+
+@responses.activate
+def test_delete_route_only_deletes_its_upstream(manager: GatewayManager):
+    balanced = Route(
+        "/lb",
+        "http://func-a",
+        upstream=Upstream(targets=[UpstreamTarget("http://func-a", 100)]),
+    )
+    for route in (Route("/a", "http://func-a"), balanced):
+        responses.delete(f"{ADMIN_URL}/routes/{route.name}", status=204)
+        responses.delete(f"{ADMIN_URL}/services/{route.name}", status=204)
+    responses.delete(f"{ADMIN_URL}/upstreams/{balanced.upstream_name}", status=204)
+
+    manager.apply_route_plan(RoutePlan(deletes=[Route("/a", "http://func-a")]))
+    manager.apply_route_plan(RoutePlan(deletes=[balanced]))
+
+    assert len(responses.calls) == 5
+    responses.assert_call_count(f"{ADMIN_URL}/upstreams/{balanced.upstream_name}", 1)
+
+
+@responses.activate
+def test_get_routes_reads_timeouts(manager: GatewayManager):
+    add_collection("/routes", [{"id": "id-a", "name": "_a", "paths": ["/a"]}])
+    add_collection(
+        "/services",
+        [
+            {
+                "name": "_a",
+                "host": "func-a",
+                "port": 80,
+                "protocol": "http",
+                "connect_timeout": 5000,
+                "read_timeout": 120000,
+                "write_timeout": 60000,
+                "retries": 1,
+            }
+        ],
+    )
+    add_collection("/plugins", [])
+    add_collection("/upstreams", [])
+
+    [actual] = manager.get_routes()
+
+    assert actual.timeouts == {
+        "connect_timeout": 5000,
+        "read_timeout": 120000,
+        "retries": 1,
+    }
+    assert actual == Route.from_dict(
+        {
+            "relative_url": "/a",
+            "target": "http://func-a",
+            "timeout_profile": "serverless-cold-start",
+        }
+    )
+
+
+def test_grpc_route_requires_grpc_target(manager: GatewayManager):
+    with pytest.raises(ValueError):
+        manager.add_route(Route("/grpc", "http://func-a", protocols=["grpc"]))
+
+
+@responses.activate
+def test_setup_metrics_plugin_replaces_other_mode(manager: GatewayManager):
+    plugins: list[dict] = [
+        {"id": "route-statsd", "name": "statsd", "route": {"id": "id-1"}},
+        {"id": "global-statsd", "name": "statsd", "route": None},
+    ]
+    add_collection("/plugins", plugins, tags="")
+    responses.delete(ADMIN_URL + "/plugins/global-statsd")
+    responses.post(ADMIN_URL + "/plugins", json={"id": "global-prometheus"})
+
+    plugin_id = manager.setup_global_kong_metrics_plugin("prometheus")
+
+    assert plugin_id == "global-prometheus"
+    post = responses.calls[-1].request
+    assert post.method == "POST"
+    assert json.loads(post.body or "{}")["name"] == "prometheus"
+
+
+@responses.activate
+def test_untagged_route_is_managed_once_tagged(manager: GatewayManager):
+    route_json = {"id": "id-a", "name": "_a", "paths": ["/a"], "tags": None}
+    service_json = {
+        "id": "svc-a",
+        "name": "_a",
+        "host": "func-a",
+        "port": 80,
+        "protocol": "http",
+        "tags": ["team-a"],
+    }
+    untagged: dict[str, list[dict]] = {
+        "/routes": [route_json],
+        "/services": [service_json],
+    }
+    for collection in ("/plugins", "/upstreams", "/consumers"):
+        untagged[collection] = []
+    for collection, entities in untagged.items():
+        add_collection(collection, entities, tags="")
+        # Listed with the managed tag once tagged
+        add_collection(
+            collection,
+            [e | {"tags": ["scwgw"] + (e["tags"] or [])} for e in entities],
+        )
+    responses.patch(ADMIN_URL + "/routes/id-a")
+    responses.patch(ADMIN_URL + "/services/svc-a")
+
+    unmanaged = manager.get_unmanaged_entities()
+    manager.tag_entities(unmanaged)
+    plan = manager.plan_routes([Route("/a", "http://func-a")])
+
+    patches = {
+        call.request.url: json.loads(call.request.body or "{}")
+        for call in responses.calls
+        if call.request.method == "PATCH"
+    }
+    assert patches == {
+        ADMIN_URL + "/routes/id-a": {"tags": ["scwgw"]},
+        ADMIN_URL + "/services/svc-a": {"tags": ["scwgw", "team-a"]},
+    }
+    assert plan.is_empty
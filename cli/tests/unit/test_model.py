@@ -0,0 +1,134 @@
+import pytest
+
+from cli.model import (
+    Route,
+    RoutePlan,
+    RouteTable,
+    Upstream,
+    UpstreamTarget,
+    normalise_target,
+)
+
+
+@pytest.mark.parametrize(
+    "target,expected",
+    [
+        ("http://func-a", "http://func-a:80"),
+        ("https://func-a/hello", "https://func-a:443/hello"),
+        ("https://func-a:8005", "https://func-a:8005"),
+    ],
+)
+def test_normalise_target(target: str, expected: str):
+    assert normalise_target(target) == expected
+
+
+def test_route_table_rejects_duplicate_names():
+    table = RouteTable([Route("/a/b", "http://func-a")])
+
+    with pytest.raises(ValueError):
+        table.add(Route("/a_b", "http://func-b"))
+
+
+def test_route_plan_diff():
+    current = RouteTable(
+        [
+            Route("/same", "http://func-a:80", http_methods=["POST", "GET"]),
+            Route("/changed", "http://func-a:80"),
+            Route("/removed", "http://func-a:80"),
+        ]
+    )
+    desired = RouteTable(
+        [
+            Route("/same", "http://func-a", http_methods=["GET", "POST"]),
+            Route("/changed", "http://func-a:80", cors=True),
+            Route("/added", "http://func-b:80"),
+        ]
+    )
+
+    plan = RoutePlan.diff(desired, current)
+
+    assert [r.relative_url for r in plan.creates] == ["/added"]
+    assert [(r.relative_url, r.cors) for r, _ in plan.updates] == [("/changed", True)]
+    assert [r.relative_url for r in plan.deletes] == ["/removed"]
+
+
+def test_route_plan_no_changes():
+    routes = [Route("/a", "http://func-a:80"), Route("/b", "http://func-b:80")]
+
+    plan = RoutePlan.diff(RouteTable(routes), RouteTable(routes))
+
+    assert plan.is_empty
+
+
+def test_route_cache_defaults_are_equal():
+    route = Route("/a", "http://func-a:80", cache_ttl=30)
+    explicit = Route(
+        "/a",
+        "http://func-a:80",
+        cache_ttl=30,
+        cache_methods=["HEAD", "GET"],
+        cache_content_types=["text/plain", "application/json"],
+    )
+
+    assert route == explicit
+    assert route != Route("/a", "http://func-a:80", cache_ttl=60)
+
+
+def test_upstream_route_points_service_at_upstream():
+    route = Route(
+        "/lb",
+        "https://func-a/hello",
+        upstream=Upstream(
+            [
+                UpstreamTarget("https://func-a/hello"),
+                UpstreamTarget("https://func-b/hello"),
+            ]
+        ),
+    )
+
+    assert route.service_json()["url"] == f"https://{route.upstream_name}/hello"
+    assert [t.json()["target"] for t in route.upstream.targets] == [
+        "func-a:443",
+        "func-b:443",
+    ]
+
+
+def test_upstream_rejects_mixed_target_paths():
+    with pytest.raises(ValueError):
+        Upstream(
+            [UpstreamTarget("https://func-a/a"), UpstreamTarget("https://func-b/b")]
+        )
+
+
+def test_timeout_profile_options_take_precedence():
+    route = Route.from_dict(
+        {
+            "relative_url": "/a",
+            "target": "http://func-a",
+            "timeout_profile": "serverless-cold-start",
+            "read_timeout": 30000,
+        }
+    )
+
+    assert route.service_json()["read_timeout"] == 30000
+    assert route.service_json()["retries"] == 1
+    assert route != Route("/a", "http://func-a")
+    assert Route("/a", "http://func-a", retries=5) == Route("/a", "http://func-a")
+
+
+def test_streaming_route_round_trips():
+    route = Route(
+        "/events",
+        "http://stream",
+        protocols=["https"],
+        request_buffering=False,
+        response_buffering=False,
+    )
+    route_json = route.route_json()
+
+    actual = Route("/events", "http://stream")
+    actual.set_streaming_from_json(route_json)
+
+    assert route_json["response_buffering"] is False
+    assert actual == route
+    assert "protocols" not in Route("/a", "http://func-a").route_json()
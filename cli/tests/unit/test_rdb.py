@@ -0,0 +1,64 @@
+import socket
+import struct
+import threading
+from unittest import mock
+
+import pytest
+import scaleway.rdb.v1 as sdk
+
+from cli.infra import rdb
+
+
+@pytest.fixture
+def postgres_port():
+    """Answer the SSLRequest of one client, as a Postgres server without TLS."""
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            length, code = struct.unpack("!ii", conn.recv(8))
+            assert (length, code) == (8, rdb.PG_SSL_REQUEST_CODE)
+            conn.sendall(b"N")
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    yield server.getsockname()[1]
+    thread.join(timeout=2)
+    server.close()
+
+
+def test_measure_round_trip(postgres_port: int):
+    assert rdb.measure_round_trip("127.0.0.1", postgres_port) > 0
+
+
+def test_get_endpoint_by_path():
+    public = sdk.Endpoint(
+        id="public",
+        port=5432,
+        name=None,
+        private_network=None,
+        load_balancer=sdk.EndpointLoadBalancerDetails(),
+        direct_access=None,
+        hostname=None,
+        ip="51.15.0.1",
+    )
+    private = sdk.Endpoint(
+        id="private",
+        port=5432,
+        name=None,
+        private_network=sdk.EndpointPrivateNetworkDetails(
+            private_network_id="pn",
+            service_ip="172.16.0.2/22",
+            zone="fr-par-1",
+            provisioning_mode=sdk.EndpointPrivateNetworkDetailsProvisioningMode.IPAM,
+        ),
+        load_balancer=None,
+        direct_access=None,
+        hostname=None,
+        ip="172.16.0.2",
+    )
+    instance = mock.Mock(spec=sdk.Instance, endpoints=[private, public])
+
+    assert rdb.get_endpoint(instance) == public
+    assert rdb.get_endpoint(instance, private=True) == private
@@ -0,0 +1,61 @@
+import pathlib
+from unittest import mock
+
+import pytest
+import scaleway.container.v1beta1 as sdk
+import yaml
+
+from cli.infra import statsd
+from cli.model import DEFAULT_STATSD_METRICS, StatsdSettings, statsd_plugin_json
+
+AGENT_YAML = pathlib.Path(__file__).parents[3] / "gateway/observability/agent.yaml"
+
+
+def test_statsd_settings_read_from_container():
+    settings = StatsdSettings().replace(
+        metrics=("request_count", "request_per_user"), sample_rate=0.1
+    )
+    env_vars = statsd.get_statsd_env_vars(settings)
+    container = mock.Mock(spec=sdk.Container, environment_variables=env_vars)
+
+    assert statsd.get_statsd_settings(container) == settings
+
+
+def test_statsd_settings_reject_unknown_metrics():
+    with pytest.raises(ValueError):
+        StatsdSettings(metrics=("request_count", "unknown"))
+
+
+def test_statsd_plugin_only_samples_counters_and_gauges():
+    settings = StatsdSettings(
+        metrics=("request_count", "latency", "shdict_usage"), sample_rate=0.5
+    )
+
+    metrics = statsd_plugin_json(settings)["config"]["metrics"]
+
+    assert metrics == [
+        {"name": "request_count", "stat_type": "counter", "sample_rate": 0.5},
+        {"name": "latency", "stat_type": "timer"},
+        {"name": "shdict_usage", "stat_type": "gauge", "sample_rate": 0.5},
+    ]
+
+
+def test_agent_yaml_maps_default_metrics():
+    agent_config = yaml.safe_load(AGENT_YAML.read_text())
+
+    assert agent_config == statsd.render_agent_config(DEFAULT_STATSD_METRICS)
+
+
+def test_estimate_series_grows_with_consumers_per_consumer_metric():
+    series = statsd.estimate_series(
+        ["request_count", "latency", "status_count_per_user"],
+        n_routes=10,
+        n_consumers=1000,
+        n_nodes=5,
+    )
+
+    assert series == {
+        "request_count": 10,
+        "latency": 10 * statsd.HISTOGRAM_SERIES,
+        "status_count_per_user": 10 * 1000 * statsd.ESTIMATED_STATUS_CODES,
+    }
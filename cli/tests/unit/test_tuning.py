@@ -0,0 +1,40 @@
+import pathlib
+
+import pytest
+
+from cli.infra import container, tuning
+
+COMPOSE_TUNING_DIR = pathlib.Path(__file__).parents[3] / "gateway/config/tuning"
+
+
+@pytest.mark.parametrize("profile_name", list(tuning.TUNING_PROFILES))
+def test_compose_env_files_are_up_to_date(profile_name: str):
+    expected = tuning.render_env_file(
+        profile_name, container.CONTAINER_CPU_LIMIT, container.CONTAINER_MEMORY_LIMIT
+    )
+
+    actual = (COMPOSE_TUNING_DIR / f"{profile_name}.env").read_text()
+
+    assert actual.splitlines() == list(expected)
+
+
+def test_worker_processes_fit_in_memory():
+    profile = tuning.TUNING_PROFILES["default"]
+
+    assert tuning.get_worker_processes(profile, cpu_limit=2000, memory_limit=1024) == 2
+    assert tuning.get_worker_processes(profile, cpu_limit=4000, memory_limit=512) == 2
+    assert tuning.get_worker_processes(profile, cpu_limit=250, memory_limit=512) == 1
+
+
+def test_kong_conf_keeps_upstream_connections_as_default_profile():
+    kong_conf = (COMPOSE_TUNING_DIR.parent / "kong.conf").read_text()
+    env_vars = tuning.get_tuning_env_vars(
+        tuning.DEFAULT_TUNING_PROFILE,
+        container.CONTAINER_CPU_LIMIT,
+        container.CONTAINER_MEMORY_LIMIT,
+    )
+
+    for key, value in env_vars.items():
+        if key.startswith("KONG_UPSTREAM_KEEPALIVE_"):
+            setting = key.removeprefix("KONG_").lower()
+            assert f"{setting} = {value}\n" in kong_conf
@@ -0,0 +1,47 @@
+import time
+
+from flask import Flask, Response, request
+
+app = Flask(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+@app.route("/events")
+def events():
+    """Server-sent events, sent one at a time."""
+    count = request.args.get("count", default=5, type=int)
+    interval = request.args.get("interval", default=0.5, type=float)
+
+    def generate():
+        for i in range(count):
+            yield f"data: event {i}\n\n"
+            time.sleep(interval)
+
+    return Response(generate(), mimetype="text/event-stream")
+
+
+@app.route("/download")
+def download():
+    """Large response, streamed in chunks."""
+    size_mb = request.args.get("size_mb", default=64, type=int)
+
+    def generate():
+        chunk = b"0" * CHUNK_SIZE
+        for _ in range(size_mb * 1024 * 1024 // CHUNK_SIZE):
+            yield chunk
+
+    return Response(generate(), mimetype="application/octet-stream")
+
+
+@app.route("/upload", methods=["POST"])
+def upload():
+    """Large request, read in chunks."""
+    size = 0
+    while chunk := request.stream.read(CHUNK_SIZE):
+        size += len(chunk)
+
+    return {"size": size}
+
+
+app.run(host="0.0.0.0", port=80, threaded=True)
@@ -0,0 +1,20 @@
+#!/bin/bash
+
+# Health check of a Kong node, which passes once its cache is warmed up
+
+set -e
+
+# Written by startup.sh once Kong has logged the warm-up of each entity
+WARMUP_MARKER=/var/run/kong/warmup-done
+
+kong health > /dev/null
+
+# Admin nodes and DB-less nodes don't warm up their cache
+if [ -n "$IS_ADMIN_CONTAINER" ] || [ "$KONG_DATABASE" = "off" ]; then
+    exit 0
+fi
+
+if [ ! -f "$WARMUP_MARKER" ]; then
+    echo "Cache warm-up not finished"
+    exit 1
+fi
@@ -2,9 +2,19 @@
 
 set -e
 
-# We sleep here as we need to give the gateway time to start
-sleep 30
+# The agent either receives the statsd metrics of Kong, or scrapes its prometheus
+# metrics, depending on the metrics mode set by the CLI
+AGENT_CONFIG=/etc/agent/agent.yaml
+if [ "$METRICS_MODE" = "prometheus" ]; then
+    AGENT_CONFIG=/etc/agent/agent-prometheus.yaml
+elif [ -n "$STATSD_AGENT_CONFIG" ]; then
+    # Rendered by the CLI with the mappings of the statsd metrics it selected
+    AGENT_CONFIG=/tmp/agent-statsd.yaml
+    echo "$STATSD_AGENT_CONFIG" > "$AGENT_CONFIG"
+fi
 
+# Started by startup.sh once Kong is healthy, so that its metrics are received
+# from the first requests
 /bin/grafana-agent                      \
     --config.expand-env                 \
-    --config.file=/etc/agent/agent.yaml
+    --config.file="$AGENT_CONFIG"
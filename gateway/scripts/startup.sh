@@ -2,28 +2,163 @@
 
 set -em
 
+# Startup phases are logged with their duration, to measure cold starts
+STARTUP_START_US=${EPOCHREALTIME/./}
+PHASE_START_US=$STARTUP_START_US
+
+log_phase() {
+    local now_us=${EPOCHREALTIME/./}
+    echo "Startup phase $1 took $(((now_us - PHASE_START_US) / 1000))ms" \
+        "($(((now_us - STARTUP_START_US) / 1000))ms since start)"
+    PHASE_START_US=$now_us
+}
+
+# Wait for the admin container to apply the database migrations, polling with
+# an exponential backoff capped to a few seconds
+MIGRATIONS_TIMEOUT_SECONDS=${MIGRATIONS_TIMEOUT_SECONDS:-450}
+MIGRATIONS_MAX_BACKOFF_SECONDS=4
+
+wait_for_migrations() {
+    local backoff=0.25
+    local deadline=$((SECONDS + MIGRATIONS_TIMEOUT_SECONDS))
+
+    while true; do
+        # 0: up to date, 4: only pending migrations to finish, which Kong can run with
+        local status=0
+        kong migrations list -c /kong-conf/kong.conf > /dev/null 2>&1 || status=$?
+        if [ "$status" -eq 0 ] || [ "$status" -eq 4 ]; then
+            return 0
+        fi
+
+        if [ "$SECONDS" -ge "$deadline" ]; then
+            echo "Database migrations not applied after ${MIGRATIONS_TIMEOUT_SECONDS}s"
+            return 1
+        fi
+
+        echo "Waiting for database migrations (status $status), retrying in ${backoff}s"
+        sleep "$backoff"
+        backoff=$(awk -v b="$backoff" -v m="$MIGRATIONS_MAX_BACKOFF_SECONDS" \
+            'BEGIN { b *= 2; print (b > m ? m : b) }')
+    done
+}
+
+# Only run the migrations the database needs, which is usually none unless the
+# Kong version of the image changed
+run_migrations() {
+    local status=0
+    kong migrations list -c /kong-conf/kong-admin.conf > /dev/null 2>&1 || status=$?
+
+    case "$status" in
+    0)
+        echo "Database schema is up to date, skipping migrations"
+        ;;
+    3)
+        echo "Bootstrapping the database"
+        kong migrations bootstrap -c /kong-conf/kong-admin.conf
+        ;;
+    4)
+        # Pending migrations of an earlier upgrade may come with new migrations of
+        # this image, which are only listed once the pending ones are finished
+        echo "Finishing pending migrations, then running new migrations"
+        kong migrations finish -c /kong-conf/kong-admin.conf
+        kong migrations up -c /kong-conf/kong-admin.conf
+        kong migrations finish -c /kong-conf/kong-admin.conf
+        ;;
+    5)
+        echo "Running new migrations"
+        kong migrations up -c /kong-conf/kong-admin.conf
+        kong migrations finish -c /kong-conf/kong-admin.conf
+        ;;
+    *)
+        echo "Could not read the migrations state (status $status), running all"
+        kong migrations bootstrap -c /kong-conf/kong-admin.conf
+        kong migrations up -c /kong-conf/kong-admin.conf
+        kong migrations finish -c /kong-conf/kong-admin.conf
+        ;;
+    esac
+}
+
+NOTICE_LOG=/var/run/kong/logs/notice.log
+# Written once the cache is warmed up, checked by health.sh
+WARMUP_MARKER=/var/run/kong/warmup-done
+DEFAULT_WARMUP_ENTITIES=services,routes,plugins,consumers,jwt_secrets
+WARMUP_TIMEOUT_SECONDS=${WARMUP_TIMEOUT_SECONDS:-120}
+
+# Kong warms up its cache in the first worker, while other workers are already
+# serving requests, and logs a notice once each entity has been loaded. Past the
+# deadline, the instance is marked ready anyway: entities that are not loaded yet
+# are read on their first use.
+wait_for_cache_warmup() {
+    local entities
+    local deadline=$((SECONDS + WARMUP_TIMEOUT_SECONDS))
+    IFS=',' read -ra entities <<< "${KONG_DB_CACHE_WARMUP_ENTITIES-$DEFAULT_WARMUP_ENTITIES}"
+    for entity in "${entities[@]}"; do
+        until grep -q "finished preloading '$entity'" "$NOTICE_LOG" 2> /dev/null; do
+            if [ "$SECONDS" -ge "$deadline" ]; then
+                echo "Cache not warmed up after ${WARMUP_TIMEOUT_SECONDS}s, '$entity' not loaded"
+                touch "$WARMUP_MARKER"
+                return 0
+            fi
+            sleep 0.2
+        done
+    done
+    touch "$WARMUP_MARKER"
+}
+
+# Notices are only read for the warm-up, and would grow the log for the lifetime
+# of the container: it is replaced by /dev/null, which nginx reopens on USR1
+stop_notice_log() {
+    ln -sf /dev/null "$NOTICE_LOG"
+    kill -USR1 "$(cat /var/run/kong/pids/nginx.pid)"
+}
+
+# Runs in the background while Kong serves in the foreground
+watch_readiness() {
+    until kong health > /dev/null 2>&1; do
+        sleep 0.2
+    done
+    log_phase kong-started
+
+    if [ ! -z "$FORWARD_METRICS" ]; then
+        if [ -x /bin/grafana-agent ]; then
+            echo "Starting Grafana Agent in background"
+            /scripts/run-grafana-agent.sh &
+        else
+            echo "Metrics are not forwarded, the slim image has no Grafana Agent"
+        fi
+    fi
+
+    # Admin nodes have no notice log, and DB-less nodes don't warm up their cache
+    if [ -z "$IS_ADMIN_CONTAINER" ]; then
+        if [ "$KONG_DATABASE" != "off" ]; then
+            wait_for_cache_warmup
+        fi
+        stop_notice_log
+    fi
+    log_phase ready
+}
+
 # Run migrations only from the admin container
 if [ ! -z "$IS_ADMIN_CONTAINER" ]; then
-    echo "Running Kong migrations"
-
-    kong migrations bootstrap
-    kong migrations up
-    kong migrations finish
+    run_migrations
+    log_phase migrations
 
     echo "Starting Kong admin"
+    watch_readiness &
     kong start -v -c /kong-conf/kong-admin.conf
 else
-    if [ ! -z "$FORWARD_METRICS" ]; then
-        echo "Starting Grafana Agent in background"
-        /scripts/run-grafana-agent.sh &
+    # Notices of a previous start would pass the health check before the warm-up
+    rm -f "$NOTICE_LOG" "$WARMUP_MARKER"
+
+    # Nodes without a database don't depend on migrations
+    if [ "$KONG_DATABASE" != "off" ]; then
+        wait_for_migrations
+        log_phase migrations-wait
     fi
 
     echo "Starting Kong"
 
     # Reference: https://docs.docker.com/config/containers/multi-service_container/
-    # We need to retry here to give the admin container time to apply database migrations
-    for i in {1..30}; do
-        kong start -v -c /kong-conf/kong.conf && break || sleep 15;
-    done
+    watch_readiness &
+    kong start -v -c /kong-conf/kong.conf
 fi
-
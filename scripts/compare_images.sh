@@ -0,0 +1,59 @@
+#!/bin/bash
+
+set -e
+
+# Compare the size and the time to healthy of the full and slim gateway images.
+# Needs the database of docker-compose: docker compose -f gateway/docker-compose.yml up -d
+RUNS=${RUNS:-3}
+TARGETS="full slim"
+COMPOSE_FILE=gateway/docker-compose.yml
+
+DB_CONTAINER=$(docker compose -f $COMPOSE_FILE ps -q db)
+if [ -z "$DB_CONTAINER" ]; then
+    echo "The docker-compose database is not running"
+    exit 1
+fi
+NETWORK=$(docker inspect \
+    --format '{{range $name, $_ := .NetworkSettings.Networks}}{{$name}}{{end}}' \
+    "$DB_CONTAINER")
+
+now_ms() {
+    echo $(($(date +%s%N) / 1000000))
+}
+
+for target in $TARGETS; do
+    docker build --quiet --target "$target" -t "scwgw-compare:$target" gateway > /dev/null
+done
+
+printf "%-6s %10s %18s %18s\n" "Image" "Size (MB)" "Healthy after (ms)" "Ready phase (ms)"
+
+for target in $TARGETS; do
+    image="scwgw-compare:$target"
+    size=$(docker image inspect --format '{{.Size}}' "$image")
+
+    for _ in $(seq "$RUNS"); do
+        start=$(now_ms)
+        container=$(docker run --detach --rm \
+            --network "$NETWORK" \
+            --env KONG_PG_HOST=db \
+            --env KONG_PG_DATABASE=kong \
+            --env KONG_PG_USER=kong \
+            --env KONG_PG_PASSWORD=kong \
+            --health-cmd /scripts/health.sh \
+            --health-interval 100ms \
+            "$image")
+
+        until [ "$(docker inspect --format '{{.State.Health.Status}}' "$container")" = "healthy" ]; do
+            sleep 0.1
+        done
+        healthy=$(($(now_ms) - start))
+
+        # Logged by startup.sh, excludes the creation of the container
+        ready=$(docker logs "$container" 2>&1 |
+            sed -n 's/.*Startup phase ready took .* (\([0-9]*\)ms since start).*/\1/p')
+
+        docker stop "$container" > /dev/null
+
+        printf "%-6s %10d %18d %18s\n" "$target" $((size / 1000000)) "$healthy" "$ready"
+    done
+done